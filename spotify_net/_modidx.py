@@ -5,10 +5,285 @@ d = { 'settings': { 'branch': 'master',
                 'doc_host': 'https://drewtray.github.io',
                 'git_url': 'https://github.com/drewtray/spotify_net',
                 'lib_path': 'spotify_net'},
-  'syms': { 'spotify_net.prep_features_for_model': { 'spotify_net.prep_features_for_model.ModelPrep': ( 'prepmodel.html#modelprep',
+  'syms': { 'spotify_net.async_spotify': { 'spotify_net.async_spotify.AsyncSpotifyAPI': ( 'async_spotify.html#asyncspotifyapi',
+                                                                                          'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.API_URL': ( 'async_spotify.html#asyncspotifyapi.api_url',
+                                                                                                  'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.PAGE_SIZE': ( 'async_spotify.html#asyncspotifyapi.page_size',
+                                                                                                    'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.TOKEN_URL': ( 'async_spotify.html#asyncspotifyapi.token_url',
+                                                                                                    'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.__aenter__': ( 'async_spotify.html#asyncspotifyapi.__aenter__',
+                                                                                                     'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.__aexit__': ( 'async_spotify.html#asyncspotifyapi.__aexit__',
+                                                                                                    'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.__init__': ( 'async_spotify.html#asyncspotifyapi.__init__',
+                                                                                                   'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI._get': ( 'async_spotify.html#asyncspotifyapi._get',
+                                                                                               'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI._headers': ( 'async_spotify.html#asyncspotifyapi._headers',
+                                                                                                   'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI._in_thread': ( 'async_spotify.html#asyncspotifyapi._in_thread',
+                                                                                                     'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI._refresh_after_401': ( 'async_spotify.html#asyncspotifyapi._refresh_after_401',
+                                                                                                             'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.close': ( 'async_spotify.html#asyncspotifyapi.close',
+                                                                                                'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.delete_tracks': ( 'async_spotify.html#asyncspotifyapi.delete_tracks',
+                                                                                                        'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.df_tracks': ( 'async_spotify.html#asyncspotifyapi.df_tracks',
+                                                                                                    'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.genre_matrix': ( 'async_spotify.html#asyncspotifyapi.genre_matrix',
+                                                                                                       'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.get_artist_genres': ( 'async_spotify.html#asyncspotifyapi.get_artist_genres',
+                                                                                                            'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.get_audio_features': ( 'async_spotify.html#asyncspotifyapi.get_audio_features',
+                                                                                                             'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.get_playlist_features': ( 'async_spotify.html#asyncspotifyapi.get_playlist_features',
+                                                                                                                'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.get_playlist_snapshot': ( 'async_spotify.html#asyncspotifyapi.get_playlist_snapshot',
+                                                                                                                'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.get_secret': ( 'async_spotify.html#asyncspotifyapi.get_secret',
+                                                                                                     'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.get_subset_features': ( 'async_spotify.html#asyncspotifyapi.get_subset_features',
+                                                                                                              'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.get_track_page': ( 'async_spotify.html#asyncspotifyapi.get_track_page',
+                                                                                                         'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.get_track_subset': ( 'async_spotify.html#asyncspotifyapi.get_track_subset',
+                                                                                                           'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.parse_new_tracks': ( 'async_spotify.html#asyncspotifyapi.parse_new_tracks',
+                                                                                                           'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.playlist_id': ( 'async_spotify.html#asyncspotifyapi.playlist_id',
+                                                                                                      'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.save_new_tracks': ( 'async_spotify.html#asyncspotifyapi.save_new_tracks',
+                                                                                                          'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.tokens': ( 'async_spotify.html#asyncspotifyapi.tokens',
+                                                                                                 'spotify_net/async_spotify.py'),
+                                           'spotify_net.async_spotify.AsyncSpotifyAPI.transport': ( 'async_spotify.html#asyncspotifyapi.transport',
+                                                                                                    'spotify_net/async_spotify.py')},
+            'spotify_net.auth': { 'spotify_net.auth.SecretCache': ('auth.html#secretcache', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.SecretCache.__init__': ('auth.html#secretcache.__init__', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.SecretCache._client': ('auth.html#secretcache._client', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.SecretCache.clear': ('auth.html#secretcache.clear', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.SecretCache.get': ('auth.html#secretcache.get', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.SecretCache.stats': ('auth.html#secretcache.stats', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.TokenManager': ('auth.html#tokenmanager', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.TokenManager.__init__': ('auth.html#tokenmanager.__init__', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.TokenManager._expiring': ('auth.html#tokenmanager._expiring', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.TokenManager._set': ('auth.html#tokenmanager._set', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.TokenManager.get': ('auth.html#tokenmanager.get', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.TokenManager.needs_refresh': ( 'auth.html#tokenmanager.needs_refresh',
+                                                                                   'spotify_net/auth.py'),
+                                  'spotify_net.auth.TokenManager.refresh': ('auth.html#tokenmanager.refresh', 'spotify_net/auth.py'),
+                                  'spotify_net.auth.TokenManager.stats': ('auth.html#tokenmanager.stats', 'spotify_net/auth.py')},
+            'spotify_net.batch': { 'spotify_net.batch.PlaylistBatchRunner': ('batch.html#playlistbatchrunner', 'spotify_net/batch.py'),
+                                   'spotify_net.batch.PlaylistBatchRunner.__init__': ( 'batch.html#playlistbatchrunner.__init__',
+                                                                                       'spotify_net/batch.py'),
+                                   'spotify_net.batch.PlaylistBatchRunner._client': ( 'batch.html#playlistbatchrunner._client',
+                                                                                      'spotify_net/batch.py'),
+                                   'spotify_net.batch.PlaylistBatchRunner._queue': ( 'batch.html#playlistbatchrunner._queue',
+                                                                                     'spotify_net/batch.py'),
+                                   'spotify_net.batch.PlaylistBatchRunner._rotate': ( 'batch.html#playlistbatchrunner._rotate',
+                                                                                      'spotify_net/batch.py'),
+                                   'spotify_net.batch.PlaylistBatchRunner.get_secret': ( 'batch.html#playlistbatchrunner.get_secret',
+                                                                                         'spotify_net/batch.py'),
+                                   'spotify_net.batch.PlaylistBatchRunner.rotate': ( 'batch.html#playlistbatchrunner.rotate',
+                                                                                     'spotify_net/batch.py'),
+                                   'spotify_net.batch.PlaylistBatchRunner.run': ( 'batch.html#playlistbatchrunner.run',
+                                                                                  'spotify_net/batch.py')},
+            'spotify_net.benchmarks': { 'spotify_net.benchmarks.SyntheticSpotifyAPI': ( 'benchmarks.html#syntheticspotifyapi',
+                                                                                        'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.SyntheticSpotifyAPI.__init__': ( 'benchmarks.html#syntheticspotifyapi.__init__',
+                                                                                                 'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.SyntheticSpotifyAPI.get_artist_genres': ( 'benchmarks.html#syntheticspotifyapi.get_artist_genres',
+                                                                                                          'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.SyntheticSpotifyAPI.get_audio_features': ( 'benchmarks.html#syntheticspotifyapi.get_audio_features',
+                                                                                                           'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.SyntheticSpotifyAPI.get_track_page': ( 'benchmarks.html#syntheticspotifyapi.get_track_page',
+                                                                                                       'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks._append_page_by_page': ( 'benchmarks.html#_append_page_by_page',
+                                                                                         'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks._bytes_per_track': ( 'benchmarks.html#_bytes_per_track',
+                                                                                     'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks._import_times': ( 'benchmarks.html#_import_times',
+                                                                                  'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks._lookup_requests': ( 'benchmarks.html#_lookup_requests',
+                                                                                     'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks._merge_upper': ( 'benchmarks.html#_merge_upper',
+                                                                                 'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks._parse_new_tracks_apply': ( 'benchmarks.html#_parse_new_tracks_apply',
+                                                                                            'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_async_client': ( 'benchmarks.html#bench_async_client',
+                                                                                       'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_batch_runner': ( 'benchmarks.html#bench_batch_runner',
+                                                                                       'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_coalescing': ( 'benchmarks.html#bench_coalescing',
+                                                                                     'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_compact_schema': ( 'benchmarks.html#bench_compact_schema',
+                                                                                         'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_feature_preparation': ( 'benchmarks.html#bench_feature_preparation',
+                                                                                              'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_genre_encoding': ( 'benchmarks.html#bench_genre_encoding',
+                                                                                         'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_import_time': ( 'benchmarks.html#bench_import_time',
+                                                                                      'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_load_s3': ( 'benchmarks.html#bench_load_s3',
+                                                                                  'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_parse_new_tracks': ( 'benchmarks.html#bench_parse_new_tracks',
+                                                                                           'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_pipeline': ( 'benchmarks.html#bench_pipeline',
+                                                                                   'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_playlist_ingestion': ( 'benchmarks.html#bench_playlist_ingestion',
+                                                                                             'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_storage_formats': ( 'benchmarks.html#bench_storage_formats',
+                                                                                          'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.bench_track_matching': ( 'benchmarks.html#bench_track_matching',
+                                                                                         'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.measure': ('benchmarks.html#measure', 'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.synthetic_model_prep': ( 'benchmarks.html#synthetic_model_prep',
+                                                                                         'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.synthetic_track_frame': ( 'benchmarks.html#synthetic_track_frame',
+                                                                                          'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.synthetic_track_pairs': ( 'benchmarks.html#synthetic_track_pairs',
+                                                                                          'spotify_net/benchmarks.py'),
+                                        'spotify_net.benchmarks.write_results': ( 'benchmarks.html#write_results',
+                                                                                  'spotify_net/benchmarks.py')},
+            'spotify_net.cache': { 'spotify_net.cache.ArtistGenreCache': ('cache.html#artistgenrecache', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ArtistGenreCache.__init__': ( 'cache.html#artistgenrecache.__init__',
+                                                                                    'spotify_net/cache.py'),
+                                   'spotify_net.cache.ArtistGenreCache.close': ( 'cache.html#artistgenrecache.close',
+                                                                                 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ArtistGenreCache.get_many': ( 'cache.html#artistgenrecache.get_many',
+                                                                                    'spotify_net/cache.py'),
+                                   'spotify_net.cache.ArtistGenreCache.put_many': ( 'cache.html#artistgenrecache.put_many',
+                                                                                    'spotify_net/cache.py'),
+                                   'spotify_net.cache.ArtistGenreCache.stats': ( 'cache.html#artistgenrecache.stats',
+                                                                                 'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore': ('cache.html#audiofeaturestore', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore.__init__': ( 'cache.html#audiofeaturestore.__init__',
+                                                                                     'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore._load': ( 'cache.html#audiofeaturestore._load',
+                                                                                  'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore._read': ( 'cache.html#audiofeaturestore._read',
+                                                                                  'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore.get_many': ( 'cache.html#audiofeaturestore.get_many',
+                                                                                     'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore.load': ( 'cache.html#audiofeaturestore.load',
+                                                                                 'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore.put': ('cache.html#audiofeaturestore.put', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore.save': ( 'cache.html#audiofeaturestore.save',
+                                                                                 'spotify_net/cache.py'),
+                                   'spotify_net.cache.AudioFeatureStore.stats': ( 'cache.html#audiofeaturestore.stats',
+                                                                                  'spotify_net/cache.py'),
+                                   'spotify_net.cache.ModelArtifactCache': ('cache.html#modelartifactcache', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ModelArtifactCache.__init__': ( 'cache.html#modelartifactcache.__init__',
+                                                                                      'spotify_net/cache.py'),
+                                   'spotify_net.cache.ModelArtifactCache._cached_version': ( 'cache.html#modelartifactcache._cached_version',
+                                                                                             'spotify_net/cache.py'),
+                                   'spotify_net.cache.ModelArtifactCache._paths': ( 'cache.html#modelartifactcache._paths',
+                                                                                    'spotify_net/cache.py'),
+                                   'spotify_net.cache.ModelArtifactCache.load': ( 'cache.html#modelartifactcache.load',
+                                                                                  'spotify_net/cache.py'),
+                                   'spotify_net.cache.ModelArtifactCache.stats': ( 'cache.html#modelartifactcache.stats',
+                                                                                   'spotify_net/cache.py'),
+                                   'spotify_net.cache.PlaylistIndex': ('cache.html#playlistindex', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.PlaylistIndex.__init__': ( 'cache.html#playlistindex.__init__',
+                                                                                 'spotify_net/cache.py'),
+                                   'spotify_net.cache.PlaylistIndex.load_state': ( 'cache.html#playlistindex.load_state',
+                                                                                   'spotify_net/cache.py'),
+                                   'spotify_net.cache.PlaylistIndex.load_tracks': ( 'cache.html#playlistindex.load_tracks',
+                                                                                    'spotify_net/cache.py'),
+                                   'spotify_net.cache.PlaylistIndex.remove_tracks': ( 'cache.html#playlistindex.remove_tracks',
+                                                                                      'spotify_net/cache.py'),
+                                   'spotify_net.cache.PlaylistIndex.save': ('cache.html#playlistindex.save', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ScrobbleStore': ('cache.html#scrobblestore', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ScrobbleStore.__init__': ( 'cache.html#scrobblestore.__init__',
+                                                                                 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ScrobbleStore._parts': ('cache.html#scrobblestore._parts', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ScrobbleStore.append': ('cache.html#scrobblestore.append', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ScrobbleStore.load': ('cache.html#scrobblestore.load', 'spotify_net/cache.py'),
+                                   'spotify_net.cache.ScrobbleStore.playcounts': ( 'cache.html#scrobblestore.playcounts',
+                                                                                   'spotify_net/cache.py'),
+                                   'spotify_net.cache.ScrobbleStore.watermark': ( 'cache.html#scrobblestore.watermark',
+                                                                                  'spotify_net/cache.py')},
+            'spotify_net.cli': { 'spotify_net.cli.build_parser': ('cli.html#build_parser', 'spotify_net/cli.py'),
+                                 'spotify_net.cli.main': ('cli.html#main', 'spotify_net/cli.py'),
+                                 'spotify_net.cli.run_batch': ('cli.html#run_batch', 'spotify_net/cli.py'),
+                                 'spotify_net.cli.run_bench': ('cli.html#run_bench', 'spotify_net/cli.py'),
+                                 'spotify_net.cli.run_lastfm': ('cli.html#run_lastfm', 'spotify_net/cli.py'),
+                                 'spotify_net.cli.run_modelprep': ('cli.html#run_modelprep', 'spotify_net/cli.py'),
+                                 'spotify_net.cli.run_spotify': ('cli.html#run_spotify', 'spotify_net/cli.py')},
+            'spotify_net.coalesce': { 'spotify_net.coalesce.IDCoalescer': ('coalesce.html#idcoalescer', 'spotify_net/coalesce.py'),
+                                      'spotify_net.coalesce.IDCoalescer.__init__': ( 'coalesce.html#idcoalescer.__init__',
+                                                                                     'spotify_net/coalesce.py'),
+                                      'spotify_net.coalesce.IDCoalescer._batches': ( 'coalesce.html#idcoalescer._batches',
+                                                                                     'spotify_net/coalesce.py'),
+                                      'spotify_net.coalesce.IDCoalescer.add': ('coalesce.html#idcoalescer.add', 'spotify_net/coalesce.py'),
+                                      'spotify_net.coalesce.IDCoalescer.get': ('coalesce.html#idcoalescer.get', 'spotify_net/coalesce.py'),
+                                      'spotify_net.coalesce.IDCoalescer.resolve': ( 'coalesce.html#idcoalescer.resolve',
+                                                                                    'spotify_net/coalesce.py'),
+                                      'spotify_net.coalesce.IDCoalescer.stats': ( 'coalesce.html#idcoalescer.stats',
+                                                                                  'spotify_net/coalesce.py')},
+            'spotify_net.instrumentation': { 'spotify_net.instrumentation.Instrumentation': ( 'instrumentation.html#instrumentation',
+                                                                                              'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.__init__': ( 'instrumentation.html#instrumentation.__init__',
+                                                                                                       'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation._enter_stage': ( 'instrumentation.html#instrumentation._enter_stage',
+                                                                                                           'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation._exit_stage': ( 'instrumentation.html#instrumentation._exit_stage',
+                                                                                                          'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation._record_span': ( 'instrumentation.html#instrumentation._record_span',
+                                                                                                           'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation._span': ( 'instrumentation.html#instrumentation._span',
+                                                                                                    'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.disable': ( 'instrumentation.html#instrumentation.disable',
+                                                                                                      'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.enable': ( 'instrumentation.html#instrumentation.enable',
+                                                                                                     'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.record_http': ( 'instrumentation.html#instrumentation.record_http',
+                                                                                                          'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.reset': ( 'instrumentation.html#instrumentation.reset',
+                                                                                                    'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.snapshot': ( 'instrumentation.html#instrumentation.snapshot',
+                                                                                                       'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.span': ( 'instrumentation.html#instrumentation.span',
+                                                                                                   'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.to_json': ( 'instrumentation.html#instrumentation.to_json',
+                                                                                                      'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.Instrumentation.to_prometheus': ( 'instrumentation.html#instrumentation.to_prometheus',
+                                                                                                            'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation._escape_label': ( 'instrumentation.html#_escape_label',
+                                                                                            'spotify_net/instrumentation.py'),
+                                             'spotify_net.instrumentation.instrumented': ( 'instrumentation.html#instrumented',
+                                                                                           'spotify_net/instrumentation.py')},
+            'spotify_net.matching': { 'spotify_net.matching.TrackMatcher': ('matching.html#trackmatcher', 'spotify_net/matching.py'),
+                                      'spotify_net.matching.TrackMatcher.__init__': ( 'matching.html#trackmatcher.__init__',
+                                                                                      'spotify_net/matching.py'),
+                                      'spotify_net.matching.TrackMatcher.join': ( 'matching.html#trackmatcher.join',
+                                                                                  'spotify_net/matching.py'),
+                                      'spotify_net.matching.TrackMatcher.match': ( 'matching.html#trackmatcher.match',
+                                                                                   'spotify_net/matching.py'),
+                                      'spotify_net.matching._normalize': ('matching.html#_normalize', 'spotify_net/matching.py'),
+                                      'spotify_net.matching.normalize_keys': ('matching.html#normalize_keys', 'spotify_net/matching.py'),
+                                      'spotify_net.matching.track_keys': ('matching.html#track_keys', 'spotify_net/matching.py')},
+            'spotify_net.prep_features_for_model': { 'spotify_net.prep_features_for_model.FeatureTransformer': ( 'prepmodel.html#featuretransformer',
+                                                                                                                 'spotify_net/prep_features_for_model.py'),
+                                                     'spotify_net.prep_features_for_model.FeatureTransformer.__init__': ( 'prepmodel.html#featuretransformer.__init__',
+                                                                                                                          'spotify_net/prep_features_for_model.py'),
+                                                     'spotify_net.prep_features_for_model.FeatureTransformer.compile': ( 'prepmodel.html#featuretransformer.compile',
+                                                                                                                         'spotify_net/prep_features_for_model.py'),
+                                                     'spotify_net.prep_features_for_model.FeatureTransformer.transform': ( 'prepmodel.html#featuretransformer.transform',
+                                                                                                                           'spotify_net/prep_features_for_model.py'),
+                                                     'spotify_net.prep_features_for_model.ModelPrep': ( 'prepmodel.html#modelprep',
                                                                                                         'spotify_net/prep_features_for_model.py'),
                                                      'spotify_net.prep_features_for_model.ModelPrep.__init__': ( 'prepmodel.html#modelprep.__init__',
                                                                                                                  'spotify_net/prep_features_for_model.py'),
+                                                     'spotify_net.prep_features_for_model.ModelPrep.build_genre_embedding': ( 'prepmodel.html#modelprep.build_genre_embedding',
+                                                                                                                              'spotify_net/prep_features_for_model.py'),
+                                                     'spotify_net.prep_features_for_model.ModelPrep.build_transformer': ( 'prepmodel.html#modelprep.build_transformer',
+                                                                                                                          'spotify_net/prep_features_for_model.py'),
+                                                     'spotify_net.prep_features_for_model.ModelPrep.embed_genres': ( 'prepmodel.html#modelprep.embed_genres',
+                                                                                                                     'spotify_net/prep_features_for_model.py'),
                                                      'spotify_net.prep_features_for_model.ModelPrep.load_genre_series': ( 'prepmodel.html#modelprep.load_genre_series',
                                                                                                                           'spotify_net/prep_features_for_model.py'),
                                                      'spotify_net.prep_features_for_model.ModelPrep.load_key_series': ( 'prepmodel.html#modelprep.load_key_series',
@@ -23,6 +298,8 @@ d = { 'settings': { 'branch': 'master',
                                                                                                                                    'spotify_net/prep_features_for_model.py'),
                                                      'spotify_net.prep_features_for_model.ModelPrep.load_tracks_data': ( 'prepmodel.html#modelprep.load_tracks_data',
                                                                                                                          'spotify_net/prep_features_for_model.py'),
+                                                     'spotify_net.prep_features_for_model.ModelPrep.prepare_features': ( 'prepmodel.html#modelprep.prepare_features',
+                                                                                                                         'spotify_net/prep_features_for_model.py'),
                                                      'spotify_net.prep_features_for_model.ModelPrep.prepare_final_frame': ( 'prepmodel.html#modelprep.prepare_final_frame',
                                                                                                                             'spotify_net/prep_features_for_model.py'),
                                                      'spotify_net.prep_features_for_model.ModelPrep.save_prepared_frame': ( 'prepmodel.html#modelprep.save_prepared_frame',
@@ -31,42 +308,268 @@ d = { 'settings': { 'branch': 'master',
                                                                                                                            'spotify_net/prep_features_for_model.py'),
                                                      'spotify_net.prep_features_for_model.ModelPrep.update_dataframe_with_prefix': ( 'prepmodel.html#modelprep.update_dataframe_with_prefix',
                                                                                                                                      'spotify_net/prep_features_for_model.py')},
-            'spotify_net.prep_model': { 'spotify_net.prep_model.ModelPrep': ('prepmodel.html#modelprep', 'spotify_net/prep_model.py'),
-                                        'spotify_net.prep_model.ModelPrep.__init__': ( 'prepmodel.html#modelprep.__init__',
-                                                                                       'spotify_net/prep_model.py'),
-                                        'spotify_net.prep_model.ModelPrep.final_prep': ( 'prepmodel.html#modelprep.final_prep',
-                                                                                         'spotify_net/prep_model.py'),
-                                        'spotify_net.prep_model.ModelPrep.load_s3': ( 'prepmodel.html#modelprep.load_s3',
-                                                                                      'spotify_net/prep_model.py'),
-                                        'spotify_net.prep_model.ModelPrep.transform_features': ( 'prepmodel.html#modelprep.transform_features',
-                                                                                                 'spotify_net/prep_model.py')},
             'spotify_net.retrieve_last_fm_data': { 'spotify_net.retrieve_last_fm_data.LastFmAPI': ( 'retrieve_last.html#lastfmapi',
                                                                                                     'spotify_net/retrieve_last_fm_data.py'),
                                                    'spotify_net.retrieve_last_fm_data.LastFmAPI.__init__': ( 'retrieve_last.html#lastfmapi.__init__',
                                                                                                              'spotify_net/retrieve_last_fm_data.py'),
+                                                   'spotify_net.retrieve_last_fm_data.LastFmAPI.get_recent_tracks_page': ( 'retrieve_last.html#lastfmapi.get_recent_tracks_page',
+                                                                                                                           'spotify_net/retrieve_last_fm_data.py'),
                                                    'spotify_net.retrieve_last_fm_data.LastFmAPI.get_secret': ( 'retrieve_last.html#lastfmapi.get_secret',
                                                                                                                'spotify_net/retrieve_last_fm_data.py'),
                                                    'spotify_net.retrieve_last_fm_data.LastFmAPI.get_top_tracks': ( 'retrieve_last.html#lastfmapi.get_top_tracks',
+                                                                                                                   'spotify_net/retrieve_last_fm_data.py'),
+                                                   'spotify_net.retrieve_last_fm_data.LastFmAPI.get_top_tracks_page': ( 'retrieve_last.html#lastfmapi.get_top_tracks_page',
+                                                                                                                        'spotify_net/retrieve_last_fm_data.py'),
+                                                   'spotify_net.retrieve_last_fm_data.LastFmAPI.save_top_tracks': ( 'retrieve_last.html#lastfmapi.save_top_tracks',
+                                                                                                                    'spotify_net/retrieve_last_fm_data.py'),
+                                                   'spotify_net.retrieve_last_fm_data.LastFmAPI.sync_scrobbles': ( 'retrieve_last.html#lastfmapi.sync_scrobbles',
                                                                                                                    'spotify_net/retrieve_last_fm_data.py')},
             'spotify_net.retrieve_spotify_data': { 'spotify_net.retrieve_spotify_data.SpotifyAPI': ( 'retrieve_spotify_data.html#spotifyapi',
                                                                                                      'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.__init__': ( 'retrieve_spotify_data.html#spotifyapi.__init__',
                                                                                                               'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._add_missing_genres': ( 'retrieve_spotify_data.html#spotifyapi._add_missing_genres',
+                                                                                                                         'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._fetch_artists': ( 'retrieve_spotify_data.html#spotifyapi._fetch_artists',
+                                                                                                                    'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._fetch_audio_features': ( 'retrieve_spotify_data.html#spotifyapi._fetch_audio_features',
+                                                                                                                           'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._get': ( 'retrieve_spotify_data.html#spotifyapi._get',
+                                                                                                          'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._get_items_after': ( 'retrieve_spotify_data.html#spotifyapi._get_items_after',
+                                                                                                                      'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._get_items_parallel': ( 'retrieve_spotify_data.html#spotifyapi._get_items_parallel',
+                                                                                                                         'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._get_pages_parallel': ( 'retrieve_spotify_data.html#spotifyapi._get_pages_parallel',
+                                                                                                                         'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._get_queued_features': ( 'retrieve_spotify_data.html#spotifyapi._get_queued_features',
+                                                                                                                          'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI._refresh_token': ( 'retrieve_spotify_data.html#spotifyapi._refresh_token',
+                                                                                                                    'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.add_genres': ( 'retrieve_spotify_data.html#spotifyapi.add_genres',
+                                                                                                                'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.cached_genres': ( 'retrieve_spotify_data.html#spotifyapi.cached_genres',
+                                                                                                                   'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.create_headers': ( 'retrieve_spotify_data.html#spotifyapi.create_headers',
                                                                                                                     'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.deduplicate': ( 'retrieve_spotify_data.html#spotifyapi.deduplicate',
+                                                                                                                 'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.delete_report': ( 'retrieve_spotify_data.html#spotifyapi.delete_report',
+                                                                                                                   'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.delete_tracks': ( 'retrieve_spotify_data.html#spotifyapi.delete_tracks',
                                                                                                                    'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.feature_frame': ( 'retrieve_spotify_data.html#spotifyapi.feature_frame',
+                                                                                                                   'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.get_artist_genres': ( 'retrieve_spotify_data.html#spotifyapi.get_artist_genres',
+                                                                                                                       'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.get_artist_info': ( 'retrieve_spotify_data.html#spotifyapi.get_artist_info',
                                                                                                                      'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.get_audio_features': ( 'retrieve_spotify_data.html#spotifyapi.get_audio_features',
+                                                                                                                        'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.get_playlist_features': ( 'retrieve_spotify_data.html#spotifyapi.get_playlist_features',
                                                                                                                            'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.get_playlist_snapshot': ( 'retrieve_spotify_data.html#spotifyapi.get_playlist_snapshot',
+                                                                                                                           'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.get_secret': ( 'retrieve_spotify_data.html#spotifyapi.get_secret',
                                                                                                                 'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.get_subset_features': ( 'retrieve_spotify_data.html#spotifyapi.get_subset_features',
                                                                                                                          'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.get_track_page': ( 'retrieve_spotify_data.html#spotifyapi.get_track_page',
+                                                                                                                    'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.get_track_subset': ( 'retrieve_spotify_data.html#spotifyapi.get_track_subset',
                                                                                                                       'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.iter_track_pages': ( 'retrieve_spotify_data.html#spotifyapi.iter_track_pages',
+                                                                                                                      'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.parse_new_tracks': ( 'retrieve_spotify_data.html#spotifyapi.parse_new_tracks',
                                                                                                                       'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.queue_playlist_features': ( 'retrieve_spotify_data.html#spotifyapi.queue_playlist_features',
+                                                                                                                             'spotify_net/retrieve_spotify_data.py'),
                                                    'spotify_net.retrieve_spotify_data.SpotifyAPI.refresh_token': ( 'retrieve_spotify_data.html#spotifyapi.refresh_token',
-                                                                                                                   'spotify_net/retrieve_spotify_data.py')}}}
+                                                                                                                   'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.save_new_tracks': ( 'retrieve_spotify_data.html#spotifyapi.save_new_tracks',
+                                                                                                                     'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.store_genres': ( 'retrieve_spotify_data.html#spotifyapi.store_genres',
+                                                                                                                  'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.stored_features': ( 'retrieve_spotify_data.html#spotifyapi.stored_features',
+                                                                                                                     'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.sync_playlist_features': ( 'retrieve_spotify_data.html#spotifyapi.sync_playlist_features',
+                                                                                                                            'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.SpotifyAPI.track_info': ( 'retrieve_spotify_data.html#spotifyapi.track_info',
+                                                                                                                'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.TrackFrameBuilder': ( 'retrieve_spotify_data.html#trackframebuilder',
+                                                                                                            'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.TrackFrameBuilder.__init__': ( 'retrieve_spotify_data.html#trackframebuilder.__init__',
+                                                                                                                     'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.TrackFrameBuilder._build_sparse': ( 'retrieve_spotify_data.html#trackframebuilder._build_sparse',
+                                                                                                                          'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.TrackFrameBuilder.add': ( 'retrieve_spotify_data.html#trackframebuilder.add',
+                                                                                                                'spotify_net/retrieve_spotify_data.py'),
+                                                   'spotify_net.retrieve_spotify_data.TrackFrameBuilder.build': ( 'retrieve_spotify_data.html#trackframebuilder.build',
+                                                                                                                  'spotify_net/retrieve_spotify_data.py')},
+            'spotify_net.schema': { 'spotify_net.schema.GenreMatrix': ('schema.html#genrematrix', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.__init__': ( 'schema.html#genrematrix.__init__',
+                                                                                 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.__len__': ('schema.html#genrematrix.__len__', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.add': ('schema.html#genrematrix.add', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.embed': ('schema.html#genrematrix.embed', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.embed_tracks': ( 'schema.html#genrematrix.embed_tracks',
+                                                                                     'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.from_bytes': ( 'schema.html#genrematrix.from_bytes',
+                                                                                   'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.matrix': ('schema.html#genrematrix.matrix', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.missing': ('schema.html#genrematrix.missing', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.rows': ('schema.html#genrematrix.rows', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.subset': ('schema.html#genrematrix.subset', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.to_bytes': ( 'schema.html#genrematrix.to_bytes',
+                                                                                 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.to_frame': ( 'schema.html#genrematrix.to_frame',
+                                                                                 'spotify_net/schema.py'),
+                                    'spotify_net.schema.GenreMatrix.track_matrix': ( 'schema.html#genrematrix.track_matrix',
+                                                                                     'spotify_net/schema.py'),
+                                    'spotify_net.schema.compact_column': ('schema.html#compact_column', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.compact_track_frame': ('schema.html#compact_track_frame', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.densify': ('schema.html#densify', 'spotify_net/schema.py'),
+                                    'spotify_net.schema.memory_by_group': ('schema.html#memory_by_group', 'spotify_net/schema.py')},
+            'spotify_net.standins': { 'spotify_net.standins.HTTPStandIn': ('standins.html#httpstandin', 'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn.__enter__': ( 'standins.html#httpstandin.__enter__',
+                                                                                      'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn.__exit__': ( 'standins.html#httpstandin.__exit__',
+                                                                                     'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn.__init__': ( 'standins.html#httpstandin.__init__',
+                                                                                     'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn._handler': ( 'standins.html#httpstandin._handler',
+                                                                                     'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn.endpoint_url': ( 'standins.html#httpstandin.endpoint_url',
+                                                                                         'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn.handle': ( 'standins.html#httpstandin.handle',
+                                                                                   'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn.json_response': ( 'standins.html#httpstandin.json_response',
+                                                                                          'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn.start': ( 'standins.html#httpstandin.start',
+                                                                                  'spotify_net/standins.py'),
+                                      'spotify_net.standins.HTTPStandIn.stop': ( 'standins.html#httpstandin.stop',
+                                                                                 'spotify_net/standins.py'),
+                                      'spotify_net.standins.LastFmStandIn': ('standins.html#lastfmstandin', 'spotify_net/standins.py'),
+                                      'spotify_net.standins.LastFmStandIn.__init__': ( 'standins.html#lastfmstandin.__init__',
+                                                                                       'spotify_net/standins.py'),
+                                      'spotify_net.standins.LastFmStandIn.configure': ( 'standins.html#lastfmstandin.configure',
+                                                                                        'spotify_net/standins.py'),
+                                      'spotify_net.standins.LastFmStandIn.handle': ( 'standins.html#lastfmstandin.handle',
+                                                                                     'spotify_net/standins.py'),
+                                      'spotify_net.standins.S3StandIn': ('standins.html#s3standin', 'spotify_net/standins.py'),
+                                      'spotify_net.standins.S3StandIn.__init__': ( 'standins.html#s3standin.__init__',
+                                                                                   'spotify_net/standins.py'),
+                                      'spotify_net.standins.S3StandIn.client': ( 'standins.html#s3standin.client',
+                                                                                 'spotify_net/standins.py'),
+                                      'spotify_net.standins.S3StandIn.handle': ( 'standins.html#s3standin.handle',
+                                                                                 'spotify_net/standins.py'),
+                                      'spotify_net.standins.S3StandIn.put': ('standins.html#s3standin.put', 'spotify_net/standins.py'),
+                                      'spotify_net.standins.SpotifyStandIn': ('standins.html#spotifystandin', 'spotify_net/standins.py'),
+                                      'spotify_net.standins.SpotifyStandIn.__init__': ( 'standins.html#spotifystandin.__init__',
+                                                                                        'spotify_net/standins.py'),
+                                      'spotify_net.standins.SpotifyStandIn.add_playlist': ( 'standins.html#spotifystandin.add_playlist',
+                                                                                            'spotify_net/standins.py'),
+                                      'spotify_net.standins.SpotifyStandIn.configure': ( 'standins.html#spotifystandin.configure',
+                                                                                         'spotify_net/standins.py'),
+                                      'spotify_net.standins.SpotifyStandIn.handle': ( 'standins.html#spotifystandin.handle',
+                                                                                      'spotify_net/standins.py'),
+                                      'spotify_net.standins._StandInServer': ('standins.html#_standinserver', 'spotify_net/standins.py'),
+                                      'spotify_net.standins.synthetic_audio_features': ( 'standins.html#synthetic_audio_features',
+                                                                                         'spotify_net/standins.py'),
+                                      'spotify_net.standins.synthetic_playlist': ( 'standins.html#synthetic_playlist',
+                                                                                   'spotify_net/standins.py')},
+            'spotify_net.storage': { 'spotify_net.storage.ArtifactStore': ('storage.html#artifactstore', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.ArtifactStore._source': ( 'storage.html#artifactstore._source',
+                                                                                    'spotify_net/storage.py'),
+                                     'spotify_net.storage.ArtifactStore.exists': ( 'storage.html#artifactstore.exists',
+                                                                                   'spotify_net/storage.py'),
+                                     'spotify_net.storage.ArtifactStore.read_bytes': ( 'storage.html#artifactstore.read_bytes',
+                                                                                       'spotify_net/storage.py'),
+                                     'spotify_net.storage.ArtifactStore.read_bytes_if_changed': ( 'storage.html#artifactstore.read_bytes_if_changed',
+                                                                                                  'spotify_net/storage.py'),
+                                     'spotify_net.storage.ArtifactStore.read_frame': ( 'storage.html#artifactstore.read_frame',
+                                                                                       'spotify_net/storage.py'),
+                                     'spotify_net.storage.ArtifactStore.read_series': ( 'storage.html#artifactstore.read_series',
+                                                                                        'spotify_net/storage.py'),
+                                     'spotify_net.storage.ArtifactStore.write_bytes': ( 'storage.html#artifactstore.write_bytes',
+                                                                                        'spotify_net/storage.py'),
+                                     'spotify_net.storage.ArtifactStore.write_frame': ( 'storage.html#artifactstore.write_frame',
+                                                                                        'spotify_net/storage.py'),
+                                     'spotify_net.storage.LocalStore': ('storage.html#localstore', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.LocalStore.__init__': ( 'storage.html#localstore.__init__',
+                                                                                  'spotify_net/storage.py'),
+                                     'spotify_net.storage.LocalStore._source': ( 'storage.html#localstore._source',
+                                                                                 'spotify_net/storage.py'),
+                                     'spotify_net.storage.LocalStore.exists': ('storage.html#localstore.exists', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.LocalStore.path': ('storage.html#localstore.path', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.LocalStore.read_bytes': ( 'storage.html#localstore.read_bytes',
+                                                                                    'spotify_net/storage.py'),
+                                     'spotify_net.storage.LocalStore.read_bytes_if_changed': ( 'storage.html#localstore.read_bytes_if_changed',
+                                                                                               'spotify_net/storage.py'),
+                                     'spotify_net.storage.LocalStore.write_bytes': ( 'storage.html#localstore.write_bytes',
+                                                                                     'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store': ('storage.html#s3store', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store.__init__': ('storage.html#s3store.__init__', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store._source': ('storage.html#s3store._source', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store.client': ('storage.html#s3store.client', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store.exists': ('storage.html#s3store.exists', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store.key': ('storage.html#s3store.key', 'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store.read_bytes': ( 'storage.html#s3store.read_bytes',
+                                                                                 'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store.read_bytes_if_changed': ( 'storage.html#s3store.read_bytes_if_changed',
+                                                                                            'spotify_net/storage.py'),
+                                     'spotify_net.storage.S3Store.write_bytes': ( 'storage.html#s3store.write_bytes',
+                                                                                  'spotify_net/storage.py')},
+            'spotify_net.transport': { 'spotify_net.transport.AsyncHTTPTransport': ( 'transport.html#asynchttptransport',
+                                                                                     'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport.__aenter__': ( 'transport.html#asynchttptransport.__aenter__',
+                                                                                                'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport.__aexit__': ( 'transport.html#asynchttptransport.__aexit__',
+                                                                                               'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport.__init__': ( 'transport.html#asynchttptransport.__init__',
+                                                                                              'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport._open': ( 'transport.html#asynchttptransport._open',
+                                                                                           'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport.close': ( 'transport.html#asynchttptransport.close',
+                                                                                           'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport.delete': ( 'transport.html#asynchttptransport.delete',
+                                                                                            'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport.get': ( 'transport.html#asynchttptransport.get',
+                                                                                         'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport.post': ( 'transport.html#asynchttptransport.post',
+                                                                                          'spotify_net/transport.py'),
+                                       'spotify_net.transport.AsyncHTTPTransport.request': ( 'transport.html#asynchttptransport.request',
+                                                                                             'spotify_net/transport.py'),
+                                       'spotify_net.transport.FairRateLimiter': ( 'transport.html#fairratelimiter',
+                                                                                  'spotify_net/transport.py'),
+                                       'spotify_net.transport.FairRateLimiter.__init__': ( 'transport.html#fairratelimiter.__init__',
+                                                                                           'spotify_net/transport.py'),
+                                       'spotify_net.transport.FairRateLimiter.acquire': ( 'transport.html#fairratelimiter.acquire',
+                                                                                          'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport': ('transport.html#httptransport', 'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.__init__': ( 'transport.html#httptransport.__init__',
+                                                                                         'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.backoff': ( 'transport.html#httptransport.backoff',
+                                                                                        'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.delete': ( 'transport.html#httptransport.delete',
+                                                                                       'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.for_flow': ( 'transport.html#httptransport.for_flow',
+                                                                                         'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.get': ( 'transport.html#httptransport.get',
+                                                                                    'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.post': ( 'transport.html#httptransport.post',
+                                                                                     'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.request': ( 'transport.html#httptransport.request',
+                                                                                        'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.retry_after': ( 'transport.html#httptransport.retry_after',
+                                                                                            'spotify_net/transport.py'),
+                                       'spotify_net.transport.HTTPTransport.stats': ( 'transport.html#httptransport.stats',
+                                                                                      'spotify_net/transport.py'),
+                                       'spotify_net.transport.RateLimiter': ('transport.html#ratelimiter', 'spotify_net/transport.py'),
+                                       'spotify_net.transport.RateLimiter.__init__': ( 'transport.html#ratelimiter.__init__',
+                                                                                       'spotify_net/transport.py'),
+                                       'spotify_net.transport.RateLimiter._refill': ( 'transport.html#ratelimiter._refill',
+                                                                                      'spotify_net/transport.py'),
+                                       'spotify_net.transport.RateLimiter.acquire': ( 'transport.html#ratelimiter.acquire',
+                                                                                      'spotify_net/transport.py'),
+                                       'spotify_net.transport._as_response': ('transport.html#_as_response', 'spotify_net/transport.py')}}}
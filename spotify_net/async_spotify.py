@@ -0,0 +1,419 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/13_async_spotify.ipynb.
+
+# %% auto 0
+__all__ = ['AsyncSpotifyAPI']
+
+# %% ../nbs/13_async_spotify.ipynb 4
+import asyncio
+import json
+import time
+
+import pandas as pd
+
+from .instrumentation import instrumented
+from .retrieve_spotify_data import SpotifyAPI, TrackFrameBuilder
+from .transport import AsyncHTTPTransport
+
+# %% ../nbs/13_async_spotify.ipynb 5
+class AsyncSpotifyAPI:
+    """
+    The asyncio counterpart of `SpotifyAPI`.
+
+    `get_track_subset`, `get_subset_features`, `get_playlist_features` and `delete_tracks` are coroutines sending
+    their requests through one `AsyncHTTPTransport`, at most `max_concurrency` at a time. Everything that sends no
+    playlist requests is left to a wrapped `SpotifyAPI`, `api`: the secrets, the access token, the caches, the
+    parsing and the hand-over to the next stage. Token refreshes, sent through its synchronous `transport`, and the
+    reads and writes of the genre cache, the feature store and the playlist index run in a worker thread, so they
+    don't block the event loop. There is no counterpart of `sync_playlist_features` or of
+    coalescing, since the lookups of every page are sent at once anyway.
+
+    Use the client as an async context manager, so its session is closed at the end:
+
+    ```python
+    async with AsyncSpotifyAPI('us-east-2') as spot:
+        spot.get_secret('spotify_35')
+        await spot.get_playlist_features('3ubgXaHeBn1CWLUZPXvqkj')
+    ```
+
+    Parameters
+    ----------
+    region_name : str
+        The name of the AWS region where the secrets manager is located.
+    max_concurrency : int, optional
+        The most requests in flight at once. Defaults to 64. Ignored if `async_transport` is given.
+    async_transport : AsyncHTTPTransport, optional
+        The transport the coroutines send their requests through. A new one is created if not given.
+    transport : HTTPTransport, optional
+        The HTTP transport the token refreshes are sent through. A new one is created if not given.
+    genre_cache : ArtistGenreCache, optional
+        A persistent cache of artist genres. Only artists missing from it are requested from the API.
+    feature_store : AudioFeatureStore, optional
+        A local store of audio features. Only tracks missing from it are requested from the API.
+    storage : ArtifactStore, optional
+        Where the new tracks are handed to the next stage. Defaults to the 'spotify-net' S3 bucket.
+    instrumentation : Instrumentation, optional
+        Where the calls of the methods are recorded. Defaults to `DEFAULT_INSTRUMENTATION`.
+    secret_cache : SecretCache, optional
+        Where the secrets are read from. Defaults to `SECRET_CACHE`, shared by the whole process.
+    token_refresh_margin : float, optional
+        How many seconds before its expiry the access token is refreshed. Defaults to 60.
+    tokens : TokenManager, optional
+        The token manager of another client of the same account, to share its access token. A new one is created
+        if not given.
+    compact : bool, optional
+        Whether to keep `df_tracks` in the compact schema of `compact_track_frame`. Defaults to False.
+    sparse_genres : bool, optional
+        Whether to keep the genres in `genre_matrix`, a `GenreMatrix` of the artists, instead of one-hot `genre_*`
+        columns of `df_tracks`. Defaults to False.
+    """
+    def __init__(self, region_name, max_concurrency=64, async_transport=None, transport=None, genre_cache=None,
+                 feature_store=None, storage=None, instrumentation=None, secret_cache=None, token_refresh_margin=60,
+                 tokens=None, compact=False, sparse_genres=False):
+        """
+        Initializes a new instance of the AsyncSpotifyAPI class.
+
+        Parameters
+        ----------
+        region_name : str
+            The name of the AWS region where the secrets manager is located.
+        max_concurrency : int, optional
+            The most requests in flight at once. Defaults to 64. Ignored if `async_transport` is given.
+        async_transport : AsyncHTTPTransport, optional
+            The transport the coroutines send their requests through. A new one is created if not given.
+        transport : HTTPTransport, optional
+            The HTTP transport the token refreshes are sent through. A new one is created if not given.
+        genre_cache : ArtistGenreCache, optional
+            A persistent cache of artist genres. Only artists missing from it are requested from the API.
+        feature_store : AudioFeatureStore, optional
+            A local store of audio features. Only tracks missing from it are requested from the API.
+        storage : ArtifactStore, optional
+            Where the new tracks are handed to the next stage. Defaults to the 'spotify-net' S3 bucket.
+        instrumentation : Instrumentation, optional
+            Where the calls of the methods are recorded. Defaults to `DEFAULT_INSTRUMENTATION`. Transports created
+            here count their requests in the same instance.
+        secret_cache : SecretCache, optional
+            Where the secrets are read from. Defaults to `SECRET_CACHE`, shared by the whole process.
+        token_refresh_margin : float, optional
+            How many seconds before its expiry the access token is refreshed. Defaults to 60.
+        tokens : TokenManager, optional
+            The token manager of another client of the same account, to share its access token. A new one is
+            created if not given.
+        compact : bool, optional
+            Whether to keep `df_tracks` in the compact schema of `compact_track_frame`. Defaults to False.
+        sparse_genres : bool, optional
+            Whether to keep the genres in `genre_matrix`, a `GenreMatrix` of the artists, instead of one-hot
+            `genre_*` columns of `df_tracks`. Defaults to False.
+        """
+        self.api = SpotifyAPI(region_name, transport=transport, genre_cache=genre_cache, feature_store=feature_store,
+                              storage=storage, instrumentation=instrumentation, secret_cache=secret_cache,
+                              token_refresh_margin=token_refresh_margin, tokens=tokens, compact=compact,
+                              sparse_genres=sparse_genres)
+        self.instrumentation = self.api.instrumentation
+        self.async_transport = async_transport if async_transport is not None else AsyncHTTPTransport(
+            max_concurrency, instrumentation=self.instrumentation)
+
+    # the state shared with the wrapped client, so a stand-in can configure either and the parsing sees the tracks
+    @property
+    def API_URL(self):
+        return self.api.API_URL
+
+    @API_URL.setter
+    def API_URL(self, value):
+        self.api.API_URL = value
+
+    @property
+    def TOKEN_URL(self):
+        return self.api.TOKEN_URL
+
+    @TOKEN_URL.setter
+    def TOKEN_URL(self, value):
+        self.api.TOKEN_URL = value
+
+    @property
+    def PAGE_SIZE(self):
+        return self.api.PAGE_SIZE
+
+    @property
+    def df_tracks(self):
+        return self.api.df_tracks
+
+    @df_tracks.setter
+    def df_tracks(self, value):
+        self.api.df_tracks = value
+
+    @property
+    def playlist_id(self):
+        return self.api.playlist_id
+
+    @property
+    def transport(self):
+        return self.api.transport
+
+    @property
+    def tokens(self):
+        return self.api.tokens
+
+    @property
+    def genre_matrix(self):
+        return self.api.genre_matrix
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the session of the asynchronous transport.
+        """
+        await self.async_transport.close()
+
+    def get_secret(self, secret_name):
+        """
+        Retrieves the specified secret and sets the corresponding environment variables. See `SpotifyAPI.get_secret`.
+        """
+        self.api.get_secret(secret_name)
+
+    def parse_new_tracks(self, lookback_days=7, copy=True):
+        """
+        Splits `df_tracks` into the old tracks and the new ones. See `SpotifyAPI.parse_new_tracks`.
+        """
+        return self.api.parse_new_tracks(lookback_days, copy)
+
+    def save_new_tracks(self, new_tracks, name=None):
+        """
+        Hands the new tracks to `ModelPrep` through the storage. See `SpotifyAPI.save_new_tracks`.
+        """
+        self.api.save_new_tracks(new_tracks, name)
+
+    async def _in_thread(self, func, *args):
+        """
+        Runs a blocking call, such as a token refresh or a genre cache or feature store access, in a worker thread, so
+        it doesn't hold up the event loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _headers(self):
+        """
+        Creates the request headers, refreshing an expiring access token in a worker thread first.
+        """
+        if self.tokens.needs_refresh():
+            await self._in_thread(self.tokens.get)
+        return self.api.create_headers()
+
+    async def _refresh_after_401(self, headers):
+        await self._in_thread(self.api.refresh_token, headers)
+
+    async def _get(self, url, endpoint=None):
+        """
+        Sends a GET request to the Spotify API, refreshing the access token once if it has expired.
+        """
+        headers = await self._headers()
+        response = await self.async_transport.get(url, headers=headers, endpoint=endpoint)
+
+        if response.status_code == 401:
+            await self._refresh_after_401(headers)
+            response = await self.async_transport.get(url, headers=await self._headers(), endpoint=endpoint)
+
+        response.raise_for_status()
+        return response
+
+    @instrumented('spotify.get_playlist_snapshot')
+    async def get_playlist_snapshot(self, playlist_id):
+        """
+        Retrieves the current snapshot ID and track count of the specified Spotify playlist. See
+        `SpotifyAPI.get_playlist_snapshot`.
+        """
+        playlist_url = f'{self.API_URL}/playlists/{playlist_id}?fields=snapshot_id,tracks.total'
+        playlist = (await self._get(playlist_url, endpoint='spotify.playlist')).json()
+        return playlist['snapshot_id'], playlist['tracks']['total']
+
+    @instrumented('spotify.get_track_page')
+    async def get_track_page(self, playlist_id, offset):
+        """
+        Retrieves one page of the specified Spotify playlist. See `SpotifyAPI.get_track_page`.
+        """
+        track_url = f'{self.API_URL}/playlists/{playlist_id}/tracks?limit={self.PAGE_SIZE}&offset={offset}'
+        return (await self._get(track_url, endpoint='spotify.playlist_tracks')).json()
+
+    async def get_track_subset(self, playlist_id, offset):
+        """
+        Retrieves a subset of tracks from the specified Spotify playlist.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the Spotify playlist to retrieve tracks from.
+        offset : int
+            The offset to use when retrieving tracks.
+
+        Returns
+        -------
+        list
+            A list of track items.
+        """
+        return (await self.get_track_page(playlist_id, offset))['items']
+
+    @instrumented('spotify.get_artist_genres')
+    async def get_artist_genres(self, artist_ids):
+        """
+        Retrieves the genres of the given artists, requesting the batches of 50 missing from the genre cache at once.
+        See `SpotifyAPI.get_artist_genres`.
+        """
+        genres, missing = await self._in_thread(self.api.cached_genres, artist_ids)
+
+        responses = await asyncio.gather(*(
+            self._get(f"{self.API_URL}/artists?ids={','.join(missing[i:i+50])}", endpoint='spotify.artists')
+            for i in range(0, len(missing), 50)))
+        fetched = {a['id']: a['genres'] for r_art in responses for a in r_art.json()['artists'] if a is not None}
+
+        return await self._in_thread(self.api.store_genres, genres, fetched)
+
+    @instrumented('spotify.get_audio_features')
+    async def get_audio_features(self, track_ids):
+        """
+        Retrieves the audio features of the given tracks, requesting the batches of 100 missing from the feature store
+        at once. See `SpotifyAPI.get_audio_features`.
+        """
+        stored, missing = await self._in_thread(self.api.stored_features, track_ids)
+
+        responses = await asyncio.gather(*(
+            self._get(f"{self.API_URL}/audio-features?ids={','.join(missing[i:i+100])}",
+                      endpoint='spotify.audio_features')
+            for i in range(0, len(missing), 100)))
+        records = [f for r_feat in responses for f in r_feat.json()['audio_features'] if f is not None]
+
+        return await self._in_thread(self.api.feature_frame, track_ids, stored, records)
+
+    @instrumented('spotify.get_subset_features')
+    async def get_subset_features(self, track_items):
+        """
+        Retrieves the genres and audio features of the given track items, both at once.
+
+        Parameters
+        ----------
+        track_items : list
+            A list of track items.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The same frame as `SpotifyAPI.get_subset_features`.
+        """
+        track_info = self.api.track_info(track_items)
+
+        artist_genres, feat_frame = await asyncio.gather(
+            self.get_artist_genres(track_info['artist id'].tolist()),
+            self.get_audio_features(track_info['id'].tolist()))
+        track_info = self.api.add_genres(track_info, artist_genres)
+
+        return pd.concat([track_info, feat_frame], axis=1)
+
+    @instrumented('spotify.get_playlist_features', stage=True)
+    async def get_playlist_features(self, playlist_id):
+        """
+        Retrieves every track of the playlist with its genres and audio features into `df_tracks`, like
+        `SpotifyAPI.get_playlist_features`.
+
+        The first page gives the playlist's track count, then every other page and the artists and audio features of
+        every page are requested at once, up to the transport's `max_concurrency`.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the Spotify playlist.
+        """
+        self.api.playlist_id = playlist_id
+        builder = TrackFrameBuilder(self.api.compact)
+        if len(self.df_tracks):
+            builder.add(self.df_tracks)
+
+        first_page = await self.get_track_page(playlist_id, 0)
+        offsets = range(self.PAGE_SIZE, first_page['total'], self.PAGE_SIZE)
+
+        async def page_features(offset):
+            return await self.get_subset_features(await self.get_track_subset(playlist_id, offset))
+
+        first_frame = [self.get_subset_features(first_page['items'])] if first_page['items'] else []
+        pages = await asyncio.gather(*first_frame, *(page_features(offset) for offset in offsets))
+
+        for page in pages:
+            builder.add(page)
+
+        self.df_tracks = self.api.deduplicate(builder.build())
+
+        if self.api.feature_store is not None:
+            await self._in_thread(self.api.feature_store.save)
+
+    @instrumented('spotify.delete_tracks', stage=True)
+    async def delete_tracks(self, tracks_to_delete, max_in_flight=1):
+        """
+        Deletes tracks from the current Spotify playlist in batches of 100, like `SpotifyAPI.delete_tracks`.
+
+        Each batch is sent with the latest snapshot ID returned by the batches before it. With `max_in_flight` above
+        1, that many batches are in flight at once. Failed batches are retried by the transport, and sent once more
+        after refreshing the access token on a 401.
+
+        Parameters
+        ----------
+        tracks_to_delete : pandas.DataFrame
+            A DataFrame containing the tracks to be deleted, with a 'uri' column.
+        max_in_flight : int, optional
+            The number of batches sent at once. Defaults to 1.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per batch, with its number of tracks, final HTTP status, attempts, latency in seconds and the
+            resulting snapshot ID.
+        """
+        import aiohttp
+
+        to_delete = tracks_to_delete['uri'].tolist()
+        batches = [to_delete[i:(i+100)] for i in range(0, len(to_delete), 100)]
+        DELETE_URL = f'{self.API_URL}/playlists/{self.playlist_id}/tracks'
+        in_flight = asyncio.Semaphore(max_in_flight)
+        snapshot = {'snapshot_id': None}
+
+        async def delete_batch(batch, delete_uris):
+            status, attempts, latency, snapshot_id = None, 0, 0.0, None
+            refreshed = False
+            async with in_flight:
+                while True:
+                    del_dict = {'tracks': [{'uri': uri} for uri in delete_uris]}
+                    if snapshot['snapshot_id'] is not None:
+                        del_dict['snapshot_id'] = snapshot['snapshot_id']
+                    headers = await self._headers()
+                    start = time.perf_counter()
+                    try:
+                        r_delete = await self.async_transport.delete(DELETE_URL, headers=headers,
+                                                                     data=json.dumps(del_dict),
+                                                                     endpoint='spotify.delete_tracks')
+                        status = r_delete.status_code
+                        attempts += r_delete.attempts
+                    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                        # the transport only raises these once its retries are used up
+                        status = None
+                        attempts += self.async_transport.max_retries + 1
+                    latency += time.perf_counter() - start
+
+                    if status == 401 and not refreshed:
+                        await self._refresh_after_401(headers)
+                        refreshed = True
+                        continue
+                    if status is not None and 200 <= status < 300:
+                        snapshot_id = snapshot['snapshot_id'] = r_delete.json().get('snapshot_id')
+                    break
+
+            return {
+                'batch': batch,
+                'tracks': len(delete_uris),
+                'status': status,
+                'attempts': attempts,
+                'latency': latency,
+                'snapshot_id': snapshot_id,
+            }
+
+        report = await asyncio.gather(*(delete_batch(batch, uris) for batch, uris in enumerate(batches)))
+        return await self._in_thread(self.api.delete_report, batches, list(report), snapshot['snapshot_id'])
@@ -0,0 +1,239 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/10_auth.ipynb.
+
+# %% auto 0
+__all__ = ['SECRET_CACHE', 'TokenManager', 'SecretCache']
+
+# %% ../nbs/10_auth.ipynb 4
+import json
+import threading
+import time
+
+# %% ../nbs/10_auth.ipynb 5
+class TokenManager:
+    """
+    Keeps an access token and its expiry, and refreshes it `refresh_margin` seconds before it expires.
+
+    Refreshes are single-flight: threads needing a new token at the same time wait for the one refresh in progress
+    instead of sending their own. A token whose expiry is unknown, such as one read from the environment, is used
+    until the API rejects it.
+
+    Parameters
+    ----------
+    refresh : callable
+        Requests a new token. Returns the access token and its lifetime in seconds, or None if the lifetime is not
+        known.
+    refresh_margin : float, optional
+        How many seconds before its expiry a token is replaced. Defaults to 60.
+    initial_token : callable, optional
+        Returns the token to start with. Without one, the first use refreshes.
+    clock : callable, optional
+        Returns the current time in seconds. Defaults to `time.monotonic`.
+    """
+    def __init__(self, refresh, refresh_margin=60, initial_token=None, clock=time.monotonic):
+        """
+        Initializes a new instance of the TokenManager class.
+
+        Parameters
+        ----------
+        refresh : callable
+            Requests a new token. Returns the access token and its lifetime in seconds, or None if the lifetime is not
+            known.
+        refresh_margin : float, optional
+            How many seconds before its expiry a token is replaced. Defaults to 60.
+        initial_token : callable, optional
+            Returns the token to start with. Without one, the first use refreshes.
+        clock : callable, optional
+            Returns the current time in seconds. Defaults to `time.monotonic`.
+        """
+        self._refresh = refresh
+        self.refresh_margin = refresh_margin
+        self._initial_token = initial_token
+        self._clock = clock
+        self.access_token = None
+        self.expires_at = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.proactive_refreshes = 0
+        self.reactive_refreshes = 0
+        self.skipped_refreshes = 0
+        self.avoided_401s = 0
+
+    def _expiring(self):
+        return self.expires_at is not None and self._clock() >= self.expires_at - self.refresh_margin
+
+    def needs_refresh(self):
+        """
+        Tells whether `get` could have to request a new token, for callers that must not block on it.
+
+        Returns
+        -------
+        bool
+            True if there is no token yet or it expires within `refresh_margin` seconds.
+        """
+        return self.access_token is None or self._expiring()
+
+    def get(self):
+        """
+        Returns a valid access token, refreshing it first if it expires within `refresh_margin` seconds.
+
+        Returns
+        -------
+        str
+            The access token.
+        """
+        if self.access_token is None and self._initial_token is not None:
+            with self._lock:
+                if self.access_token is None:
+                    self.access_token = self._initial_token()
+        if self.access_token is not None and not self._expiring():
+            return self.access_token
+
+        # this call would have sent an expired token and been rejected
+        if self.access_token is not None:
+            with self._stats_lock:
+                self.avoided_401s += 1
+        with self._lock:
+            if self.access_token is None or self._expiring():
+                self._set(*self._refresh())
+                with self._stats_lock:
+                    self.proactive_refreshes += 1
+            return self.access_token
+
+    def refresh(self, stale_token=None):
+        """
+        Replaces the access token after the API rejected it.
+
+        Parameters
+        ----------
+        stale_token : str, optional
+            The token that was rejected. If another thread has already replaced it, no new token is requested.
+
+        Returns
+        -------
+        str
+            The new access token.
+        """
+        with self._lock:
+            if stale_token is not None and self.access_token is not None and stale_token != self.access_token:
+                with self._stats_lock:
+                    self.skipped_refreshes += 1
+                return self.access_token
+            self._set(*self._refresh())
+            with self._stats_lock:
+                self.reactive_refreshes += 1
+            return self.access_token
+
+    def _set(self, access_token, expires_in):
+        self.access_token = access_token
+        self.expires_at = None if expires_in is None else self._clock() + float(expires_in)
+
+    def stats(self):
+        """
+        Reports how the token was kept fresh.
+
+        Returns
+        -------
+        dict
+            A dictionary with the number of 'proactive_refreshes' made before expiry, 'reactive_refreshes' made after a
+            401, 'skipped_refreshes' already made by another thread, and 'avoided_401s', the calls that would have sent
+            an expiring token.
+        """
+        with self._stats_lock:
+            return {
+                'proactive_refreshes': self.proactive_refreshes,
+                'reactive_refreshes': self.reactive_refreshes,
+                'skipped_refreshes': self.skipped_refreshes,
+                'avoided_401s': self.avoided_401s,
+            }
+
+# %% ../nbs/10_auth.ipynb 6
+class SecretCache:
+    """
+    A thread-safe cache of the secrets read from AWS Secrets Manager, kept for `ttl` seconds.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        How many seconds a secret is kept. Defaults to one hour.
+    clock : callable, optional
+        Returns the current time in seconds. Defaults to `time.monotonic`.
+    """
+    def __init__(self, ttl=3600, clock=time.monotonic):
+        """
+        Initializes a new instance of the SecretCache class.
+
+        Parameters
+        ----------
+        ttl : float, optional
+            How many seconds a secret is kept. Defaults to one hour.
+        clock : callable, optional
+            Returns the current time in seconds. Defaults to `time.monotonic`.
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._secrets = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+
+    def _client(self, region_name):
+        # callers hold the lock
+        if region_name not in self._clients:
+            import boto3
+
+            session = boto3.session.Session()
+            self._clients[region_name] = session.client(service_name='secretsmanager', region_name=region_name)
+        return self._clients[region_name]
+
+    def get(self, secret_name, region_name):
+        """
+        Returns a secret, fetching it from Secrets Manager if it is not cached or has expired. Concurrent callers
+        share one fetch.
+
+        Parameters
+        ----------
+        secret_name : str
+            The name of the secret.
+        region_name : str
+            The AWS region of the secret.
+
+        Returns
+        -------
+        dict
+            The key-value pairs of the secret.
+        """
+        key = (region_name, secret_name)
+        with self._lock:
+            cached = self._secrets.get(key)
+            if cached is not None and self._clock() < cached[1]:
+                self.hits += 1
+                return dict(cached[0])
+            secret_value = self._client(region_name).get_secret_value(SecretId=secret_name)
+            secret = json.loads(secret_value['SecretString'])
+            self._secrets[key] = (secret, self._clock() + self.ttl)
+            self.fetches += 1
+            return dict(secret)
+
+    def clear(self):
+        """
+        Discards the cached secrets, so they are fetched again on next use.
+        """
+        with self._lock:
+            self._secrets.clear()
+
+    def stats(self):
+        """
+        Reports how many secrets were served from the cache and how many were fetched.
+
+        Returns
+        -------
+        dict
+            A dictionary with the 'hits' and 'fetches' counters.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'fetches': self.fetches}
+
+# %% ../nbs/10_auth.ipynb 7
+# shared by every SpotifyAPI and LastFmAPI of the process
+SECRET_CACHE = SecretCache()
@@ -0,0 +1,220 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/12_batch.ipynb.
+
+# %% auto 0
+__all__ = ['PlaylistBatchRunner']
+
+# %% ../nbs/12_batch.ipynb 4
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .retrieve_spotify_data import SpotifyAPI
+from .transport import FairRateLimiter, HTTPTransport
+
+# %% ../nbs/12_batch.ipynb 5
+class PlaylistBatchRunner:
+    """
+    Rotates several playlists of one Spotify account concurrently under a shared rate limit.
+
+    Every playlist gets its own `SpotifyAPI`, and all of them share the access token of the account and one HTTP
+    transport. Each request waits for a `FairRateLimiter` in the playlist's flow, so the playlists take turns at the
+    quota and a large playlist can't hold up the small ones.
+
+    Parameters
+    ----------
+    region_name : str
+        The name of the AWS region where the secrets manager is located.
+    requests_per_second : float, optional
+        The most requests sent per second over all playlists. Defaults to 10.
+    burst : int, optional
+        The number of requests that can be sent at once after an idle period. Defaults to 10.
+    max_workers : int, optional
+        The number of playlists rotated at once. Defaults to 4.
+    lookback_days : int, optional
+        The tracks added more than this many days ago are deleted. Defaults to 7.
+    parallel : bool, optional
+        Whether the pages of each playlist are fetched concurrently. Defaults to False.
+    coalesce : bool, optional
+        Whether to fetch the pages of every playlist first, and look up the artists and audio features of all the
+        playlists together, in full batches. Defaults to False.
+    transport : HTTPTransport, optional
+        The transport shared by the playlists. A new one is created if not given.
+    storage : ArtifactStore, optional
+        Where the new tracks of each playlist are saved, as `<playlist_id>/newer_tracks.parquet`. Defaults to the
+        'spotify-net' S3 bucket.
+    setup : callable, optional
+        Called with every `SpotifyAPI` created, before it is used, for example `SpotifyStandIn.configure`.
+    rate_limiter : RateLimiter, optional
+        The limiter shared by the playlists. Defaults to a `FairRateLimiter` allowing `requests_per_second` and
+        `burst`.
+    """
+    def __init__(self, region_name, requests_per_second=10, burst=10, max_workers=4, lookback_days=7, parallel=False,
+                 coalesce=False, transport=None, storage=None, setup=None, rate_limiter=None):
+        """
+        Initializes a new instance of the PlaylistBatchRunner class.
+
+        Parameters
+        ----------
+        region_name : str
+            The name of the AWS region where the secrets manager is located.
+        requests_per_second : float, optional
+            The most requests sent per second over all playlists. Defaults to 10.
+        burst : int, optional
+            The number of requests that can be sent at once after an idle period. Defaults to 10.
+        max_workers : int, optional
+            The number of playlists rotated at once. Defaults to 4.
+        lookback_days : int, optional
+            The tracks added more than this many days ago are deleted. Defaults to 7.
+        parallel : bool, optional
+            Whether the pages of each playlist are fetched concurrently. Defaults to False.
+        coalesce : bool, optional
+            Whether to fetch the pages of every playlist first, and look up the artists and audio features of all the
+            playlists together, in full batches. Defaults to False.
+        transport : HTTPTransport, optional
+            The transport shared by the playlists. A new one is created if not given.
+        storage : ArtifactStore, optional
+            Where the new tracks of each playlist are saved, as `<playlist_id>/newer_tracks.parquet`. Defaults to the
+            'spotify-net' S3 bucket.
+        setup : callable, optional
+            Called with every `SpotifyAPI` created, before it is used, for example `SpotifyStandIn.configure`.
+        rate_limiter : RateLimiter, optional
+            The limiter shared by the playlists. Defaults to a `FairRateLimiter` allowing `requests_per_second` and
+            `burst`.
+        """
+        self.region_name = region_name
+        self.max_workers = max_workers
+        self.lookback_days = lookback_days
+        self.parallel = parallel
+        self.coalesce = coalesce
+        self.storage = storage
+        self.setup = setup
+        self.rate_limiter = rate_limiter if rate_limiter is not None else FairRateLimiter(requests_per_second, burst)
+        if transport is None:
+            # one pool for every playlist, with a connection per playlist worker and page fetcher
+            transport = HTTPTransport(pool_size=max_workers * (8 if parallel else 1))
+        self.transport = transport
+        # the account's client holds the secrets, the access token and the lookups shared by the playlists
+        self.account = self._client(None)
+        self.report = {}
+
+    def _client(self, playlist_id):
+        shared = {}
+        if playlist_id is not None:
+            shared = {'tokens': self.account.tokens, 'artist_lookup': self.account.artist_lookup,
+                      'feature_lookup': self.account.feature_lookup}
+        api = SpotifyAPI(self.region_name, transport=self.transport.for_flow(self.rate_limiter, playlist_id),
+                         storage=self.storage, **shared)
+        if self.setup is not None:
+            self.setup(api)
+        return api
+
+    def get_secret(self, secret_name):
+        """
+        Retrieves the secret of the account, see `SpotifyAPI.get_secret`.
+
+        Parameters
+        ----------
+        secret_name : str
+            The name of the secret to retrieve.
+        """
+        self.account.get_secret(secret_name)
+
+    def _queue(self, playlist_id):
+        api = self._client(playlist_id)
+        try:
+            api.queue_playlist_features(playlist_id, parallel=self.parallel)
+        except Exception as e:
+            return api, e
+        return api, None
+
+    def rotate(self, playlist_id, api=None):
+        """
+        Rotates one playlist: fetches its tracks, saves the new ones and deletes the old ones.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the Spotify playlist.
+        api : SpotifyAPI, optional
+            The playlist's client, if its lookups were queued already. A new one is created if not given.
+
+        Returns
+        -------
+        dict
+            The playlist's report: its status and error if it failed, its numbers of tracks, new tracks and deleted
+            tracks, its latency in 'seconds', the 'requests' it sent and the seconds they spent waiting for the rate
+            limiter.
+        """
+        return self._rotate(playlist_id, api)
+
+    def _rotate(self, playlist_id, api=None, queue_error=None):
+        api = api if api is not None else self._client(playlist_id)
+        row = {'playlist_id': playlist_id, 'status': 'ok', 'error': None, 'tracks': 0, 'new_tracks': 0, 'deleted': 0}
+        start = time.perf_counter()
+        try:
+            if queue_error is not None:
+                # the playlist failed while it was queued, and is reported without fetching it again
+                raise queue_error
+            api.get_playlist_features(playlist_id, parallel=self.parallel, coalesce=self.coalesce)
+            old_tracks, new_tracks = api.parse_new_tracks(lookback_days=self.lookback_days)
+            api.save_new_tracks(new_tracks, f'{playlist_id}/{api.NEW_TRACKS_FILE}')
+            deletions = api.delete_tracks(old_tracks)
+            row['tracks'] = len(api.df_tracks)
+            row['new_tracks'] = len(new_tracks)
+            row['deleted'] = int(deletions.loc[deletions['status'].between(200, 299), 'tracks'].sum())
+        except Exception as e:
+            row['status'] = 'failed'
+            row['error'] = repr(e)
+        row['seconds'] = time.perf_counter() - start
+        row['requests'] = api.transport.stats()['requests']
+        row['limiter_wait'] = getattr(self.rate_limiter, 'flow_stats', {}).get(playlist_id, {}).get('wait_time', 0.0)
+        return row
+
+    def run(self, playlist_ids):
+        """
+        Rotates the playlists, `max_workers` at a time. A failing playlist doesn't stop the others.
+
+        The aggregate of the run is kept in `report`: the number of playlists and failures, the wall-clock seconds,
+        the requests sent, including the account's token refreshes and lookups, and the calls per second achieved.
+        With `coalesce`, every playlist is queued before any is rotated, and the 'seconds' of a playlist leave out its
+        queueing. A playlist failing while it is queued is reported as failed without being fetched again. The report then adds the 'lookup_calls' sent since the runner was created, the
+        'lookup_minimum_calls' its unique IDs need, and the 'lookup_calls_saved' against looking up every page on
+        its own.
+
+        Parameters
+        ----------
+        playlist_ids : list
+            The IDs of the Spotify playlists.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per playlist, in the order given, as returned by `rotate`.
+        """
+        start = time.perf_counter()
+        account_requests = self.account.transport.stats()['requests']
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            if self.coalesce:
+                clients, errors = zip(*executor.map(self._queue, playlist_ids)) if playlist_ids else ((), ())
+                rows = list(executor.map(self._rotate, playlist_ids, clients, errors))
+            else:
+                rows = list(executor.map(self.rotate, playlist_ids))
+        seconds = time.perf_counter() - start
+
+        results = pd.DataFrame(rows, columns=['playlist_id', 'status', 'error', 'tracks', 'new_tracks', 'deleted',
+                                              'seconds', 'requests', 'limiter_wait'])
+        requests_sent = int(results['requests'].sum()) + self.account.transport.stats()['requests'] - account_requests
+        self.report = {
+            'playlists': len(results),
+            'failed': int((results['status'] != 'ok').sum()),
+            'seconds': seconds,
+            'requests': requests_sent,
+            'calls_per_second': requests_sent / seconds if seconds else 0.0,
+            'requests_per_second_limit': self.rate_limiter.rate,
+        }
+        if self.coalesce:
+            lookups = [self.account.artist_lookup.stats(), self.account.feature_lookup.stats()]
+            for key in ['calls', 'minimum_calls', 'calls_saved']:
+                self.report[f'lookup_{key}'] = sum(stats[key] for stats in lookups)
+        return results
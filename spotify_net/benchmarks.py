@@ -0,0 +1,1005 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/05_benchmarks.ipynb.
+
+# %% auto 0
+__all__ = ['HEAVY_PACKAGES', 'measure', 'SyntheticSpotifyAPI', 'bench_playlist_ingestion', 'synthetic_track_frame',
+           'bench_parse_new_tracks', 'synthetic_model_prep', 'bench_feature_preparation', 'bench_storage_formats',
+           'bench_load_s3', 'synthetic_track_pairs', 'bench_track_matching', 'bench_pipeline', 'bench_batch_runner',
+           'bench_async_client', 'bench_coalescing', 'bench_compact_schema', 'bench_genre_encoding', 'write_results',
+           'bench_import_time']
+
+# %% ../nbs/05_benchmarks.ipynb 4
+import asyncio
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import StandardScaler
+
+import spotify_net
+from .async_spotify import AsyncSpotifyAPI
+from .batch import PlaylistBatchRunner
+from .cli import STAGES
+from .instrumentation import Instrumentation
+from .matching import TrackMatcher
+from .retrieve_last_fm_data import LastFmAPI
+from .prep_features_for_model import FeatureTransformer, ModelPrep
+from .retrieve_spotify_data import SpotifyAPI
+from .schema import GenreMatrix, compact_track_frame, memory_by_group
+from .standins import (AUDIO_FEATURE_COLUMNS, LastFmStandIn, S3StandIn, SpotifyStandIn,
+                                  synthetic_audio_features, synthetic_playlist)
+from .storage import LocalStore, S3Store
+from .transport import FairRateLimiter, HTTPTransport, RateLimiter
+
+# %% ../nbs/05_benchmarks.ipynb 5
+def measure(func, *args, **kwargs):
+    """
+    Runs a function twice, once timed and once under tracemalloc, and reports both.
+
+    Parameters
+    ----------
+    func : callable
+        The function to measure.
+    *args, **kwargs
+        Passed on to `func`.
+
+    Returns
+    -------
+    dict
+        A dictionary with the wall-clock 'seconds' of the first run and the 'peak_mb' allocated during the second.
+    """
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': seconds, 'peak_mb': peak / 2**20}
+
+# %% ../nbs/05_benchmarks.ipynb 6
+class SyntheticSpotifyAPI(SpotifyAPI):
+    """
+    A SpotifyAPI that serves a synthetic playlist from memory instead of calling the Spotify API.
+
+    Parameters
+    ----------
+    num_tracks : int
+        The number of tracks in the playlist.
+    num_artists : int, optional
+        The number of distinct artists. Defaults to one per ten tracks.
+    num_genres : int, optional
+        The size of the genre vocabulary. Defaults to 500.
+    seed : int, optional
+        The random seed. Defaults to 0.
+    """
+    FEATURE_COLUMNS = AUDIO_FEATURE_COLUMNS
+
+    def __init__(self, num_tracks, num_artists=None, num_genres=500, seed=0, **kwargs):
+        """
+        Initializes a new instance of the SyntheticSpotifyAPI class.
+
+        Parameters
+        ----------
+        num_tracks : int
+            The number of tracks in the playlist.
+        num_artists : int, optional
+            The number of distinct artists. Defaults to one per ten tracks.
+        num_genres : int, optional
+            The size of the genre vocabulary. Defaults to 500.
+        seed : int, optional
+            The random seed. Defaults to 0.
+        **kwargs
+            Passed on to `SpotifyAPI`.
+        """
+        super().__init__('us-east-2', **kwargs)
+        self.items, self.artist_genres = synthetic_playlist(num_tracks, num_artists, num_genres, seed)
+
+    def get_track_page(self, playlist_id, offset):
+        return {'items': self.items[offset:offset+self.PAGE_SIZE], 'total': len(self.items)}
+
+    def get_artist_genres(self, artist_ids):
+        return {a: self.artist_genres[a] for a in artist_ids}
+
+    def get_audio_features(self, track_ids):
+        return pd.DataFrame([synthetic_audio_features(t) for t in track_ids], columns=self.FEATURE_COLUMNS)
+
+# %% ../nbs/05_benchmarks.ipynb 7
+def _append_page_by_page(api, playlist_id):
+    """
+    The page accumulation `get_playlist_features` used before `TrackFrameBuilder`: every page is appended to the
+    frame built so far, which copies it each time.
+    """
+    offset = 0
+    while True:
+        page = api.get_subset_features(api.get_track_subset(playlist_id, offset))
+        api.df_tracks = pd.concat([api.df_tracks, page.loc[:, ~page.columns.duplicated()]])
+        if len(page) < api.PAGE_SIZE:
+            break
+        offset += api.PAGE_SIZE
+    api.df_tracks = api.df_tracks.drop_duplicates()
+
+
+def bench_playlist_ingestion(sizes=(1000, 10000, 100000), legacy_max_size=10000):
+    """
+    Compares `SpotifyAPI.get_playlist_features` with page-by-page appending on synthetic playlists.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        The playlist sizes to measure. Defaults to 1k, 10k and 100k tracks.
+    legacy_max_size : int, optional
+        The largest size at which page-by-page appending is measured, since it grows quadratically. Defaults to 10000.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per size and method, with the seconds, seconds per 1,000 tracks and peak memory.
+    """
+    results = []
+    for size in sizes:
+        api = SyntheticSpotifyAPI(size)
+        methods = {'builder': lambda: SpotifyAPI.get_playlist_features(api, 'synthetic')}
+        if size <= legacy_max_size:
+            methods['append'] = lambda: _append_page_by_page(api, 'synthetic')
+
+        for method, run in methods.items():
+            def fresh_run():
+                api.df_tracks = pd.DataFrame()
+                run()
+            result = measure(fresh_run)
+            results.append({'tracks': size, 'method': method, **result,
+                            'seconds_per_1k': result['seconds'] / size * 1000})
+
+    return pd.DataFrame(results)
+
+# %% ../nbs/05_benchmarks.ipynb 8
+def _parse_new_tracks_apply(api, lookback_days=7):
+    """
+    The implementation of `SpotifyAPI.parse_new_tracks` before it was vectorized: three row-by-row `apply` passes.
+    """
+    api.df_tracks = api.df_tracks.sort_values('added at')
+    today = pd.to_datetime(date.today(), utc=True)
+    api.df_tracks['diff'] = api.df_tracks['added at'].apply(lambda x: today - x)
+    lookback_period = timedelta(days=lookback_days)
+    new_tracks = api.df_tracks[api.df_tracks['diff'].apply(lambda x: x <= lookback_period)]
+    old_tracks = api.df_tracks[api.df_tracks['diff'].apply(lambda x: x > lookback_period)]
+    return old_tracks, new_tracks
+
+
+def synthetic_track_frame(num_tracks, days=365, seed=0):
+    """
+    Builds a track frame with sorted 'added at' times spread over the last `days` days and a few feature columns.
+
+    Parameters
+    ----------
+    num_tracks : int
+        The number of rows.
+    days : int, optional
+        The span of the 'added at' times, ending today. Defaults to 365.
+    seed : int, optional
+        The random seed. Defaults to 0.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The synthetic track frame.
+    """
+    rng = np.random.default_rng(seed)
+    today = pd.to_datetime(date.today(), utc=True)
+    offsets = np.sort(rng.uniform(0, days * 24 * 60 * 60, num_tracks))[::-1]
+    return pd.DataFrame({
+        'added at': today - pd.to_timedelta(offsets, unit='s'),
+        'id': [f'track{i:07d}' for i in range(num_tracks)],
+        'danceability': rng.random(num_tracks),
+        'energy': rng.random(num_tracks),
+        'tempo': rng.uniform(60, 180, num_tracks),
+    })
+
+
+def bench_parse_new_tracks(sizes=(1000, 10000, 100000, 1000000), lookback_days=7):
+    """
+    Compares `SpotifyAPI.parse_new_tracks`, with and without copying, to the row-by-row `apply` implementation it replaced.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        The playlist sizes to measure. Defaults to 1k, 10k, 100k and 1M tracks.
+    lookback_days : int, optional
+        The lookback period passed to each implementation. Defaults to 7.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per size and method, with the seconds and peak memory.
+    """
+    api = SpotifyAPI('us-east-2')
+    methods = {
+        'apply': lambda: _parse_new_tracks_apply(api, lookback_days),
+        'vectorized': lambda: api.parse_new_tracks(lookback_days),
+        'views': lambda: api.parse_new_tracks(lookback_days, copy=False),
+    }
+
+    results = []
+    for size in sizes:
+        frame = synthetic_track_frame(size)
+        for method, run in methods.items():
+            def fresh_run():
+                api.df_tracks = frame.copy(deep=False)
+                run()
+            results.append({'tracks': size, 'method': method, **measure(fresh_run)})
+
+    return pd.DataFrame(results)
+
+# %% ../nbs/05_benchmarks.ipynb 9
+def synthetic_model_prep(num_tracks, num_genres=500, n_components=60, seed=0):
+    """
+    Builds a `ModelPrep` with a fitted scaler and SVD, its vocabularies, and a prepped frame shaped like the output of
+    `ModelPrep.load_tracks_data`, with up to three genres per track.
+
+    Parameters
+    ----------
+    num_tracks : int
+        The number of rows of the prepped frame.
+    num_genres : int, optional
+        The size of the genre vocabulary. Defaults to 500.
+    n_components : int, optional
+        The number of SVD components. Defaults to 60.
+    seed : int, optional
+        The random seed. Defaults to 0.
+
+    Returns
+    -------
+    ModelPrep
+        The synthetic model preparation, ready for `transform_features` or `prepare_features`.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = [f'genre {i}' for i in range(num_genres)]
+    genres = np.zeros((num_tracks, num_genres))
+    for _ in range(3):
+        rows = np.flatnonzero(rng.random(num_tracks) < 0.8)
+        genres[rows, rng.integers(0, num_genres, len(rows))] = 1
+    frame = pd.DataFrame({
+        'name': [f'TRACK {i}' for i in range(num_tracks)],
+        'artist': [f'ARTIST {i % 1000}' for i in range(num_tracks)],
+        'danceability': rng.random(num_tracks),
+        'energy': rng.random(num_tracks),
+        'key': rng.integers(0, 12, num_tracks),
+        'loudness': rng.uniform(-30, 0, num_tracks),
+        'mode': rng.integers(0, 2, num_tracks),
+        'speechiness': rng.random(num_tracks),
+        'acousticness': rng.random(num_tracks),
+        'instrumentalness': rng.random(num_tracks),
+        'liveness': rng.random(num_tracks),
+        'valence': rng.random(num_tracks),
+        'tempo': rng.uniform(60, 180, num_tracks),
+        'duration_ms': rng.integers(120000, 360000, num_tracks),
+        'time_signature': rng.integers(3, 6, num_tracks),
+    })
+    present = genres.any(axis=0)
+    genre_columns = [f'genre_{g}' for g, p in zip(vocabulary, present) if p]
+    frame = pd.concat([frame, pd.DataFrame(genres[:, present], columns=genre_columns)], axis=1)
+
+    prep = ModelPrep()
+    prep.scaler = StandardScaler().fit(rng.random((1000, len(FeatureTransformer.SCALE_COLUMNS))))
+    prep.svd = TruncatedSVD(n_components, random_state=seed).fit(rng.random((n_components * 4, num_genres)) < 0.01)
+    prep.genre_series = pd.Series(vocabulary)
+    prep.key_series = pd.Series([f'key_{k}' for k in range(12)])
+    prep.time_signature_series = pd.Series([f'time_signature_{t}' for t in (1, 3, 4, 5, 7)])
+    prep.prepped_frame = frame
+    return prep
+
+
+def bench_feature_preparation(sizes=(1000, 10000, 100000), dense_max_size=10000, constant=0.0000001):
+    """
+    Compares `ModelPrep.prepare_features` with `transform_features` followed by `prepare_final_frame`, with and
+    without the genre embedding.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        The numbers of rows to measure. Defaults to 1k, 10k and 100k rows.
+    dense_max_size : int, optional
+        The largest size at which the dense genre matrix is measured. Defaults to 10000.
+    constant : float, optional
+        The constant passed to each implementation. Defaults to 0.0000001.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per size and method, with the seconds, rows per second and peak memory.
+    """
+    results = []
+    for size in sizes:
+        prep = synthetic_model_prep(size)
+        frame = prep.prepped_frame
+        methods = {
+            'embedding': lambda: (prep.transform_features(constant), prep.prepare_final_frame()),
+            'compiled': lambda: prep.prepare_features(constant),
+        }
+        if size <= dense_max_size:
+            methods['dense'] = lambda: (prep.transform_features(constant), prep.prepare_final_frame(use_embedding=False))
+
+        for method, run in methods.items():
+            def fresh_run():
+                prep.prepped_frame = frame.copy()
+                run()
+            result = measure(fresh_run)
+            results.append({'tracks': size, 'method': method, **result, 'rows_per_second': size / result['seconds']})
+
+    return pd.DataFrame(results)
+
+# %% ../nbs/05_benchmarks.ipynb 10
+def bench_storage_formats(sizes=(1000, 10000, 100000), formats=('csv', 'parquet')):
+    """
+    Compares the size and the write and read times of the new-tracks hand-off written as CSV and as Parquet, using a
+    `LocalStore` in a temporary directory.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        The playlist sizes to measure. Defaults to 1k, 10k and 100k tracks.
+    formats : tuple, optional
+        The file extensions to compare. Defaults to CSV and Parquet.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per size and format, with the file size in bytes and the seconds to write, to read every column and to
+        read only the columns `ModelPrep.load_tracks_data` keeps.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        store = LocalStore(root)
+        for size in sizes:
+            api = SyntheticSpotifyAPI(size)
+            api.get_playlist_features('synthetic')
+            _, tracks = api.parse_new_tracks(lookback_days=365 * 100)
+            keep = lambda c: c not in ModelPrep.DROP_COLUMNS
+            for fmt in formats:
+                name = f'tracks_{size}.{fmt}'
+                result = {'tracks': size, 'format': fmt}
+                for step, run in (('write_seconds', lambda: store.write_frame(tracks, name)),
+                                  ('read_seconds', lambda: store.read_frame(name)),
+                                  ('projected_read_seconds', lambda: store.read_frame(name, columns=keep))):
+                    start = time.perf_counter()
+                    run()
+                    result[step] = time.perf_counter() - start
+                result['bytes'] = os.path.getsize(store.path(name))
+                results.append(result)
+
+    return pd.DataFrame(results)
+
+# %% ../nbs/05_benchmarks.ipynb 11
+def bench_load_s3(latencies=(0.05, 0.2), max_workers=(1, 6), num_tracks=10000):
+    """
+    Compares sequential and concurrent `ModelPrep.load_s3` against an `S3StandIn` that delays every request.
+
+    Parameters
+    ----------
+    latencies : tuple, optional
+        The per-request delays in seconds to measure. Defaults to 50 and 200 milliseconds.
+    max_workers : tuple, optional
+        The numbers of concurrent loaders to compare. Defaults to 1 and 6.
+    num_tracks : int, optional
+        The number of tracks in the stored hand-off. Defaults to 10000.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per latency and number of loaders, with the seconds of the whole load and of every loader.
+    """
+    prep = synthetic_model_prep(num_tracks)
+    results = []
+    with S3StandIn() as s3:
+        store = S3Store(ModelPrep.S3_BUCKET, client=s3.client())
+        store.write_bytes(ModelPrep.SCALER_FILE, pickle.dumps(prep.scaler))
+        store.write_bytes(ModelPrep.SVD_FILE, pickle.dumps(prep.svd))
+        store.write_frame(prep.prepped_frame, ModelPrep.SPOTIFY_TRACKS_FILE)
+        store.write_frame(prep.prepped_frame[['name', 'artist']], ModelPrep.LASTFM_TRACKS_FILE)
+        store.write_frame(prep.genre_series, ModelPrep.GENRES_SVD_FILE)
+        store.write_frame(prep.key_series, ModelPrep.KEY_LIST_FILE)
+        store.write_frame(prep.time_signature_series, ModelPrep.TIMESIG_LIST_FILE)
+
+        for latency in latencies:
+            s3.latency = latency
+            for workers in max_workers:
+                loader = ModelPrep(store)
+                loader.load_s3(max_workers=workers)
+                results.append({'latency': latency, 'max_workers': workers, **loader.load_timings})
+
+    return pd.DataFrame(results)
+
+# %% ../nbs/05_benchmarks.ipynb 12
+def synthetic_track_pairs(num_spotify, num_lastfm, seed=0):
+    """
+    Builds Spotify and Last.fm track lists sharing half of the Spotify tracks. A quarter of the shared Spotify names
+    differ from their Last.fm name by case, a third by a version suffix, and the rest by punctuation or full-width
+    characters.
+
+    Parameters
+    ----------
+    num_spotify : int
+        The number of Spotify tracks.
+    num_lastfm : int
+        The number of Last.fm tracks.
+    seed : int, optional
+        The random seed. Defaults to 0.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The Spotify tracks, with 'name' and 'artist' columns.
+    pandas.DataFrame
+        The Last.fm tracks, with 'name', 'artist' and 'playcount' columns.
+    """
+    rng = np.random.default_rng(seed)
+    lastfm = pd.DataFrame({
+        'name': [f'Song {i}' for i in range(num_lastfm)],
+        'artist': [f'Artist {i % 5000}' for i in range(num_lastfm)],
+        'playcount': rng.integers(1, 100, num_lastfm),
+    })
+    shared = rng.integers(0, num_lastfm, num_spotify // 2)
+    variants = [str.upper, lambda x: f'{x} - Remastered 2011', lambda x: f'{x} (Mono Version)',
+                lambda x: f'{x}!', lambda x: x.translate({ord(c): ord(c) + 0xFEE0 for c in '0123456789'})]
+    names = [variants[i % len(variants)](lastfm['name'][j]) for i, j in enumerate(shared)]
+    spotify = pd.DataFrame({
+        'name': names + [f'Other {i}' for i in range(num_spotify - len(shared))],
+        'artist': lastfm['artist'].to_numpy()[shared].tolist() + ['Artist 0'] * (num_spotify - len(shared)),
+    })
+    return spotify, lastfm
+
+
+def _merge_upper(spotify_tracks, lastfm_tracks):
+    """
+    The join `ModelPrep.load_tracks_data` used before `TrackMatcher`: upper-case both sides cell by cell and merge.
+    """
+    spotify_tracks = spotify_tracks.copy()
+    lastfm_tracks = lastfm_tracks.copy()
+    spotify_tracks[['name', 'artist']] = spotify_tracks[['name', 'artist']].applymap(str.upper)
+    lastfm_tracks[['name', 'artist']] = lastfm_tracks[['name', 'artist']].applymap(str.upper)
+    return pd.merge(spotify_tracks, lastfm_tracks, on=['name', 'artist'])
+
+
+def bench_track_matching(sizes=(10000, 100000), num_lastfm=500000):
+    """
+    Compares `TrackMatcher` with the upper-case merge it replaced, in time and match rate.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        The numbers of Spotify tracks to measure. Defaults to 10k and 100k.
+    num_lastfm : int, optional
+        The number of Last.fm tracks. Defaults to 500k.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per size and method, with the seconds and the share of Spotify tracks matched.
+    """
+    results = []
+    for size in sizes:
+        spotify, lastfm = synthetic_track_pairs(size, num_lastfm)
+        start = time.perf_counter()
+        merged = _merge_upper(spotify, lastfm)
+        results.append({'tracks': size, 'method': 'merge', 'seconds': time.perf_counter() - start,
+                        'match_rate': len(merged) / size})
+
+        start = time.perf_counter()
+        matcher = TrackMatcher(lastfm)
+        matcher.join(spotify)
+        results.append({'tracks': size, 'method': 'matcher', 'seconds': time.perf_counter() - start,
+                        'match_rate': matcher.report['match_rate'],
+                        'index_seconds': matcher.report['index_seconds'],
+                        'match_seconds': matcher.report['match_seconds']})
+
+    return pd.DataFrame(results)
+
+# %% ../nbs/05_benchmarks.ipynb 13
+def bench_pipeline(sizes=(1000, 10000, 100000), latency=0.0, num_genres=500, lookback_days=7):
+    """
+    Runs the whole weekly pipeline against local stand-ins and times every stage: `SpotifyAPI` against a
+    `SpotifyStandIn`, `LastFmAPI` against a `LastFmStandIn`, and the hand-offs and `ModelPrep` against an `S3StandIn`
+    holding a synthetic scaler and SVD.
+
+    The Spotify access token starts out expired, so the first stage includes one refresh.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        The playlist sizes to run. Defaults to 1k, 10k and 100k tracks.
+    latency : float, optional
+        The number of seconds every stand-in delays each request by. Defaults to 0.
+    num_genres : int, optional
+        The size of the genre vocabulary. Defaults to 500.
+    lookback_days : int, optional
+        The lookback period passed to `SpotifyAPI.parse_new_tracks`. Defaults to 7.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per size and stage, with the seconds, the rows the stage returned and the requests it sent.
+    """
+    artifacts = synthetic_model_prep(10, num_genres=num_genres)
+    saved_environ = dict(os.environ)
+    results = []
+    try:
+        for size in sizes:
+            with SpotifyStandIn(size, num_genres=num_genres, latency=latency) as spotify_server, \
+                    LastFmStandIn(size, latency=latency) as lastfm_server, \
+                    S3StandIn(latency=latency) as s3_server:
+                storage = S3Store(ModelPrep.S3_BUCKET, client=s3_server.client())
+                storage.write_bytes(ModelPrep.SCALER_FILE, pickle.dumps(artifacts.scaler))
+                storage.write_bytes(ModelPrep.SVD_FILE, pickle.dumps(artifacts.svd))
+                storage.write_frame(artifacts.genre_series, ModelPrep.GENRES_SVD_FILE)
+                storage.write_frame(artifacts.key_series, ModelPrep.KEY_LIST_FILE)
+                storage.write_frame(artifacts.time_signature_series, ModelPrep.TIMESIG_LIST_FILE)
+
+                spotify = SpotifyAPI('us-east-2', storage=storage)
+                os.environ.update(spotify_server.configure(spotify))
+                lastfm = LastFmAPI('us-east-1', storage=storage)
+                os.environ.update(lastfm_server.configure(lastfm))
+                prep = ModelPrep(storage)
+                tracks = {}
+
+                def get_playlist_features():
+                    spotify.get_playlist_features('synthetic')
+                    return spotify.df_tracks
+
+                def parse_new_tracks():
+                    tracks['old'], tracks['new'] = spotify.parse_new_tracks(lookback_days)
+                    return tracks['new']
+
+                def get_top_tracks():
+                    tracks['top'] = lastfm.get_top_tracks()
+                    return tracks['top']
+
+                def load_s3():
+                    prep.load_s3()
+                    return prep.prepped_frame
+
+                def prepare_features():
+                    prep.prepare_features(0.0000001)
+                    return prep.prepped_frame
+
+                stages = [
+                    ('spotify.get_playlist_features', spotify_server, get_playlist_features),
+                    ('spotify.parse_new_tracks', None, parse_new_tracks),
+                    ('spotify.save_new_tracks', s3_server, lambda: spotify.save_new_tracks(tracks['new'])),
+                    ('spotify.delete_tracks', spotify_server, lambda: spotify.delete_tracks(tracks['old'])),
+                    ('lastfm.get_top_tracks', lastfm_server, get_top_tracks),
+                    ('lastfm.save_top_tracks', s3_server, lambda: lastfm.save_top_tracks(tracks['top'])),
+                    ('modelprep.load_s3', s3_server, load_s3),
+                    ('modelprep.prepare_features', None, prepare_features),
+                    ('modelprep.save_prepared_frame', s3_server, prep.save_prepared_frame),
+                ]
+                for stage, server, run in stages:
+                    requests_before = len(server.requests) if server is not None else 0
+                    start = time.perf_counter()
+                    output = run()
+                    seconds = time.perf_counter() - start
+                    results.append({
+                        'tracks': size,
+                        'stage': stage,
+                        'seconds': seconds,
+                        'rows': len(output) if isinstance(output, pd.DataFrame) else None,
+                        'requests': len(server.requests) - requests_before if server is not None else 0,
+                    })
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_environ)
+
+    return pd.DataFrame(results)
+
+
+def bench_batch_runner(large_size=3000, small_size=300, num_small=8, requests_per_second=20, latency=0.01):
+    """
+    Rotates one large and several small playlists with a `PlaylistBatchRunner` against a `SpotifyStandIn`, once
+    with a plain `RateLimiter` and once with a `FairRateLimiter`, to show how the shared quota is split. All
+    playlists run at once and fetch their pages concurrently.
+
+    Parameters
+    ----------
+    large_size : int, optional
+        The number of tracks in the large playlist. Defaults to 3000.
+    small_size : int, optional
+        The number of tracks in each small playlist. Defaults to 300.
+    num_small : int, optional
+        The number of small playlists. Defaults to 8.
+    requests_per_second : float, optional
+        The rate limit shared by the playlists, low enough to be the bottleneck. Defaults to 20.
+    latency : float, optional
+        The number of seconds the stand-in delays each request by. Defaults to 0.01.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per limiter and playlist, with the playlist's latency, requests and time spent waiting for the
+        limiter, and the calls per second the whole run achieved.
+    """
+    playlists = {'large': large_size, **{f'small-{i}': small_size for i in range(num_small)}}
+    saved_environ = dict(os.environ)
+    results = []
+    try:
+        for name, limiter in [('fifo', RateLimiter(requests_per_second, burst=10)),
+                              ('fair', FairRateLimiter(requests_per_second, burst=10))]:
+            with SpotifyStandIn(small_size, latency=latency) as server, tempfile.TemporaryDirectory() as directory:
+                for seed, (playlist_id, size) in enumerate(playlists.items()):
+                    server.add_playlist(playlist_id, size, seed=seed)
+                runner = PlaylistBatchRunner('us-east-2', max_workers=len(playlists), parallel=True,
+                                             storage=LocalStore(directory), setup=server.configure,
+                                             rate_limiter=limiter)
+                os.environ.update(server.configure(runner.account))
+                report = runner.run(list(playlists))
+                report.insert(0, 'limiter', name)
+                report['calls_per_second'] = runner.report['calls_per_second']
+                results.append(report.drop(columns=['error']))
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_environ)
+
+    return pd.concat(results, ignore_index=True)
+
+
+def bench_async_client(num_tracks=5000, latency=0.05, max_workers=8, max_concurrency=64):
+    """
+    Fetches the same playlist from a `SpotifyStandIn` with `SpotifyAPI`, one page at a time and with its pool of
+    page workers, and with `AsyncSpotifyAPI`, and checks that the three frames are equal.
+
+    Parameters
+    ----------
+    num_tracks : int, optional
+        The number of tracks in the playlist. Defaults to 5000.
+    latency : float, optional
+        The number of seconds the stand-in delays each request by. Defaults to 0.05.
+    max_workers : int, optional
+        The number of pages `SpotifyAPI` fetches at once. Defaults to 8.
+    max_concurrency : int, optional
+        The most requests `AsyncSpotifyAPI` has in flight at once. Defaults to 64.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per client, with its wall-clock seconds, the requests it sent and the resulting requests per second.
+    """
+    saved_environ = dict(os.environ)
+    results, frames = [], []
+    try:
+        with SpotifyStandIn(num_tracks, latency=latency) as server, tempfile.TemporaryDirectory() as directory:
+            for name, parallel in [('sync', False), ('sync_parallel', True)]:
+                spot = SpotifyAPI('us-east-2', storage=LocalStore(directory))
+                os.environ.update(server.configure(spot))
+                start = time.perf_counter()
+                spot.get_playlist_features('playlist', parallel=parallel, max_workers=max_workers)
+                seconds = time.perf_counter() - start
+                results.append({'client': name, 'seconds': seconds, 'requests': spot.transport.stats()['requests']})
+                frames.append(spot.df_tracks)
+
+            async def fetch():
+                async with AsyncSpotifyAPI('us-east-2', max_concurrency=max_concurrency,
+                                           storage=LocalStore(directory)) as spot:
+                    server.configure(spot)
+                    start = time.perf_counter()
+                    await spot.get_playlist_features('playlist')
+                    seconds = time.perf_counter() - start
+                    return spot, seconds
+
+            spot, seconds = asyncio.run(fetch())
+            results.append({'client': 'async', 'seconds': seconds,
+                            'requests': spot.async_transport.stats()['requests'] + spot.transport.stats()['requests']})
+            frames.append(spot.df_tracks)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_environ)
+
+    for frame in frames[1:]:
+        pd.testing.assert_frame_equal(frames[0], frame)
+    results = pd.DataFrame(results)
+    results['requests_per_second'] = results['requests'] / results['seconds']
+    return results
+
+
+def bench_coalescing(num_tracks=2000, num_playlists=4):
+    """
+    Counts the artists and audio-features requests sent to a `SpotifyStandIn` when looking them up page by page and
+    when coalescing them, for one playlist with `SpotifyAPI` and for several playlists of one account with a
+    `PlaylistBatchRunner`. The synthetic playlists share most of their artists and tracks.
+
+    Parameters
+    ----------
+    num_tracks : int, optional
+        The number of tracks in each playlist. Defaults to 2000.
+    num_playlists : int, optional
+        The number of playlists rotated by the batch runner. Defaults to 4.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per client and mode, with the artists and audio-features requests sent, the fewest requests the
+        unique artists and tracks need, and the seconds taken.
+    """
+    playlist_ids = [f'playlist-{i}' for i in range(num_playlists)]
+    # both modes see the same playlists, with the last tracks new
+    first_added = pd.Timestamp.now(tz='UTC').floor('s') - pd.Timedelta(minutes=10 * num_tracks)
+    saved_environ = dict(os.environ)
+    results, frames = [], []
+    try:
+        for coalesce in [False, True]:
+            with SpotifyStandIn(num_tracks, start=first_added) as server, tempfile.TemporaryDirectory() as directory:
+                for seed, playlist_id in enumerate(playlist_ids):
+                    server.add_playlist(playlist_id, num_tracks, seed=seed, start=first_added)
+                items = [server.playlists[playlist_id]['items'] for playlist_id in playlist_ids]
+
+                instrumentation = Instrumentation(enabled=True, track_memory=False)
+                spot = SpotifyAPI('us-east-2', storage=LocalStore(directory), instrumentation=instrumentation)
+                os.environ.update(server.configure(spot))
+                start = time.perf_counter()
+                spot.get_playlist_features(playlist_ids[0], coalesce=coalesce)
+                results.append({'client': 'SpotifyAPI', 'coalesce': coalesce, 'seconds': time.perf_counter() - start,
+                                **_lookup_requests(instrumentation, items[:1])})
+                frames.append(spot.df_tracks)
+
+                instrumentation = Instrumentation(enabled=True, track_memory=False)
+                runner = PlaylistBatchRunner('us-east-2', requests_per_second=1e6, coalesce=coalesce,
+                                             transport=HTTPTransport(instrumentation=instrumentation),
+                                             storage=LocalStore(directory), setup=server.configure)
+                start = time.perf_counter()
+                runner.run(playlist_ids)
+                results.append({'client': 'PlaylistBatchRunner', 'coalesce': coalesce,
+                                'seconds': time.perf_counter() - start, **_lookup_requests(instrumentation, items)})
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_environ)
+
+    pd.testing.assert_frame_equal(frames[0], frames[1])
+    return pd.DataFrame(results)
+
+
+def _lookup_requests(instrumentation, playlists):
+    """
+    Sums the artists and audio-features requests counted by an instrumentation, and the fewest requests the unique
+    artists and tracks of the playlists' items need.
+    """
+    requests = {'spotify.artists': 0, 'spotify.audio_features': 0}
+    for entry in instrumentation.snapshot()['http']:
+        if entry['endpoint'] in requests:
+            requests[entry['endpoint']] += entry['requests']
+    artists = {item['track']['artists'][0]['id'] for items in playlists for item in items}
+    tracks = {item['track']['id'] for items in playlists for item in items}
+    return {
+        'artist_requests': requests['spotify.artists'],
+        'feature_requests': requests['spotify.audio_features'],
+        'minimum_requests': -(-len(artists) // 50) + -(-len(tracks) // 100),
+    }
+
+
+def bench_compact_schema(sizes=(100000, 1000000), num_genres=100, ingestion_max_size=100000, constant=0.0000001):
+    """
+    Compares the memory of the track frames in the default and the compact schema: `SpotifyAPI.df_tracks`, and the
+    `ModelPrep.prepped_frame` before and after `prepare_features`. Each frame is built once per schema, without
+    tracemalloc, which would slow the largest sizes down several times over.
+
+    Up to `ingestion_max_size`, `df_tracks` is built by `get_playlist_features` from a synthetic playlist. The
+    synthetic playlist and its pages take several times the memory of the frame, so larger sizes repeat the largest
+    playlist built, and the compact frame is converted from the default one by `compact_track_frame`.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        The numbers of tracks to measure. Defaults to 100k and 1M tracks.
+    num_genres : int, optional
+        The size of the genre vocabulary. Defaults to 100, so the default schema of 1M tracks fits in memory.
+    ingestion_max_size : int, optional
+        The largest size at which `df_tracks` is built from a synthetic playlist. Defaults to 100000.
+    constant : float, optional
+        The constant passed to `prepare_features`. Defaults to 0.0000001.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per size, frame and schema, with how the frame was built, the seconds it took, and the bytes per
+        track of the genre columns, the other numeric columns, the remaining columns and the whole frame.
+    """
+    results = []
+    ingested = None
+    for size in sizes:
+        for compact in [False, True]:
+            schema = 'compact' if compact else 'default'
+            if size <= ingestion_max_size:
+                api = SyntheticSpotifyAPI(size, num_genres=num_genres, compact=compact)
+                start = time.perf_counter()
+                api.get_playlist_features('synthetic')
+                seconds = time.perf_counter() - start
+                frame, method = api.df_tracks, 'get_playlist_features'
+                if not compact:
+                    ingested = frame
+                del api
+            else:
+                frame = pd.concat([ingested] * -(-size // len(ingested)), ignore_index=True).iloc[:size]
+                start = time.perf_counter()
+                if compact:
+                    frame = compact_track_frame(frame)
+                seconds = time.perf_counter() - start
+                method = 'compact_track_frame' if compact else 'repeated'
+            results.append({'tracks': size, 'frame': 'df_tracks', 'schema': schema, 'method': method,
+                            'seconds': seconds, **_bytes_per_track(frame)})
+            del frame
+
+            prep = synthetic_model_prep(size, num_genres)
+            prep.compact = compact
+            start = time.perf_counter()
+            if compact:
+                prep.prepped_frame = compact_track_frame(prep.prepped_frame)
+            seconds = time.perf_counter() - start
+            results.append({'tracks': size, 'frame': 'prepped_frame', 'schema': schema,
+                            'method': 'compact_track_frame' if compact else 'synthetic', 'seconds': seconds,
+                            **_bytes_per_track(prep.prepped_frame)})
+            start = time.perf_counter()
+            prep.prepare_features(constant)
+            seconds = time.perf_counter() - start
+            results.append({'tracks': size, 'frame': 'prepared frame', 'schema': schema,
+                            'method': 'prepare_features', 'seconds': seconds, **_bytes_per_track(prep.prepped_frame)})
+            del prep
+
+    return pd.DataFrame(results)
+
+
+def _bytes_per_track(frame):
+    """
+    Divides the memory of a frame, as measured by `memory_by_group`, by its number of rows.
+    """
+    return {f'{group}_bytes_per_track': usage / len(frame) for group, usage in memory_by_group(frame).items()}
+
+
+def bench_genre_encoding(sizes=(10000, 100000), num_genres=500, constant=0.0000001):
+    """
+    Compares keeping the genres of a synthetic playlist as one-hot `genre_*` columns with keeping them in a
+    `GenreMatrix`, from `SpotifyAPI.get_playlist_features` through `ModelPrep.prepare_features`. Both give the same
+    prepared frame.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        The playlist sizes to measure. Defaults to 10k and 100k tracks.
+    num_genres : int, optional
+        The size of the genre vocabulary. Defaults to 500.
+    constant : float, optional
+        The constant passed to `prepare_features`. Defaults to 0.0000001.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per size, encoding and method, with the seconds and peak memory, and the megabytes of the tracks and
+        their genres once built.
+    """
+    template = synthetic_model_prep(10, num_genres)
+    results = []
+    for size in sizes:
+        prepared = {}
+        for sparse_genres in [False, True]:
+            genres = 'genre matrix' if sparse_genres else 'one-hot'
+            api = SyntheticSpotifyAPI(size, num_genres=num_genres, sparse_genres=sparse_genres)
+
+            def get_playlist_features():
+                api.df_tracks = pd.DataFrame()
+                if sparse_genres:
+                    api.genre_matrix = GenreMatrix()
+                api.get_playlist_features('synthetic')
+            result = measure(get_playlist_features)
+            tracks = api.df_tracks
+            size_bytes = memory_by_group(tracks)['total']
+            if sparse_genres:
+                matrix = api.genre_matrix.matrix
+                size_bytes += matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+            results.append({'tracks': size, 'genres': genres, 'method': 'get_playlist_features', **result,
+                            'mb': size_bytes / 2**20})
+
+            prep = ModelPrep(sparse_genres=sparse_genres)
+            prep.scaler, prep.svd = template.scaler, template.svd
+            prep.genre_series, prep.key_series = template.genre_series, template.key_series
+            prep.time_signature_series = template.time_signature_series
+            frame = tracks.drop(columns=[c for c in ModelPrep.DROP_COLUMNS if c in tracks])
+            if sparse_genres:
+                prep.genre_matrix, prep.artist_ids = api.genre_matrix, tracks['artist id'].to_numpy()
+
+            def prepare_features():
+                prep.prepped_frame = frame
+                prep.prepare_features(constant)
+            result = measure(prepare_features)
+            prepared[genres] = prep.prepped_frame
+            results.append({'tracks': size, 'genres': genres, 'method': 'prepare_features', **result,
+                            'mb': memory_by_group(prep.prepped_frame)['total'] / 2**20})
+            del api, tracks, frame, prep
+
+        pd.testing.assert_frame_equal(prepared['one-hot'], prepared['genre matrix'])
+    return pd.DataFrame(results)
+
+
+def write_results(results, path):
+    """
+    Writes benchmark results as JSON, together with the time and the Python and pandas versions they were measured
+    with, so runs can be compared over time.
+
+    Parameters
+    ----------
+    results : pandas.DataFrame
+        The results returned by a benchmark.
+    path : str
+        The path of the JSON file.
+    """
+    with open(path, 'w') as f:
+        json.dump({
+            'created_at': pd.Timestamp.now(tz='UTC').isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'results': json.loads(results.to_json(orient='records')),
+        }, f, indent=2)
+
+# %% ../nbs/05_benchmarks.ipynb 14
+HEAVY_PACKAGES = ('pandas', 'numpy', 'requests', 'boto3', 'pyarrow.parquet', 'joblib', 'sklearn')
+
+
+def _import_times(module):
+    """
+    Imports a module in a fresh interpreter under `python -X importtime` and returns the cumulative import time in
+    seconds of every module it loaded.
+    """
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(spotify_net.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(p for p in [root, env.get('PYTHONPATH')] if p)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, check=True, env=env)
+    times = {}
+    for line in completed.stderr.splitlines():
+        # lines look like 'import time:  self [us] | cumulative | imported package', nested imports are indented
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def bench_import_time(stages=None, repeat=5, packages=HEAVY_PACKAGES):
+    """
+    Measures the cold start of the spotify-net command and of each of its stages: the time to import the stage's
+    module in a fresh interpreter, and how much of it went to each heavy package. The best of `repeat` runs is kept.
+
+    Parameters
+    ----------
+    stages : list, optional
+        The stages to measure, among 'cli' and the keys of `STAGES`. Defaults to all of them.
+    repeat : int, optional
+        The number of fresh interpreters per stage. Defaults to 5.
+    packages : tuple, optional
+        The packages whose share of the import time is reported. Defaults to `HEAVY_PACKAGES`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per stage with its module and the import 'seconds', and one column per package holding its import
+        seconds, or 0 if the stage does not import it.
+    """
+    modules = {'cli': 'spotify_net.cli', **STAGES}
+    results = []
+    for stage in (stages if stages is not None else list(modules)):
+        module = modules[stage]
+        runs = [_import_times(module) for _ in range(repeat)]
+        row = {'stage': stage, 'module': module, 'seconds': min(run[module] for run in runs)}
+        for package in packages:
+            row[package] = min(run.get(package, 0.0) for run in runs)
+        results.append(row)
+    return pd.DataFrame(results)
@@ -0,0 +1,602 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/04_cache.ipynb.
+
+# %% auto 0
+__all__ = ['ArtistGenreCache', 'AudioFeatureStore', 'PlaylistIndex', 'ModelArtifactCache', 'ScrobbleStore']
+
+# %% ../nbs/04_cache.ipynb 4
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from .schema import densify
+
+# %% ../nbs/04_cache.ipynb 5
+class ArtistGenreCache:
+    """
+    A persistent SQLite cache of artist genres, keyed by Spotify artist ID.
+
+    Parameters
+    ----------
+    path : str
+        The path of the SQLite database file.
+    ttl : float, optional
+        The number of seconds an entry stays valid. Defaults to 30 days.
+    max_entries : int, optional
+        The maximum number of entries kept. The least recently used entries are evicted first. Defaults to 100000.
+    """
+    def __init__(self, path, ttl=30*24*60*60, max_entries=100000):
+        """
+        Initializes a new instance of the ArtistGenreCache class.
+
+        Parameters
+        ----------
+        path : str
+            The path of the SQLite database file.
+        ttl : float, optional
+            The number of seconds an entry stays valid. Defaults to 30 days.
+        max_entries : int, optional
+            The maximum number of entries kept. The least recently used entries are evicted first. Defaults to 100000.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS artist_genres ('
+            'artist_id TEXT PRIMARY KEY, genres TEXT NOT NULL, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed_at ON artist_genres (accessed_at)')
+        self._conn.commit()
+
+    def get_many(self, artist_ids):
+        """
+        Looks up the genres of several artists. Expired entries count as misses.
+
+        Parameters
+        ----------
+        artist_ids : list
+            The Spotify artist IDs to look up.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping each cached artist ID to its list of genres.
+        """
+        artist_ids = list(dict.fromkeys(artist_ids))
+        now = time.time()
+        found = {}
+        with self._lock:
+            # stay well below SQLite's limit on the number of query parameters
+            for i in range(0, len(artist_ids), 500):
+                chunk = artist_ids[i:i+500]
+                rows = self._conn.execute(
+                    f'SELECT artist_id, genres FROM artist_genres '
+                    f'WHERE fetched_at >= ? AND artist_id IN ({",".join("?" * len(chunk))})',
+                    [now - self.ttl] + chunk,
+                ).fetchall()
+                found.update({artist_id: json.loads(genres) for artist_id, genres in rows})
+            self._conn.executemany(
+                'UPDATE artist_genres SET accessed_at = ? WHERE artist_id = ?',
+                [(now, artist_id) for artist_id in found],
+            )
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(artist_ids) - len(found)
+        return found
+
+    def put_many(self, artist_genres):
+        """
+        Stores the genres of several artists, then evicts the least recently used entries above `max_entries`.
+
+        Parameters
+        ----------
+        artist_genres : dict
+            A dictionary mapping Spotify artist IDs to their lists of genres.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO artist_genres (artist_id, genres, fetched_at, accessed_at) VALUES (?, ?, ?, ?)',
+                [(artist_id, json.dumps(genres), now, now) for artist_id, genres in artist_genres.items()],
+            )
+            self._conn.execute(
+                'DELETE FROM artist_genres WHERE artist_id IN ('
+                'SELECT artist_id FROM artist_genres ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Reports the cache hit and miss counts since the cache was opened.
+
+        Returns
+        -------
+        dict
+            A dictionary with the 'hits', 'misses' and 'entries' counts.
+        """
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM artist_genres').fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def close(self):
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+# %% ../nbs/04_cache.ipynb 6
+class AudioFeatureStore:
+    """
+    A local Parquet store of Spotify audio features, keyed by track ID.
+
+    Audio features never change for a given track, so entries do not expire. New features are kept in memory
+    until `save` is called.
+
+    Parameters
+    ----------
+    path : str
+        The path of the Parquet file.
+    """
+    def __init__(self, path):
+        """
+        Initializes a new instance of the AudioFeatureStore class.
+
+        Parameters
+        ----------
+        path : str
+            The path of the Parquet file.
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._frame = None
+        self._pending = []
+        self._pending_ids = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Loads the stored audio features, including any not yet saved.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A DataFrame with one row per track and the columns returned by the audio-features endpoint.
+        """
+        with self._lock:
+            return self._load().reset_index(drop=True)
+
+    def _read(self):
+        if self._frame is None:
+            if os.path.exists(self.path):
+                self._frame = pd.read_parquet(self.path).set_index('id', drop=False)
+            else:
+                self._frame = pd.DataFrame(columns=['id']).set_index('id', drop=False)
+        return self._frame
+
+    def _load(self):
+        frame = self._read()
+        if self._pending:
+            frames = [frame] if len(frame) else []
+            frame = pd.concat(frames + self._pending)
+            self._frame = frame[~frame.index.duplicated(keep='last')]
+            self._pending = []
+            self._pending_ids = set()
+        return self._frame
+
+    def get_many(self, track_ids):
+        """
+        Looks up the audio features of several tracks.
+
+        Parameters
+        ----------
+        track_ids : list
+            The Spotify track IDs to look up.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The stored audio features of the tracks that were found, indexed by track ID.
+        list
+            The track IDs that are not in the store.
+        """
+        track_ids = list(dict.fromkeys(track_ids))
+        with self._lock:
+            # unsaved features are only merged in when one of them is asked for again
+            frame = self._load() if self._pending_ids.intersection(track_ids) else self._read()
+            found = frame.index.intersection(track_ids)
+            self.hits += len(found)
+            self.misses += len(track_ids) - len(found)
+            found_set = set(found)
+            return frame.loc[found], [t for t in track_ids if t not in found_set]
+
+    def put(self, features):
+        """
+        Adds audio features to the store.
+
+        Parameters
+        ----------
+        features : pandas.DataFrame
+            Audio features as returned by the audio-features endpoint, with an 'id' column.
+        """
+        with self._lock:
+            self._pending.append(features.set_index('id', drop=False))
+            self._pending_ids.update(features['id'])
+
+    def save(self):
+        """
+        Writes the store to its Parquet file, replacing the previous file atomically.
+        """
+        with self._lock:
+            if not self._pending and os.path.exists(self.path):
+                return
+            frame = self._load()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            frame.reset_index(drop=True).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self.path)
+
+    def stats(self):
+        """
+        Reports the store hit and miss counts since the store was opened.
+
+        Returns
+        -------
+        dict
+            A dictionary with the 'hits', 'misses' and 'entries' counts.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._load())}
+
+# %% ../nbs/04_cache.ipynb 7
+class PlaylistIndex:
+    """
+    A local index of one playlist's tracks, with the playlist's `snapshot_id` and the latest 'added at' time seen.
+
+    Parameters
+    ----------
+    directory : str
+        The directory holding the index files.
+    """
+    STATE_FILE = 'state.json'
+    TRACKS_FILE = 'tracks.parquet'
+
+    def __init__(self, directory):
+        """
+        Initializes a new instance of the PlaylistIndex class.
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the index files.
+        """
+        self.directory = directory
+        self.state_path = os.path.join(directory, self.STATE_FILE)
+        self.tracks_path = os.path.join(directory, self.TRACKS_FILE)
+
+    def load_state(self):
+        """
+        Loads the stored playlist state.
+
+        Returns
+        -------
+        dict or None
+            A dictionary with the 'snapshot_id' and 'watermark' of the last sync, or None if the playlist was never synced.
+        """
+        if not (os.path.exists(self.state_path) and os.path.exists(self.tracks_path)):
+            return None
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state.get('watermark') is not None:
+            state['watermark'] = pd.Timestamp(state['watermark'])
+        return state
+
+    def load_tracks(self):
+        """
+        Loads the stored tracks.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The tracks of the last sync, as built by `SpotifyAPI.get_playlist_features`.
+        """
+        return pd.read_parquet(self.tracks_path)
+
+    def save(self, tracks, snapshot_id):
+        """
+        Stores the tracks of the playlist together with its snapshot ID and the latest 'added at' time.
+
+        Parameters
+        ----------
+        tracks : pandas.DataFrame
+            The tracks of the playlist.
+        snapshot_id : str or None
+            The snapshot ID the tracks correspond to, or None if it is not known.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        watermark = tracks['added at'].max() if len(tracks) else None
+        densify(tracks).to_parquet(self.tracks_path + '.tmp')
+        os.replace(self.tracks_path + '.tmp', self.tracks_path)
+        with open(self.state_path, 'w') as f:
+            json.dump({
+                'snapshot_id': snapshot_id,
+                'watermark': None if watermark is None or pd.isna(watermark) else watermark.isoformat(),
+            }, f)
+
+    def remove_tracks(self, uris, snapshot_id=None):
+        """
+        Removes deleted tracks from the index.
+
+        Parameters
+        ----------
+        uris : list
+            The URIs of the deleted tracks.
+        snapshot_id : str, optional
+            The snapshot ID returned by the deletion, if known.
+        """
+        if self.load_state() is None:
+            return
+        tracks = self.load_tracks()
+        self.save(tracks[~tracks['uri'].isin(uris)], snapshot_id)
+
+# %% ../nbs/04_cache.ipynb 8
+class ModelArtifactCache:
+    """
+    A local cache of pickled model artifacts, such as the scaler and the SVD, revalidated against the storage on
+    every load.
+
+    Each artifact is kept unpickled in a joblib file next to the version it was read at. Loading sends a conditional
+    read for that version, and only downloads and unpickles the artifact again if it changed. NumPy arrays can be
+    memory-mapped from the joblib file instead of read into memory.
+
+    Parameters
+    ----------
+    directory : str
+        The directory holding the cached artifacts.
+    """
+    def __init__(self, directory):
+        """
+        Initializes a new instance of the ModelArtifactCache class.
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the cached artifacts.
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, name):
+        base = os.path.join(self.directory, name)
+        return base + '.joblib', base + '.json'
+
+    def _cached_version(self, name):
+        artifact_path, version_path = self._paths(name)
+        if not (os.path.exists(artifact_path) and os.path.exists(version_path)):
+            return None
+        with open(version_path) as f:
+            return json.load(f).get('version')
+
+    def load(self, storage, name, mmap=False):
+        """
+        Loads an artifact, from the cache if the stored version has not changed.
+
+        Parameters
+        ----------
+        storage : ArtifactStore
+            The storage holding the pickled artifact.
+        name : str
+            The name of the artifact in the storage.
+        mmap : bool, optional
+            Whether to memory-map the NumPy arrays of a cached artifact read-only instead of reading them. Defaults
+            to False.
+
+        Returns
+        -------
+        object
+            The unpickled artifact.
+        """
+        # deferred, so importing the module stays cheap for the stages that don't use the cache
+        import joblib
+
+        artifact_path, version_path = self._paths(name)
+        version = self._cached_version(name)
+        data, current = storage.read_bytes_if_changed(name, version)
+        if data is None:
+            with self._lock:
+                self.hits += 1
+            return joblib.load(artifact_path, mmap_mode='r' if mmap else None)
+
+        with self._lock:
+            self.misses += 1
+        artifact = pickle.loads(data)
+        os.makedirs(self.directory, exist_ok=True)
+        # the version is written last, so an interrupted update is a miss on the next load
+        if os.path.exists(version_path):
+            os.remove(version_path)
+        joblib.dump(artifact, artifact_path + '.tmp')
+        os.replace(artifact_path + '.tmp', artifact_path)
+        with open(version_path, 'w') as f:
+            json.dump({'version': current}, f)
+        if mmap:
+            return joblib.load(artifact_path, mmap_mode='r')
+        return artifact
+
+    def stats(self):
+        """
+        Reports the cache hit and miss counts since the cache was opened.
+
+        Returns
+        -------
+        dict
+            A dictionary with the 'hits' and 'misses' counts.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+# %% ../nbs/04_cache.ipynb 9
+class ScrobbleStore:
+    """
+    A local, append-only Parquet store of a Last.fm scrobble history.
+
+    Every sync appends one part file named after the first and last scrobble time it holds, so the latest scrobble
+    time is known without reading any data, and reads of a recent window skip the older parts.
+
+    Parameters
+    ----------
+    directory : str
+        The directory holding the part files.
+    """
+    COLUMNS = ['played_at', 'name', 'artist', 'album']
+    KEY = ['played_at', 'name', 'artist']
+    PERIODS = {'7day': '7D', '1month': '30D', '3month': '90D', '6month': '180D', '12month': '365D'}
+
+    def __init__(self, directory):
+        """
+        Initializes a new instance of the ScrobbleStore class.
+
+        Parameters
+        ----------
+        directory : str
+            The directory holding the part files.
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _parts(self):
+        if not os.path.isdir(self.directory):
+            return []
+        parts = []
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith('part-') and file_name.endswith('.parquet'):
+                first, last = file_name[len('part-'):-len('.parquet')].split('-')
+                parts.append((int(first), int(last), os.path.join(self.directory, file_name)))
+        return sorted(parts)
+
+    def watermark(self):
+        """
+        Returns the time of the latest stored scrobble.
+
+        Returns
+        -------
+        int or None
+            The Unix time of the latest scrobble, or None if the store is empty.
+        """
+        parts = self._parts()
+        return max(last for _, last, _ in parts) if parts else None
+
+    def append(self, scrobbles):
+        """
+        Appends scrobbles as a new part file. Scrobbles before the latest stored one are dropped, as are those
+        already stored, matched on `KEY`. Scrobbles made in the same second as the latest stored one can arrive in a
+        later sync, so that second is matched by content rather than by time.
+
+        Parameters
+        ----------
+        scrobbles : pandas.DataFrame
+            The scrobbles, with the columns in `COLUMNS` and 'played_at' as UTC datetimes.
+
+        Returns
+        -------
+        int
+            The number of scrobbles appended.
+        """
+        with self._lock:
+            scrobbles = scrobbles.drop_duplicates(self.KEY)
+            watermark = self.watermark()
+            if watermark is not None:
+                start = pd.Timestamp(watermark, unit='s', tz='UTC')
+                scrobbles = scrobbles[scrobbles['played_at'] >= start]
+                stored = set(self.load(since=start, columns=self.KEY).itertuples(index=False, name=None))
+                scrobbles = scrobbles[[key not in stored
+                                       for key in scrobbles[self.KEY].itertuples(index=False, name=None)]]
+            if not len(scrobbles):
+                return 0
+            scrobbles = scrobbles.sort_values('played_at')[self.COLUMNS].reset_index(drop=True)
+            first, last = (int(t.timestamp()) for t in scrobbles['played_at'].iloc[[0, -1]])
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f'part-{first:010d}-{last:010d}.parquet')
+            appended = len(scrobbles)
+            if os.path.exists(path):
+                # only late scrobbles of the watermark's second can cover the same range as a stored part
+                scrobbles = pd.concat([pd.read_parquet(path), scrobbles], ignore_index=True)
+                scrobbles = scrobbles.sort_values('played_at', kind='stable').reset_index(drop=True)
+            scrobbles.to_parquet(path + '.tmp', index=False)
+            os.replace(path + '.tmp', path)
+            return appended
+
+    def load(self, since=None, columns=None):
+        """
+        Loads the stored scrobbles, oldest first.
+
+        Parameters
+        ----------
+        since : pandas.Timestamp, optional
+            Only scrobbles at or after this UTC time are loaded. Parts ending before it are not read.
+        columns : list, optional
+            The columns to load. Defaults to `COLUMNS`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The scrobbles.
+        """
+        columns = list(columns or self.COLUMNS)
+        read_columns = columns if 'played_at' in columns or since is None else columns + ['played_at']
+        start = None if since is None else pd.Timestamp(since)
+        frames = [pd.read_parquet(path, columns=read_columns) for _, last, path in self._parts()
+                  if start is None or last >= start.timestamp()]
+        if not frames:
+            return pd.DataFrame({c: pd.Series(dtype='datetime64[ns, UTC]' if c == 'played_at' else object)
+                                 for c in columns})
+        scrobbles = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            scrobbles = scrobbles[scrobbles['played_at'] >= start].reset_index(drop=True)
+        return scrobbles[columns]
+
+    def playcounts(self, window='1month', now=None, playcount_cutoff=1):
+        """
+        Counts the plays of every track over a window ending now, like the Last.fm top tracks of a period. The result
+        has the columns of `LastFmAPI.get_top_tracks`, so it can be handed to `ModelPrep` with
+        `LastFmAPI.save_top_tracks`.
+
+        Parameters
+        ----------
+        window : str or pandas.Timedelta, optional
+            The window length, either a Last.fm period such as '7day' or '12month', 'overall', or anything
+            `pandas.Timedelta` accepts. Default is '1month'.
+        now : pandas.Timestamp, optional
+            The end of the window, taken as UTC if it has no time zone. Defaults to the current time.
+        playcount_cutoff : int, optional
+            The minimum number of plays for a track to be included. Default is 1.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The tracks played in the window, with 'name', 'artist' and 'playcount' columns, most played first.
+        """
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        now = now.tz_localize('UTC') if now.tzinfo is None else now.tz_convert('UTC')
+        since = None if window == 'overall' else now - pd.Timedelta(self.PERIODS.get(window, window))
+        scrobbles = self.load(since=since, columns=['played_at', 'name', 'artist'])
+        scrobbles = scrobbles[scrobbles['played_at'] <= now]
+        counts = scrobbles.groupby(['name', 'artist'], sort=False).size().rename('playcount').reset_index()
+        counts = counts.sort_values('playcount', ascending=False, kind='stable')
+        return counts[counts['playcount'] >= playcount_cutoff].reset_index(drop=True)
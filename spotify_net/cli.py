@@ -0,0 +1,164 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/11_cli.ipynb.
+
+# %% auto 0
+__all__ = ['STAGES', 'run_spotify', 'run_batch', 'run_lastfm', 'run_modelprep', 'run_bench', 'build_parser', 'main']
+
+# %% ../nbs/11_cli.ipynb 4
+import argparse
+import importlib
+
+# %% ../nbs/11_cli.ipynb 5
+# the module each stage imports; the stages import nothing from each other
+STAGES = {
+    'spotify': 'spotify_net.retrieve_spotify_data',
+    'lastfm': 'spotify_net.retrieve_last_fm_data',
+    'batch': 'spotify_net.batch',
+    'modelprep': 'spotify_net.prep_features_for_model',
+    'bench': 'spotify_net.benchmarks',
+}
+
+
+def run_spotify(args):
+    """
+    Retrieves the playlist, hands the tracks added in the lookback period to `ModelPrep` and removes the older ones.
+    """
+    SpotifyAPI = importlib.import_module(STAGES['spotify']).SpotifyAPI
+    spot = SpotifyAPI(args.region)
+    spot.get_secret(args.secret)
+    spot.get_playlist_features(args.playlist, parallel=args.parallel, coalesce=args.coalesce)
+    old_tracks, new_tracks = spot.parse_new_tracks(lookback_days=args.lookback_days)
+    spot.save_new_tracks(new_tracks)
+    spot.delete_tracks(old_tracks)
+    print('Updated')
+
+
+def run_batch(args):
+    """
+    Rotates several playlists under one rate limit and prints each playlist's report.
+    """
+    PlaylistBatchRunner = importlib.import_module(STAGES['batch']).PlaylistBatchRunner
+    runner = PlaylistBatchRunner(args.region, requests_per_second=args.requests_per_second,
+                                 max_workers=args.max_workers, lookback_days=args.lookback_days,
+                                 parallel=args.parallel, coalesce=args.coalesce)
+    runner.get_secret(args.secret)
+    results = runner.run(args.playlists)
+    print(results.to_string())
+    print(runner.report)
+
+
+def run_lastfm(args):
+    """
+    Retrieves the top tracks and hands them to `ModelPrep`.
+    """
+    LastFmAPI = importlib.import_module(STAGES['lastfm']).LastFmAPI
+    last = LastFmAPI(args.region)
+    last.get_secret(args.secret)
+    tracks = last.get_top_tracks(period=args.period, playcount_cutoff=args.playcount_cutoff)
+    last.save_top_tracks(tracks)
+    print('Retrieved')
+
+
+def run_modelprep(args):
+    """
+    Joins the tracks of the other two stages and writes the frame for prediction.
+    """
+    ModelPrep = importlib.import_module(STAGES['modelprep']).ModelPrep
+    frame = ModelPrep()
+    frame.load_s3()
+    if len(frame.prepped_frame) > 0:
+        frame.prepare_features(args.constant)
+        frame.save_prepared_frame()
+    else:
+        print('No new data to process')
+
+
+def run_bench(args):
+    """
+    Runs a benchmark and writes its results as JSON.
+    """
+    benchmarks = importlib.import_module(STAGES['bench'])
+    if args.benchmark == 'imports':
+        results = benchmarks.bench_import_time()
+    else:
+        results = benchmarks.bench_pipeline()
+    print(results.to_string())
+    if args.output:
+        benchmarks.write_results(results, args.output)
+
+
+def build_parser():
+    """
+    Builds the argument parser of the spotify-net command.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        The parser, with one subcommand per stage.
+    """
+    parser = argparse.ArgumentParser(prog='spotify-net', description='Run one stage of the spotify_net pipeline.')
+    parser.add_argument('--metrics', help='write the instrumentation results to this file, as Prometheus text if it '
+                                          'ends in .prom and as JSON otherwise')
+    stages = parser.add_subparsers(dest='stage', metavar='stage', required=True)
+
+    spotify = stages.add_parser('spotify', help='retrieve the playlist and hand over the new tracks')
+    spotify.add_argument('--region', default='us-east-2')
+    spotify.add_argument('--secret', default='spotify_35')
+    spotify.add_argument('--playlist', default='3ubgXaHeBn1CWLUZPXvqkj')
+    spotify.add_argument('--lookback-days', type=int, default=7)
+    spotify.add_argument('--parallel', action='store_true', help='fetch the playlist pages concurrently')
+    spotify.add_argument('--coalesce', action='store_true',
+                         help='look up the artists and audio features of the whole playlist in full batches')
+    spotify.set_defaults(run=run_spotify)
+
+    batch = stages.add_parser('batch', help='rotate several playlists under one rate limit')
+    batch.add_argument('playlists', nargs='+', metavar='playlist')
+    batch.add_argument('--region', default='us-east-2')
+    batch.add_argument('--secret', default='spotify_35')
+    batch.add_argument('--lookback-days', type=int, default=7)
+    batch.add_argument('--requests-per-second', type=float, default=10)
+    batch.add_argument('--max-workers', type=int, default=4, help='the number of playlists rotated at once')
+    batch.add_argument('--parallel', action='store_true', help='fetch the pages of each playlist concurrently')
+    batch.add_argument('--coalesce', action='store_true',
+                       help='look up the artists and audio features of all the playlists together')
+    batch.set_defaults(run=run_batch)
+
+    lastfm = stages.add_parser('lastfm', help='retrieve the Last.fm top tracks')
+    lastfm.add_argument('--region', default='us-east-1')
+    lastfm.add_argument('--secret', default='last_keys')
+    lastfm.add_argument('--period', default='1month')
+    lastfm.add_argument('--playcount-cutoff', type=int, default=5)
+    lastfm.set_defaults(run=run_lastfm)
+
+    modelprep = stages.add_parser('modelprep', help='prepare the matched tracks for prediction')
+    modelprep.add_argument('--constant', type=float, default=0.0000001)
+    modelprep.set_defaults(run=run_modelprep)
+
+    bench = stages.add_parser('bench', help='run a benchmark')
+    bench.add_argument('benchmark', choices=['pipeline', 'imports'])
+    bench.add_argument('--output', help='write the results to this JSON file')
+    bench.set_defaults(run=run_bench)
+    return parser
+
+
+def main(argv=None):
+    """
+    The entry point of the spotify-net command.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command line arguments. Defaults to `sys.argv[1:]`.
+    """
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        from spotify_net.instrumentation import DEFAULT_INSTRUMENTATION
+        DEFAULT_INSTRUMENTATION.enable()
+    try:
+        args.run(args)
+    finally:
+        if args.metrics:
+            if args.metrics.endswith('.prom'):
+                with open(args.metrics, 'w') as f:
+                    f.write(DEFAULT_INSTRUMENTATION.to_prometheus())
+            else:
+                DEFAULT_INSTRUMENTATION.to_json(args.metrics)
@@ -0,0 +1,155 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/14_coalesce.ipynb.
+
+# %% auto 0
+__all__ = ['IDCoalescer']
+
+# %% ../nbs/14_coalesce.ipynb 4
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# %% ../nbs/14_coalesce.ipynb 5
+class IDCoalescer:
+    """
+    Gathers the IDs to look up from many callers, and fetches every unique ID once, in batches as full as the
+    endpoint allows.
+
+    IDs are queued with `add`, one group per page, and fetched on the next `resolve` or `get`, so all the IDs queued
+    until then share their batches. Results are kept for the life of the coalescer and an ID queued again is not
+    fetched again. The coalescer is thread-safe, so the clients of one run can share it.
+
+    Parameters
+    ----------
+    fetch : callable
+        Fetches one batch: called with a list of at most `batch_size` IDs, returns a dictionary mapping the IDs found
+        to their results.
+    batch_size : int
+        The most IDs the endpoint accepts per request.
+    max_workers : int, optional
+        The number of batches fetched at once. Defaults to 1.
+    """
+    def __init__(self, fetch, batch_size, max_workers=1):
+        """
+        Initializes a new instance of the IDCoalescer class.
+
+        Parameters
+        ----------
+        fetch : callable
+            Fetches one batch: called with a list of at most `batch_size` IDs, returns a dictionary mapping the IDs
+            found to their results.
+        batch_size : int
+            The most IDs the endpoint accepts per request.
+        max_workers : int, optional
+            The number of batches fetched at once. Defaults to 1.
+        """
+        self._fetch = fetch
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        # dictionaries keep the IDs in the order they were queued
+        self._pending = {}
+        self._in_flight = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        self._resolve_lock = threading.Lock()
+        self.ids = 0
+        self.calls = 0
+        self.naive_calls = 0
+
+    def _batches(self, num_ids):
+        return -(-num_ids // self.batch_size)
+
+    def add(self, ids):
+        """
+        Queues a group of IDs to fetch, such as those of one page.
+
+        Parameters
+        ----------
+        ids : list
+            The IDs, possibly repeated.
+        """
+        unique = list(dict.fromkeys(ids))
+        with self._lock:
+            self.ids += len(ids)
+            # what looking the group up on its own would have cost
+            self.naive_calls += self._batches(len(unique))
+            for i in unique:
+                if i not in self._results and i not in self._in_flight:
+                    self._pending[i] = None
+
+    def resolve(self):
+        """
+        Fetches the queued IDs in full batches. Concurrent callers wait for the fetch in progress instead of
+        sending their own.
+        """
+        with self._resolve_lock:
+            with self._lock:
+                self._in_flight, self._pending = self._pending, {}
+                queued = list(self._in_flight)
+            batches = [queued[i:i+self.batch_size] for i in range(0, len(queued), self.batch_size)]
+            try:
+                if self.max_workers > 1 and len(batches) > 1:
+                    with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                        found = list(executor.map(self._fetch, batches))
+                else:
+                    found = [self._fetch(batch) for batch in batches]
+            except BaseException:
+                # the IDs are fetched again on the next call
+                with self._lock:
+                    self._pending = {**self._in_flight, **self._pending}
+                    self._in_flight = {}
+                raise
+
+            with self._lock:
+                self.calls += len(batches)
+                for batch, results in zip(batches, found):
+                    for i in batch:
+                        self._results[i] = results.get(i)
+                self._in_flight = {}
+
+    def get(self, ids):
+        """
+        Returns the results of the given IDs, fetching the queued IDs first if any of them is not known yet. IDs that
+        were never queued are queued as one group.
+
+        Parameters
+        ----------
+        ids : list
+            The IDs to look up.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping the IDs found to their results. IDs the endpoint returned nothing for are left out.
+        """
+        ids = list(dict.fromkeys(ids))
+        with self._lock:
+            unknown = [i for i in ids if i not in self._results and i not in self._pending and i not in self._in_flight]
+        if unknown:
+            self.add(unknown)
+        with self._lock:
+            missing = any(i not in self._results for i in ids)
+        if missing:
+            self.resolve()
+        with self._lock:
+            return {i: self._results[i] for i in ids if self._results.get(i) is not None}
+
+    def stats(self):
+        """
+        Reports how many requests the coalescing saved.
+
+        Returns
+        -------
+        dict
+            A dictionary with the number of 'ids' queued, repeats included, and of 'unique_ids', the 'calls' sent, the
+            'naive_calls' that looking up every group on its own would have sent, the 'minimum_calls' needed for the
+            unique IDs and the 'calls_saved'.
+        """
+        with self._lock:
+            unique = len(self._results) + len(self._pending) + len(self._in_flight)
+            return {
+                'ids': self.ids,
+                'unique_ids': unique,
+                'calls': self.calls,
+                'naive_calls': self.naive_calls,
+                'minimum_calls': self._batches(unique),
+                'calls_saved': self.naive_calls - self.calls,
+            }
@@ -0,0 +1,294 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/09_instrumentation.ipynb.
+
+# %% auto 0
+__all__ = ['DEFAULT_INSTRUMENTATION', 'Instrumentation', 'instrumented']
+
+# %% ../nbs/09_instrumentation.ipynb 4
+import contextlib
+import functools
+import inspect
+import json
+import threading
+import time
+import tracemalloc
+
+# %% ../nbs/09_instrumentation.ipynb 5
+# tracemalloc.reset_peak is new in Python 3.9; before that a stage's peak is the highest since tracing started
+_reset_peak = getattr(tracemalloc, 'reset_peak', lambda: None)
+_DISABLED = contextlib.nullcontext()
+
+
+class Instrumentation:
+    """
+    Collects spans, HTTP counters and per-stage peak memory.
+
+    A span records the number of calls, failures, total and longest duration of a named block of code. A span marked
+    as a stage also records its peak memory, measured with `tracemalloc` while the instrumentation is enabled. Stages
+    running concurrently in several threads see each other's allocations.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Whether to start recording right away. Defaults to False.
+    track_memory : bool, optional
+        Whether stages record their peak memory. Tracing allocations slows down allocation-heavy code, so it can be
+        turned off to keep only the timings and counters. Defaults to True.
+    namespace : str, optional
+        The prefix of the Prometheus metric names. Defaults to 'spotify_net'.
+    """
+    def __init__(self, enabled=False, track_memory=True, namespace='spotify_net'):
+        """
+        Initializes a new instance of the Instrumentation class.
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            Whether to start recording right away. Defaults to False.
+        track_memory : bool, optional
+            Whether stages record their peak memory. Defaults to True.
+        namespace : str, optional
+            The prefix of the Prometheus metric names. Defaults to 'spotify_net'.
+        """
+        self.enabled = False
+        self.track_memory = track_memory
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._stages = []
+        self._started_tracing = False
+        self.reset()
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        """
+        Starts recording, and starts tracing allocations if `track_memory` is set.
+        """
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stops recording. The results so far are kept.
+        """
+        self.enabled = False
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self):
+        """
+        Discards the results recorded so far.
+        """
+        with self._lock:
+            self.spans = {}
+            self.http = {}
+
+    def span(self, name, stage=False):
+        """
+        Returns a context manager recording the duration of the block it wraps under `name`.
+
+        Parameters
+        ----------
+        name : str
+            The name of the span, such as 'spotify.get_artist_genres'.
+        stage : bool, optional
+            Whether the span is a pipeline stage, whose peak memory is recorded too. Defaults to False.
+
+        Returns
+        -------
+        contextlib.AbstractContextManager
+            The context manager, which does nothing while the instrumentation is disabled.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return self._span(name, stage and self.track_memory and tracemalloc.is_tracing())
+
+    @contextlib.contextmanager
+    def _span(self, name, memory):
+        frame = self._enter_stage() if memory else None
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            peak = self._exit_stage(frame) if memory else None
+            self._record_span(name, seconds, failed, peak)
+
+    def _enter_stage(self):
+        current, peak = tracemalloc.get_traced_memory()
+        frame = [current, current]
+        with self._lock:
+            # hand the peak so far to the enclosing stages before it is reset
+            for outer in self._stages:
+                outer[1] = max(outer[1], peak)
+            self._stages.append(frame)
+            _reset_peak()
+        return frame
+
+    def _exit_stage(self, frame):
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._stages = [s for s in self._stages if s is not frame]
+            for outer in self._stages:
+                outer[1] = max(outer[1], peak)
+        return max(frame[1], peak) - frame[0]
+
+    def _record_span(self, name, seconds, failed, peak):
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0}
+            stats['calls'] += 1
+            stats['errors'] += failed
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            if peak is not None:
+                stats['peak_bytes'] = max(stats.get('peak_bytes', 0), peak)
+
+    def record_http(self, endpoint, status, num_bytes, seconds):
+        """
+        Counts one HTTP request. Does nothing while the instrumentation is disabled.
+
+        Parameters
+        ----------
+        endpoint : str
+            The endpoint the request was sent to, such as 'spotify.artists'.
+        status : int or None
+            The status of the response, or None if no response was received.
+        num_bytes : int
+            The size of the response body.
+        seconds : float
+            The duration of the request.
+        """
+        if not self.enabled:
+            return
+        key = (endpoint, 'error' if status is None else str(status))
+        with self._lock:
+            stats = self.http.get(key)
+            if stats is None:
+                stats = self.http[key] = {'requests': 0, 'bytes': 0, 'seconds': 0.0}
+            stats['requests'] += 1
+            stats['bytes'] += num_bytes
+            stats['seconds'] += seconds
+
+    def snapshot(self):
+        """
+        Returns the results recorded so far.
+
+        Returns
+        -------
+        dict
+            A dictionary with a 'spans' list, one entry per span name, and an 'http' list, one entry per endpoint and
+            status. Stage spans have a 'peak_bytes' entry.
+        """
+        with self._lock:
+            spans = [{'name': name, **stats} for name, stats in sorted(self.spans.items())]
+            http = [{'endpoint': endpoint, 'status': status, **stats}
+                    for (endpoint, status), stats in sorted(self.http.items())]
+        return {'spans': spans, 'http': http}
+
+    def to_json(self, path=None):
+        """
+        Exports the results as JSON.
+
+        Parameters
+        ----------
+        path : str, optional
+            A file to write the JSON to.
+
+        Returns
+        -------
+        str
+            The JSON document.
+        """
+        document = json.dumps(self.snapshot(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(document)
+        return document
+
+    def to_prometheus(self):
+        """
+        Exports the results in the Prometheus text exposition format, for a node exporter's textfile collector or a
+        push gateway.
+
+        Returns
+        -------
+        str
+            The metrics, one sample per line.
+        """
+        snapshot = self.snapshot()
+        metrics = [
+            ('span_calls_total', 'counter', 'Calls of each instrumented method.', 'spans', 'calls', ('name',)),
+            ('span_errors_total', 'counter', 'Calls that raised an exception.', 'spans', 'errors', ('name',)),
+            ('span_seconds_total', 'counter', 'Time spent in each instrumented method.', 'spans', 'seconds', ('name',)),
+            ('span_max_seconds', 'gauge', 'Longest call of each instrumented method.', 'spans', 'max_seconds', ('name',)),
+            ('stage_peak_memory_bytes', 'gauge', 'Peak traced memory of each stage.', 'spans', 'peak_bytes', ('name',)),
+            ('http_requests_total', 'counter', 'HTTP requests by endpoint and status.', 'http', 'requests',
+             ('endpoint', 'status')),
+            ('http_response_bytes_total', 'counter', 'HTTP response bytes by endpoint and status.', 'http', 'bytes',
+             ('endpoint', 'status')),
+            ('http_seconds_total', 'counter', 'Time spent in HTTP requests by endpoint and status.', 'http', 'seconds',
+             ('endpoint', 'status')),
+        ]
+        lines = []
+        for suffix, kind, description, section, field, labels in metrics:
+            name = f'{self.namespace}_{suffix}'
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+            for entry in snapshot[section]:
+                if field in entry:
+                    label_text = ','.join(f'{label}="{_escape_label(entry[label])}"' for label in labels)
+                    lines.append(f'{name}{{{label_text}}} {entry[field]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+# %% ../nbs/09_instrumentation.ipynb 6
+DEFAULT_INSTRUMENTATION = Instrumentation()
+
+
+def instrumented(name, stage=False):
+    """
+    Decorates a method so that its calls are recorded as spans of the instance's `instrumentation` attribute. The
+    span of a coroutine method lasts until the coroutine finishes.
+
+    Parameters
+    ----------
+    name : str
+        The name of the span.
+    stage : bool, optional
+        Whether the method is a pipeline stage, whose peak memory is recorded too. Defaults to False.
+
+    Returns
+    -------
+    callable
+        The decorator.
+    """
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                instrumentation = self.instrumentation
+                if not instrumentation.enabled:
+                    return await method(self, *args, **kwargs)
+                with instrumentation.span(name, stage):
+                    return await method(self, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if not instrumentation.enabled:
+                return method(self, *args, **kwargs)
+            with instrumentation.span(name, stage):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,152 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/08_matching.ipynb.
+
+# %% auto 0
+__all__ = ['YEAR', 'SUFFIX_FORMS', 'SUFFIX_PATTERN', 'PUNCTUATION_PATTERN', 'normalize_keys', 'track_keys', 'TrackMatcher']
+
+# %% ../nbs/08_matching.ipynb 4
+import re
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# %% ../nbs/08_matching.ipynb 5
+# Version suffixes Spotify adds to track names of the same recording, after a dash or in brackets, e.g.
+# "Song - 2011 Remaster" or "Song (Mono Version)". A whole suffix must match, so "Song - Live at Wembley" or
+# "Love - Mix Tape" keep theirs.
+YEAR = r'(?:19|20)\d{2}'
+SUFFIX_FORMS = (rf'(?:(?:{YEAR}\s)?(?:digital(?:ly)?\s)?remaster(?:ed)?(?:\s{YEAR})?(?:\sversion)?'
+                rf'|(?:{YEAR}\s)?(?:mono|stereo|single|album|radio)\s(?:version|edit)|mono|stereo|{YEAR}\sversion)')
+SUFFIX_PATTERN = re.compile(rf'\s[-–—]\s{SUFFIX_FORMS}$|[\(\[]\s*{SUFFIX_FORMS}\s*[\)\]]')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]+')
+
+
+def _normalize(value, strip_suffixes):
+    value = unicodedata.normalize('NFKC', value).casefold()
+    key = SUFFIX_PATTERN.sub('', value) if strip_suffixes else value
+    key = ' '.join(PUNCTUATION_PATTERN.sub('', key).split())
+    # names made only of symbols, such as "???", would otherwise all share the empty key
+    return key or ' '.join(value.split())
+
+
+def normalize_keys(values, strip_suffixes=False):
+    """
+    Normalizes track names or artist names for matching: NFKC normalization, case folding, optional removal of
+    version suffixes, then removal of punctuation and repeated whitespace. A name left empty, made only of
+    punctuation or symbols, keeps its case folded form instead.
+
+    Each distinct value is only normalized once, so long columns with many repeats stay cheap.
+
+    Parameters
+    ----------
+    values : pandas.Series
+        The names to normalize.
+    strip_suffixes : bool, optional
+        Whether to remove version suffixes such as "- Remastered 2011" or "(Mono Version)". Defaults to False.
+
+    Returns
+    -------
+    pandas.Series
+        The normalized names, with the index of `values`. Missing names stay missing.
+    """
+    codes, uniques = pd.factorize(values)
+    keys = [_normalize(str(value), strip_suffixes) for value in uniques]
+    # code -1 marks a missing value and picks the trailing NaN
+    keys = np.array(keys + [np.nan], dtype=object)
+    return pd.Series(keys[codes], index=values.index)
+
+
+def track_keys(tracks):
+    """
+    Builds the normalized matching key of every track, from its 'name' and 'artist' columns.
+
+    Parameters
+    ----------
+    tracks : pandas.DataFrame
+        The tracks, with 'name' and 'artist' columns.
+
+    Returns
+    -------
+    pandas.Series
+        One key per track, missing if the name or the artist is missing.
+    """
+    return normalize_keys(tracks['name'], strip_suffixes=True) + '\x1f' + normalize_keys(tracks['artist'])
+
+# %% ../nbs/08_matching.ipynb 6
+class TrackMatcher:
+    """
+    An inner join of Spotify tracks to Last.fm tracks on their normalized names and artists.
+
+    The Last.fm side is indexed once by a hash of its keys, so every join is linear in the number of Spotify tracks.
+    When several Last.fm tracks share a key, the first one is used, which is the most played for top tracks.
+
+    Parameters
+    ----------
+    lastfm_tracks : pandas.DataFrame
+        The Last.fm tracks, with 'name' and 'artist' columns.
+    """
+    def __init__(self, lastfm_tracks):
+        """
+        Initializes a new instance of the TrackMatcher class.
+
+        Parameters
+        ----------
+        lastfm_tracks : pandas.DataFrame
+            The Last.fm tracks, with 'name' and 'artist' columns.
+        """
+        start = time.perf_counter()
+        keys = track_keys(lastfm_tracks)
+        first = keys.notna() & ~keys.duplicated()
+        self.lastfm_tracks = lastfm_tracks.loc[first.to_numpy()].reset_index(drop=True)
+        self.index = pd.Index(keys[first].to_numpy())
+        self.report = {'lastfm_tracks': len(lastfm_tracks), 'lastfm_keys': len(self.index),
+                       'index_seconds': time.perf_counter() - start}
+
+    def match(self, spotify_tracks):
+        """
+        Finds the Last.fm track matching every Spotify track.
+
+        Parameters
+        ----------
+        spotify_tracks : pandas.DataFrame
+            The Spotify tracks, with 'name' and 'artist' columns.
+
+        Returns
+        -------
+        numpy.ndarray
+            The position in `lastfm_tracks` of each Spotify track's match, or -1 if it has none.
+        """
+        start = time.perf_counter()
+        positions = self.index.get_indexer(track_keys(spotify_tracks))
+        matched = int((positions >= 0).sum())
+        self.report.update({
+            'spotify_tracks': len(spotify_tracks),
+            'matched': matched,
+            'match_rate': matched / len(spotify_tracks) if len(spotify_tracks) else 0.0,
+            'match_seconds': time.perf_counter() - start,
+        })
+        return positions
+
+    def join(self, spotify_tracks):
+        """
+        Joins the Spotify tracks that have a match to the columns of their Last.fm track. The Spotify 'name' and
+        'artist' are kept, and the rows keep their order, like an inner `pd.merge` on both columns.
+
+        Parameters
+        ----------
+        spotify_tracks : pandas.DataFrame
+            The Spotify tracks, with 'name' and 'artist' columns.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The matched Spotify tracks with the other Last.fm columns appended.
+        """
+        positions = self.match(spotify_tracks)
+        rows = positions >= 0
+        joined = spotify_tracks.loc[rows].reset_index(drop=True)
+        extra = self.lastfm_tracks.drop(columns=['name', 'artist']).take(positions[rows]).reset_index(drop=True)
+        if extra.shape[1]:
+            joined = pd.concat([joined, extra], axis=1)
+        return joined
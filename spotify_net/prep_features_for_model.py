@@ -1,106 +1,384 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/02_prepModel.ipynb.
 
 # %% auto 0
-__all__ = ['ModelPrep']
+__all__ = ['FeatureTransformer', 'ModelPrep']
 
 # %% ../nbs/02_prepModel.ipynb 4
-import boto3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 import pickle
 
+from .instrumentation import DEFAULT_INSTRUMENTATION, instrumented
+from .matching import TrackMatcher
+from .schema import GenreMatrix, compact_track_frame
+from .storage import S3Store
+
 # %% ../nbs/02_prepModel.ipynb 5
+class FeatureTransformer:
+    """
+    The feature preparation of `ModelPrep.transform_features` and `ModelPrep.prepare_final_frame` compiled into a
+    single pass.
+
+    The column layout of a frame is worked out once and kept as index maps, so every output column is written
+    straight into one preallocated array instead of going through `get_dummies` and a zero frame per vocabulary.
+
+    Parameters
+    ----------
+    scaler : sklearn.preprocessing.StandardScaler
+        The fitted scaler of `SCALE_COLUMNS`.
+    genre_embedding : pandas.DataFrame
+        The SVD component vector of every genre, as built by `ModelPrep.build_genre_embedding`.
+    key_series : pandas.Series
+        The key columns of the final frame.
+    time_signature_series : pandas.Series
+        The time signature columns of the final frame.
+    constant : float, optional
+        The constant added to `LOG_COLUMNS` before log-transforming. Defaults to 0.0000001.
+    dtype : numpy.dtype, optional
+        The type of the output columns. Defaults to `numpy.float64`.
+    """
+    LOG_COLUMNS = ['speechiness', 'acousticness', 'instrumentalness']
+    SCALE_COLUMNS = ['danceability', 'energy', 'loudness', 'speechiness', 'acousticness', 'instrumentalness',
+                     'liveness', 'valence', 'tempo', 'duration_ms']
+    ONE_HOT_COLUMNS = {'key': 'key_series', 'time_signature': 'time_signature_series'}
+
+    def __init__(self, scaler, genre_embedding, key_series, time_signature_series, constant=0.0000001,
+                 dtype=np.float64):
+        """
+        Initializes a new instance of the FeatureTransformer class.
+
+        Parameters
+        ----------
+        scaler : sklearn.preprocessing.StandardScaler
+            The fitted scaler of `SCALE_COLUMNS`.
+        genre_embedding : pandas.DataFrame
+            The SVD component vector of every genre, as built by `ModelPrep.build_genre_embedding`.
+        key_series : pandas.Series
+            The key columns of the final frame.
+        time_signature_series : pandas.Series
+            The time signature columns of the final frame.
+        constant : float, optional
+            The constant added to `LOG_COLUMNS` before log-transforming. Defaults to 0.0000001.
+        dtype : numpy.dtype, optional
+            The type of the output columns. Defaults to `numpy.float64`.
+        """
+        self.scaler = scaler
+        self.genre_embedding = genre_embedding
+        self.key_series = key_series
+        self.time_signature_series = time_signature_series
+        self.constant = constant
+        self.dtype = dtype
+        self._plans = {}
+
+        self.scale_mean = getattr(scaler, 'mean_', None)
+        if not getattr(scaler, 'with_mean', True) or self.scale_mean is None:
+            self.scale_mean = np.zeros(len(self.SCALE_COLUMNS))
+        self.scale_std = getattr(scaler, 'scale_', None)
+        if not getattr(scaler, 'with_std', True) or self.scale_std is None:
+            self.scale_std = np.ones(len(self.SCALE_COLUMNS))
+
+    def compile(self, frame):
+        """
+        Works out where every column of the final frame comes from. Plans are kept per column layout.
+
+        Parameters
+        ----------
+        frame : pandas.DataFrame
+            A frame as loaded by `ModelPrep.load_tracks_data`.
+
+        Returns
+        -------
+        dict
+            The plan used by `transform`.
+        """
+        layout = tuple(zip(frame.columns, frame.dtypes))
+        if layout in self._plans:
+            return self._plans[layout]
+
+        genre_columns = [c for c in frame.columns if c.startswith('genre_')]
+        base_columns = [c for c in frame.columns
+                        if c not in genre_columns and c not in self.ONE_HOT_COLUMNS
+                        and not c.startswith(('key_', 'time_signature_'))]
+        # untransformed columns that are not floats are inserted as they are, like TrackFrameBuilder does
+        passthrough = [c for c in base_columns
+                       if c not in self.SCALE_COLUMNS and not pd.api.types.is_float_dtype(frame[c])]
+        float_base = [c for c in base_columns if c not in passthrough]
+        n_components = self.genre_embedding.shape[1]
+        one_hot_names = {column: getattr(self, series).tolist() for column, series in self.ONE_HOT_COLUMNS.items()}
+        columns = (float_base + [f'genre_{i}' for i in range(n_components)]
+                   + one_hot_names['key'] + one_hot_names['time_signature'])
+
+        position = {c: i for i, c in enumerate(float_base)}
+        names = pd.Index(genre_columns).str[len('genre_'):]
+        known = names.isin(self.genre_embedding.index)
+        offset = len(float_base) + n_components
+        one_hot = {}
+        for column, names_list in one_hot_names.items():
+            if column in frame.columns:
+                one_hot[column] = {name: offset + i for i, name in enumerate(names_list)}
+            offset += len(names_list)
+
+        plan = {
+            'columns': columns,
+            'float_base': float_base,
+            'log_positions': [position[c] for c in self.LOG_COLUMNS if c in position],
+            'scale_positions': [position[c] for c in self.SCALE_COLUMNS],
+            'genre_columns': [c for c, k in zip(genre_columns, known) if k],
+            'genre_sparse': all(isinstance(frame[c].dtype, pd.SparseDtype) for c in genre_columns),
+            'genre_slice': slice(len(float_base), len(float_base) + n_components),
+            'genre_vectors': self.genre_embedding.loc[names[known]].to_numpy(),
+            'one_hot': one_hot,
+            'passthrough': [(base_columns.index(c), c) for c in passthrough],
+        }
+        self._plans[layout] = plan
+        return plan
+
+    def transform(self, frame, genre_matrix=None, artist_ids=None):
+        """
+        Prepares a frame for prediction, with the same columns and column order as `ModelPrep.transform_features`
+        followed by `ModelPrep.prepare_final_frame`.
+
+        Parameters
+        ----------
+        frame : pandas.DataFrame
+            A frame as loaded by `ModelPrep.load_tracks_data`.
+        genre_matrix : GenreMatrix, optional
+            The genres of the artists, for a frame without `genre_*` columns.
+        artist_ids : list-like, optional
+            The artist ID of every row of the frame, to find its genres in `genre_matrix`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The frame ready for prediction.
+        """
+        plan = self.compile(frame)
+        out = np.zeros((len(frame), len(plan['columns'])), dtype=self.dtype)
+        out[:, :len(plan['float_base'])] = frame[plan['float_base']].to_numpy(dtype=float)
+
+        log_positions = plan['log_positions']
+        out[:, log_positions] = np.log(out[:, log_positions] + self.constant)
+        scale_positions = plan['scale_positions']
+        out[:, scale_positions] = (out[:, scale_positions] - self.scale_mean) / self.scale_std
+
+        if genre_matrix is not None:
+            out[:, plan['genre_slice']] = genre_matrix.embed_tracks(self.genre_embedding, artist_ids)
+        elif plan['genre_columns'] and plan['genre_sparse']:
+            # the counts of compact frames are multiplied without making them dense
+            counts = frame[plan['genre_columns']].sparse.to_coo().tocsr()
+            out[:, plan['genre_slice']] = counts @ plan['genre_vectors']
+        elif plan['genre_columns']:
+            counts = frame[plan['genre_columns']].to_numpy(dtype=float)
+            np.nan_to_num(counts, copy=False)
+            out[:, plan['genre_slice']] = counts @ plan['genre_vectors']
+
+        # get_dummies names a value's column after its string form and leaves missing values out
+        for column, positions in plan['one_hot'].items():
+            codes, values = pd.factorize(frame[column])
+            targets = np.array([positions.get(f'{column}_{v}', -1) for v in values] + [-1])
+            rows = targets[codes] >= 0
+            out[np.flatnonzero(rows), targets[codes][rows]] = 1
+
+        result = pd.DataFrame(out, index=frame.index, columns=plan['columns'])
+        for loc, column in plan['passthrough']:
+            result.insert(loc, column, frame[column])
+        return result
+
+# %% ../nbs/02_prepModel.ipynb 6
 class ModelPrep:
     """
     A class for preparing data for a Spotify recommendation model.
+
+    Parameters
+    ----------
+    storage : ArtifactStore, optional
+        Where the model artifacts and the tracks of the previous stages are read from, and the prepared frame is
+        written to. Defaults to the `S3_BUCKET` bucket.
+    artifact_cache : ModelArtifactCache, optional
+        A local cache of the scaler and SVD. The artifacts are only downloaded again when they change in the storage.
+    instrumentation : Instrumentation, optional
+        Where the calls of the methods are recorded. Defaults to `DEFAULT_INSTRUMENTATION`.
+    compact : bool, optional
+        Whether to keep `prepped_frame` in the compact schema of `compact_track_frame` and prepare `float32`
+        features. Defaults to False.
+    sparse_genres : bool, optional
+        Whether to read the genres of the Spotify tracks from the `GenreMatrix` saved next to them by a `SpotifyAPI`
+        with `sparse_genres`, instead of from their `genre_*` columns. Defaults to False.
     """
     S3_BUCKET = 'spotify-net'
     SCALER_FILE = 'scaler'
     SVD_FILE = 'svd'
-    SPOTIFY_TRACKS_FILE = 'newer_tracks.csv'
-    LASTFM_TRACKS_FILE = 'last_fm_recent_tracks.csv'
+    SPOTIFY_TRACKS_FILE = 'newer_tracks.parquet'
+    SPOTIFY_GENRES_FILE = 'newer_tracks_genres.npz'
+    LASTFM_TRACKS_FILE = 'last_fm_recent_tracks.parquet'
+    PREDICTION_FILE = 'for_prediction.parquet'
     GENRES_SVD_FILE = 'genres_svd.csv'
     KEY_LIST_FILE = 'key_list.csv'
     TIMESIG_LIST_FILE = 'timeSig_list.csv'
+    DROP_COLUMNS = ['playcount', 'added at', 'artist id', 'id', 'type', 'track_href', 'analysis_url', 'diff', 'uri']
     
-    def __init__(self):
+    def __init__(self, storage=None, artifact_cache=None, instrumentation=None, compact=False, sparse_genres=False):
+        """
+        Initializes a new instance of the ModelPrep class.
+
+        Parameters
+        ----------
+        storage : ArtifactStore, optional
+            Where the model artifacts and the tracks of the previous stages are read from, and the prepared frame is
+            written to. Defaults to the `S3_BUCKET` bucket.
+        artifact_cache : ModelArtifactCache, optional
+            A local cache of the scaler and SVD. The artifacts are only downloaded again when they change in the storage.
+        instrumentation : Instrumentation, optional
+            Where the calls of the methods are recorded. Defaults to `DEFAULT_INSTRUMENTATION`.
+        compact : bool, optional
+            Whether to keep `prepped_frame` in the compact schema of `compact_track_frame` and prepare `float32`
+            features. Defaults to False.
+        sparse_genres : bool, optional
+            Whether to read the genres of the Spotify tracks from the `GenreMatrix` saved next to them by a
+            `SpotifyAPI` with `sparse_genres`, instead of from their `genre_*` columns. Defaults to False.
+        """
         self.scaler = None
         self.svd = None
         self.prepped_frame = None
         self.genre_series = None
+        self.genre_embedding = None
+        self.transformer = None
+        self.load_timings = {}
+        self.match_report = {}
         self.key_series = None
         self.time_signature_series = None
-        self.s3_resource = boto3.resource('s3')
+        self.storage = storage if storage is not None else S3Store(self.S3_BUCKET)
+        self.artifact_cache = artifact_cache
+        self.instrumentation = instrumentation if instrumentation is not None else DEFAULT_INSTRUMENTATION
+        self.compact = compact
+        self.sparse_genres = sparse_genres
+        self.genre_matrix = None
+        self.artist_ids = None
     
+    @instrumented('modelprep.load_scaler')
     def load_scaler(self):
         """
-        Loads the scaler object from S3.
+        Loads the scaler object from the storage.
         """
-        scaler = self.s3_resource.Object(self.S3_BUCKET, self.SCALER_FILE).get()
-        self.scaler = pickle.loads(scaler['Body'].read())
+        if self.artifact_cache is not None:
+            self.scaler = self.artifact_cache.load(self.storage, self.SCALER_FILE)
+        else:
+            self.scaler = pickle.loads(self.storage.read_bytes(self.SCALER_FILE))
 
+    @instrumented('modelprep.load_svd')
     def load_svd(self):
         """
-        Loads the SVD object from S3.
+        Loads the SVD object from the storage.
         """
-        svd = self.s3_resource.Object(self.S3_BUCKET, self.SVD_FILE).get()
-        self.svd = pickle.loads(svd['Body'].read())
+        if self.artifact_cache is not None:
+            # the SVD arrays are mapped from the cached file instead of being read and copied
+            self.svd = self.artifact_cache.load(self.storage, self.SVD_FILE, mmap=True)
+        else:
+            self.svd = pickle.loads(self.storage.read_bytes(self.SVD_FILE))
 
+    @instrumented('modelprep.load_tracks_data')
     def load_tracks_data(self):
         """
-        Loads the Spotify and Last.fm tracks data and merges them.
-        """
-        spotify_tracks = pd.read_csv(f's3://{self.S3_BUCKET}/{self.SPOTIFY_TRACKS_FILE}', index_col=0)
-        lastFM_tracks = pd.read_csv(f's3://{self.S3_BUCKET}/{self.LASTFM_TRACKS_FILE}', index_col=0)
-        spotify_tracks[['name', 'artist']] = spotify_tracks[['name', 'artist']].applymap(str.upper)
-        lastFM_tracks[['name', 'artist']] = lastFM_tracks[['name', 'artist']].applymap(str.upper)
-        self.prepped_frame = pd.merge(spotify_tracks, lastFM_tracks, on=['name', 'artist'])
-        self.prepped_frame = self.prepped_frame.drop([
-            'playcount', 
-            'added at', 
-            'artist id',
-            'id',
-            'type',
-            'track_href',
-            'analysis_url',
-            'type',
-            'diff',
-            'uri'
-        ], axis=1)
+        Loads the Spotify and Last.fm tracks data and joins them with a `TrackMatcher`, keeping its match rate and
+        timings in `match_report`. With `sparse_genres`, the genres are loaded into `genre_matrix` and the artist IDs
+        of the joined tracks kept in `artist_ids`.
+        """
+        # only the columns kept for the model are read, and the artist IDs when they find the genres
+        spotify_tracks = self.storage.read_frame(
+            self.SPOTIFY_TRACKS_FILE,
+            columns=lambda c: c not in self.DROP_COLUMNS or (self.sparse_genres and c == 'artist id'))
+        lastFM_tracks = self.storage.read_frame(self.LASTFM_TRACKS_FILE, columns=['name', 'artist'])
+        # match on normalized names, so case, Unicode form, punctuation and version suffixes don't matter
+        matcher = TrackMatcher(lastFM_tracks)
+        self.prepped_frame = matcher.join(spotify_tracks)
+        self.match_report = matcher.report
+        self.prepped_frame['name'] = self.prepped_frame['name'].str.upper()
+        self.prepped_frame['artist'] = self.prepped_frame['artist'].str.upper()
+        if self.sparse_genres:
+            self.genre_matrix = GenreMatrix.from_bytes(self.storage.read_bytes(self.SPOTIFY_GENRES_FILE))
+            self.artist_ids = self.prepped_frame.pop('artist id').to_numpy()
+        if self.compact:
+            self.prepped_frame = compact_track_frame(self.prepped_frame)
     
+    @instrumented('modelprep.load_genre_series')
     def load_genre_series(self):
         """
-        Loads the genre series data from S3.
+        Loads the genre series data from the storage.
         """
-        genre_series = pd.read_csv(f's3://{self.S3_BUCKET}/{self.GENRES_SVD_FILE}', index_col=0, squeeze=True)
-        self.genre_series = genre_series
+        self.genre_series = self.storage.read_series(self.GENRES_SVD_FILE)
 
+    @instrumented('modelprep.load_key_series')
     def load_key_series(self):
         """
-        Loads the key series data from S3.
+        Loads the key series data from the storage.
         """
-        key_series = pd.read_csv(f's3://{self.S3_BUCKET}/{self.KEY_LIST_FILE}', index_col=0, squeeze=True)
-        self.key_series = key_series
+        self.key_series = self.storage.read_series(self.KEY_LIST_FILE)
 
+    @instrumented('modelprep.load_time_signature_series')
     def load_time_signature_series(self):
         """
-        Loads the time signature series data from S3.
+        Loads the time signature series data from the storage.
         """
-        time_signature_series = pd.read_csv(f's3://{self.S3_BUCKET}/{self.TIMESIG_LIST_FILE}', index_col=0, squeeze=True)
-        self.time_signature_series = time_signature_series
+        self.time_signature_series = self.storage.read_series(self.TIMESIG_LIST_FILE)
 
     # Load genre, key, and time signature data. How is this list of genres being generated?
     # These don't need to be loaded from S3, but I'm doing it anyway because...?     
-    def load_s3(self):
+    @instrumented('modelprep.load_s3', stage=True)
+    def load_s3(self, max_workers=6):
+        """
+        Loads all necessary data from the storage. The loaders run concurrently and share the storage's connection
+        pool, so the load takes about as long as the slowest artifact. The seconds each loader took are kept in
+        `load_timings`.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            The number of loaders run at once. Defaults to 6, one per artifact.
+
+        Returns
+        -------
+        None
         """
-        Loads all necessary data from S3.
+        loaders = [
+            self.load_scaler,
+            self.load_svd,
+            self.load_tracks_data,
+            self.load_genre_series,
+            self.load_key_series,
+            self.load_time_signature_series,
+        ]
+
+        def timed(loader):
+            start = time.perf_counter()
+            loader()
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # list() re-raises the first error of any loader
+            timings = list(executor.map(timed, loaders))
+        self.load_timings = {loader.__name__: seconds for loader, seconds in zip(loaders, timings)}
+        self.load_timings['total'] = time.perf_counter() - start
+        self.build_genre_embedding()
+
+    @instrumented('modelprep.build_genre_embedding')
+    def build_genre_embedding(self):
         """
-        self.load_scaler()
-        self.load_svd()
-        self.load_tracks_data()
-        self.load_genre_series()
-        self.load_key_series()
-        self.load_time_signature_series()
+        Precomputes the SVD component vector of every genre in the vocabulary.
+
+        The SVD is linear, so the reduced genres of a track are the sum of the component vectors of its genres,
+        weighted by their one-hot counts.
+
+        Returns
+        -------
+        None
+        """
+        embedding = pd.DataFrame(self.svd.components_.T, index=self.genre_series.tolist())
+        # a genre listed twice in the vocabulary fills two input columns of the SVD
+        self.genre_embedding = embedding.groupby(level=0, sort=False).sum()
     
     # TODO: should prepped frame be an argument? Why not an instance variable?
     def transform_features(self, constant):
@@ -155,24 +433,71 @@ class ModelPrep:
 
         return pd.concat([current_dataframe, all_columns], axis=1)
 
-    def prepare_final_frame(self):
+    def embed_genres(self, current_genres):
+        """
+        Reduces the one-hot genre columns to the SVD components by summing the precomputed genre vectors. Sparse
+        columns, as in compact frames, are multiplied without making them dense.
+
+        Parameters
+        ----------
+        current_genres : pandas.DataFrame
+            The 'genre_' columns of the prepped DataFrame. Genres missing from the vocabulary are ignored.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The reduced genres, with one 'genre_' column per SVD component.
+        """
+        if self.genre_embedding is None:
+            self.build_genre_embedding()
+        names = current_genres.columns.str[len('genre_'):]
+        known = names.isin(self.genre_embedding.index)
+        counts = current_genres.loc[:, known]
+        if len(counts.columns) and all(isinstance(dtype, pd.SparseDtype) for dtype in counts.dtypes):
+            counts = counts.sparse.to_coo().tocsr()
+        else:
+            counts = counts.fillna(0).to_numpy(dtype=float)
+        vectors = self.genre_embedding.loc[names[known]].to_numpy()
+        return pd.DataFrame(np.asarray(counts @ vectors)).add_prefix('genre_')
+
+    @instrumented('modelprep.prepare_final_frame')
+    def prepare_final_frame(self, use_embedding=True):
         """
         Prepares the final DataFrame for prediction.
 
+        Parameters
+        ----------
+        use_embedding : bool, optional
+            Whether to reduce the genres with the precomputed genre vectors instead of building the dense genre
+            matrix and calling `svd.transform`. Defaults to True.
+
         Returns
         -------
         None
         """
         # One-hot encode genres and reduce to top 60 components using SVD
-        current_genres = self.prepped_frame.loc[:, self.prepped_frame.columns.str.startswith('genre_')]
-        all_genres = pd.DataFrame(np.zeros((len(self.prepped_frame), len(self.genre_series))) , columns=self.genre_series.tolist())
-        all_genres = all_genres.add_prefix('genre_')
-        all_genres.update(current_genres)
-        all_genres.columns = all_genres.columns.str.replace('genre_', '')
+        if use_embedding and self.genre_matrix is not None:
+            # the genres are reduced per artist from the CSR matrix, without building the one-hot columns
+            if self.genre_embedding is None:
+                self.build_genre_embedding()
+            vectors = self.genre_matrix.embed_tracks(self.genre_embedding, self.artist_ids)
+            transformed_genres = pd.DataFrame(vectors).add_prefix('genre_')
+        elif self.genre_matrix is not None:
+            current_genres = self.genre_matrix.to_frame(self.artist_ids, self.prepped_frame.index)
+        else:
+            current_genres = self.prepped_frame.loc[:, self.prepped_frame.columns.str.startswith('genre_')]
+
+        if use_embedding and self.genre_matrix is None:
+            transformed_genres = self.embed_genres(current_genres)
+        elif not use_embedding:
+            all_genres = pd.DataFrame(np.zeros((len(self.prepped_frame), len(self.genre_series))) , columns=self.genre_series.tolist())
+            all_genres = all_genres.add_prefix('genre_')
+            all_genres.update(current_genres)
+            all_genres.columns = all_genres.columns.str.replace('genre_', '')
 
-        # Reduce features to top 60 components
-        transformed_genres = pd.DataFrame(self.svd.transform(all_genres))
-        transformed_genres = transformed_genres.add_prefix('genre_')
+            # Reduce features to top 60 components
+            transformed_genres = pd.DataFrame(self.svd.transform(all_genres))
+            transformed_genres = transformed_genres.add_prefix('genre_')
 
         self.prepped_frame = self.prepped_frame.loc[:, ~self.prepped_frame.columns.str.startswith('genre_')]
         self.prepped_frame = pd.concat([self.prepped_frame, transformed_genres], axis=1)
@@ -181,19 +506,59 @@ class ModelPrep:
         self.prepped_frame = self.update_dataframe_with_prefix(self.prepped_frame, self.key_series, 'key_')
         self.prepped_frame = self.update_dataframe_with_prefix(self.prepped_frame, self.time_signature_series, 'time_signature_')
 
+    @instrumented('modelprep.build_transformer')
+    def build_transformer(self, constant):
+        """
+        Compiles the scaler, the genre vectors and the key and time signature vocabularies into a `FeatureTransformer`.
+
+        Parameters
+        ----------
+        constant : float
+            The constant to add to 'speechiness', 'acousticness', and 'instrumentalness' before log-transforming.
+
+        Returns
+        -------
+        None
+        """
+        if self.genre_embedding is None:
+            self.build_genre_embedding()
+        self.transformer = FeatureTransformer(self.scaler, self.genre_embedding, self.key_series,
+                                              self.time_signature_series, constant,
+                                              np.float32 if self.compact else np.float64)
+
+    @instrumented('modelprep.prepare_features', stage=True)
+    def prepare_features(self, constant):
+        """
+        Prepares the prepped DataFrame for prediction in a single pass. Gives the same frame as `transform_features`
+        followed by `prepare_final_frame`.
+
+        Parameters
+        ----------
+        constant : float
+            The constant to add to 'speechiness', 'acousticness', and 'instrumentalness' before log-transforming.
+
+        Returns
+        -------
+        None
+        """
+        if self.transformer is None or self.transformer.constant != constant:
+            self.build_transformer(constant)
+        self.prepped_frame = self.transformer.transform(self.prepped_frame, self.genre_matrix, self.artist_ids)
+
+    @instrumented('modelprep.save_prepared_frame', stage=True)
     def save_prepared_frame(self):
         """
-        Saves the prepared DataFrame to S3.
+        Saves the prepared DataFrame to the storage, as `PREDICTION_FILE`.
 
         Returns
         -------
         None
         """
-        self.prepped_frame.to_csv(f's3://{self.S3_BUCKET}/for_prediction.csv')
+        self.storage.write_frame(self.prepped_frame, self.PREDICTION_FILE)
         print(self.prepped_frame.shape)
         print('Uploaded to S3')
 
-# %% ../nbs/02_prepModel.ipynb 6
+# %% ../nbs/02_prepModel.ipynb 7
 if __name__ == '__main__':
     frame = ModelPrep()
     frame.load_s3()
@@ -201,6 +566,5 @@ if __name__ == '__main__':
     if frame.prepped_frame.shape[0] == 0:
         print('No new data to process')
     else:
-        frame.transform_features(0.0000001)
-        frame.prepare_final_frame()
+        frame.prepare_features(0.0000001)
         frame.save_prepared_frame()
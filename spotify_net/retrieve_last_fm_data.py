@@ -6,9 +6,13 @@ __all__ = ['LastFmAPI']
 # %% ../nbs/01_retrieve_last.ipynb 4
 import os
 import pandas as pd
-import requests
-import boto3
-import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .auth import SECRET_CACHE
+from .instrumentation import DEFAULT_INSTRUMENTATION, instrumented
+from .storage import S3Store
+from .transport import HTTPTransport
 
 # %% ../nbs/01_retrieve_last.ipynb 5
 class LastFmAPI:
@@ -19,10 +23,20 @@ class LastFmAPI:
     ----------
     region_name : str
         The name of the AWS region where the secrets manager is located.
+    transport : HTTPTransport, optional
+        The HTTP transport to send requests through. A new one is created if not given.
+    storage : ArtifactStore, optional
+        Where the top tracks are handed to the next stage. Defaults to the 'spotify-net' S3 bucket.
+    instrumentation : Instrumentation, optional
+        Where the calls of the methods are recorded. Defaults to `DEFAULT_INSTRUMENTATION`.
+    secret_cache : SecretCache, optional
+        Where the secrets are read from. Defaults to `SECRET_CACHE`, shared by the whole process.
     """
-    required_env_keys = ['spot_clientID', 'spot_clientSECRET', 'spot_ACC', 'spot_REF']
+    required_env_keys = ['last_userAGENT', 'last_username', 'last_apiKEY']
+    TOP_TRACKS_FILE = 'last_fm_recent_tracks.parquet'
+    API_URL = 'https://ws.audioscrobbler.com/2.0/'
 
-    def __init__(self, region_name):
+    def __init__(self, region_name, transport=None, storage=None, instrumentation=None, secret_cache=None):
         """
         Initializes a new instance of the LastFmAPI class.
 
@@ -30,12 +44,26 @@ class LastFmAPI:
         ----------
         region_name : str
             The name of the AWS region where the secrets manager is located.
+        transport : HTTPTransport, optional
+            The HTTP transport to send requests through. A new one is created if not given.
+        storage : ArtifactStore, optional
+            Where the top tracks are handed to the next stage. Defaults to the 'spotify-net' S3 bucket.
+        instrumentation : Instrumentation, optional
+            Where the calls of the methods are recorded. Defaults to `DEFAULT_INSTRUMENTATION`. A transport created
+            here counts its requests in the same instance.
+        secret_cache : SecretCache, optional
+            Where the secrets are read from. Defaults to `SECRET_CACHE`, shared by the whole process.
         """
         self.region_name = region_name
+        self.instrumentation = instrumentation if instrumentation is not None else DEFAULT_INSTRUMENTATION
+        self.transport = transport if transport is not None else HTTPTransport(instrumentation=self.instrumentation)
+        self.storage = storage if storage is not None else S3Store('spotify-net')
+        self.secret_cache = secret_cache if secret_cache is not None else SECRET_CACHE
     
     def get_secret(self, secret_name):
         """
         Retrieves the specified secret from AWS Secrets Manager and sets the corresponding environment variables.
+        The secret is read through the secret cache, so it is only fetched once per process.
 
         Parameters
         ----------
@@ -45,33 +73,28 @@ class LastFmAPI:
         if all([k in os.environ.keys() for k in self.required_env_keys]):
             print('All required environment variables are set')
         else:
-            session = boto3.session.Session()
-            client = session.client(
-                service_name='secretsmanager',
-                region_name=self.region_name
-            )
-            secret_value = client.get_secret_value(
-                SecretId=secret_name
-            )
-            secret_dict = json.loads(secret_value['SecretString'])
+            secret_dict = self.secret_cache.get(secret_name, self.region_name)
             for k, v in secret_dict.items():
                 os.environ[k] = v
 
-    def get_top_tracks(self, period='1month', playcount_cutoff=5):
+    @instrumented('lastfm.get_top_tracks_page')
+    def get_top_tracks_page(self, period='1month', page=1, limit=200):
         """
-        Retrieves the top tracks for the user.
+        Retrieves one page of the user's top tracks.
 
         Parameters
         ----------
         period : str, optional
             The time period for which to retrieve the top tracks. Default is '1month'.
-        playcount_cutoff : int, optional
-            The minimum number of plays required for a track to be included in the results. Default is 1.
+        page : int, optional
+            The page number, starting at 1. Default is 1.
+        limit : int, optional
+            The number of tracks per page. Default is 200.
 
         Returns
         -------
-        pandas.DataFrame
-            A DataFrame containing the top tracks for the user. The DataFrame has columns for the track name, artist name, and play count.
+        dict
+            The 'toptracks' object of the response, with the page's 'track' list and the paging information in '@attr'.
         """
         headers = {
         'user-agent': os.environ.get('last_userAGENT')
@@ -81,16 +104,73 @@ class LastFmAPI:
                     'period': period,
                     'user': os.environ.get('last_username'),
                     'api_key': os.environ.get('last_apiKEY'),
-                    'format': 'json'
+                    'format': 'json',
+                    'limit': limit,
+                    'page': page,
                     }
 
+        r = self.transport.get(self.API_URL, headers=headers, params=payload, endpoint='lastfm.user.gettoptracks')
+        r.raise_for_status()
+        return r.json()['toptracks']
+
+    @instrumented('lastfm.get_top_tracks', stage=True)
+    def get_top_tracks(self, period='1month', playcount_cutoff=5, limit=200, max_workers=4):
+        """
+        Retrieves the top tracks for the user, over as many pages as needed.
+
+        Pages are sorted by playcount, so no page after the first one ending below `playcount_cutoff` is needed. After
+        the first page, the pages are fetched one at a time, then up to `max_workers` at once, the number in flight
+        doubling with every page that comes back above the cutoff. Once a page below the cutoff comes back, no later
+        page is sent and those waiting to be sent are cancelled.
 
-        r = requests.get('https://ws.audioscrobbler.com/2.0/', headers=headers, params=payload)
+        Parameters
+        ----------
+        period : str, optional
+            The time period for which to retrieve the top tracks. Default is '1month'.
+        playcount_cutoff : int, optional
+            The minimum number of plays required for a track to be included in the results. Default is 5.
+        limit : int, optional
+            The number of tracks per page. Default is 200.
+        max_workers : int, optional
+            The most pages fetched at once. Default is 4.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A DataFrame containing the top tracks for the user. The DataFrame has columns for the track name, artist name, and play count.
+        """
+        def below_cutoff(page):
+            return not page['track'] or int(page['track'][-1]['playcount']) < playcount_cutoff
+
+        first = self.get_top_tracks_page(period, 1, limit)
+        pages = {1: first}
+        # the last page needed, until a page below the cutoff comes back
+        last_page = 1 if below_cutoff(first) else int(first.get('@attr', {}).get('totalPages', 1))
+        next_page, width, pending = 2, 1, {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                while next_page <= last_page and len(pending) < width:
+                    pending[executor.submit(self.get_top_tracks_page, period, next_page, limit)] = next_page
+                    next_page += 1
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    number = pending.pop(future)
+                    if number > last_page:
+                        continue
+                    pages[number] = future.result()
+                    if below_cutoff(pages[number]):
+                        last_page = number
+                    else:
+                        width = min(2 * width, max_workers)
+                for future, number in list(pending.items()):
+                    if number > last_page and future.cancel():
+                        del pending[future]
 
         # Apply formatting
-        tracks = r.json()['toptracks']['track']
-        tracks = pd.DataFrame(tracks)
-        tracks = tracks[['name', 'artist', 'playcount']]
+        tracks = [track for number in sorted(pages) if number <= last_page for track in pages[number]['track']]
+        tracks = pd.DataFrame(tracks, columns=['name', 'artist', 'playcount'])
         tracks['artist'] = tracks['artist'].apply(lambda x: x['name'])
         tracks['playcount'] = tracks['playcount'].astype(int)
 
@@ -100,11 +180,109 @@ class LastFmAPI:
 
         return tracks
 
+    @instrumented('lastfm.get_recent_tracks_page')
+    def get_recent_tracks_page(self, page=1, limit=200, from_time=None, to_time=None):
+        """
+        Retrieves one page of the user's scrobbles, newest first.
+
+        Parameters
+        ----------
+        page : int, optional
+            The page number, starting at 1. Default is 1.
+        limit : int, optional
+            The number of scrobbles per page, at most 200. Default is 200.
+        from_time : int, optional
+            Only scrobbles after this Unix time are returned.
+        to_time : int, optional
+            Only scrobbles before this Unix time are returned.
+
+        Returns
+        -------
+        dict
+            The 'recenttracks' object of the response, with the page's 'track' list and the paging information in '@attr'.
+        """
+        headers = {
+        'user-agent': os.environ.get('last_userAGENT')
+        }
+
+        payload = {'method': 'user.getrecenttracks',
+                    'user': os.environ.get('last_username'),
+                    'api_key': os.environ.get('last_apiKEY'),
+                    'format': 'json',
+                    'limit': limit,
+                    'page': page,
+                    }
+        if from_time is not None:
+            payload['from'] = from_time
+        if to_time is not None:
+            payload['to'] = to_time
+
+        r = self.transport.get(self.API_URL, headers=headers, params=payload, endpoint='lastfm.user.getrecenttracks')
+        r.raise_for_status()
+        return r.json()['recenttracks']
+
+    @instrumented('lastfm.sync_scrobbles', stage=True)
+    def sync_scrobbles(self, scrobble_store, limit=200, max_workers=4):
+        """
+        Appends the scrobbles made since the latest one in the store. The pages after the first are fetched
+        concurrently. The end of the range is fixed when the sync starts, so new scrobbles don't shift the pages.
+        The range starts at the second of the latest stored scrobble, whose already stored scrobbles are dropped by
+        `ScrobbleStore.append`.
+
+        Parameters
+        ----------
+        scrobble_store : ScrobbleStore
+            The local scrobble history.
+        limit : int, optional
+            The number of scrobbles per page, at most 200. Default is 200.
+        max_workers : int, optional
+            The number of pages fetched at once. Default is 4.
+
+        Returns
+        -------
+        int
+            The number of scrobbles appended.
+        """
+        watermark = scrobble_store.watermark()
+        from_time = watermark
+        to_time = int(time.time())
+
+        def get_page(page):
+            return self.get_recent_tracks_page(page, limit, from_time, to_time)
+
+        first = get_page(1)
+        total_pages = int(first.get('@attr', {}).get('totalPages', 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = [first] + list(executor.map(get_page, range(2, total_pages + 1)))
+
+        # the track playing now has no date and is not a scrobble yet
+        scrobbles = [track for page in pages for track in page['track'] if 'date' in track]
+        scrobbles = pd.DataFrame({
+            'played_at': pd.to_datetime([int(t['date']['uts']) for t in scrobbles], unit='s', utc=True),
+            'name': [t['name'] for t in scrobbles],
+            'artist': [t['artist']['#text'] for t in scrobbles],
+            'album': [t.get('album', {}).get('#text') for t in scrobbles],
+        })
+        scrobbles = scrobbles.drop_duplicates()
+        return scrobble_store.append(scrobbles)
+
+    @instrumented('lastfm.save_top_tracks', stage=True)
+    def save_top_tracks(self, tracks):
+        """
+        Hands the top tracks to `ModelPrep` through the storage, as `TOP_TRACKS_FILE`.
+
+        Parameters
+        ----------
+        tracks : pandas.DataFrame
+            The top tracks returned by `get_top_tracks`.
+        """
+        self.storage.write_frame(tracks, self.TOP_TRACKS_FILE)
+
 
 # %% ../nbs/01_retrieve_last.ipynb 6
 if __name__ == '__main__':
     last = LastFmAPI('us-east-1')
     last.get_secret('last_keys')
     tracks = last.get_top_tracks()
-    tracks.to_csv('s3://spotify-net/last_fm_recent_tracks.csv')
+    last.save_top_tracks(tracks)
     print('Retrieved')
@@ -1,23 +1,141 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/00_retrieve_spotify_data.ipynb.
 
 # %% auto 0
-__all__ = ['SpotifyAPI']
+__all__ = ['TrackFrameBuilder', 'SpotifyAPI']
 
 # %% ../nbs/00_retrieve_spotify_data.ipynb 4
 import requests
 import base64
 import json
 import pandas as pd
-import boto3
-import math
+import numpy as np
 import os
+import threading
+import time
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 pd.set_option('display.max_columns', None)
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 
+from .auth import SECRET_CACHE, TokenManager
+from .coalesce import IDCoalescer
+from .instrumentation import DEFAULT_INSTRUMENTATION, instrumented
+from .schema import GENRE_DTYPE, GENRE_PREFIX, GenreMatrix, compact_track_frame
+from .storage import S3Store
+from .transport import HTTPTransport, RateLimiter
+
 # %% ../nbs/00_retrieve_spotify_data.ipynb 5
+class TrackFrameBuilder:
+    """
+    Collects the per-page track frames of a playlist column by column and builds the combined DataFrame in one pass.
+
+    Pages rarely share all their `genre_*` columns, so concatenating them frame by frame reindexes every page against
+    the growing union of columns. The builder instead keeps each column's pieces with their row offsets and assembles
+    every column once, filling the rows of pages that lack it with NaN.
+
+    Parameters
+    ----------
+    compact : bool, optional
+        Whether to build the genre columns only some pages have as sparse `uint8` columns, without a dense block.
+        Defaults to False.
+    """
+    def __init__(self, compact=False):
+        """
+        Initializes a new, empty instance of the TrackFrameBuilder class.
+
+        Parameters
+        ----------
+        compact : bool, optional
+            Whether to build the genre columns only some pages have as sparse `uint8` columns, without a dense
+            block. Defaults to False.
+        """
+        self.compact = compact
+        self._columns = {}
+        self._indexes = []
+        self._num_rows = 0
+
+    def add(self, frame):
+        """
+        Adds the rows of one page. Repeated column names within the page are dropped, keeping the first.
+
+        Parameters
+        ----------
+        frame : pandas.DataFrame
+            The track frame of one page, as returned by `SpotifyAPI.get_subset_features`.
+        """
+        seen = set()
+        for position, name in enumerate(frame.columns):
+            if name in seen:
+                continue
+            seen.add(name)
+            self._columns.setdefault(name, []).append((self._num_rows, frame.iloc[:, position]))
+        self._indexes.append(frame.index)
+        self._num_rows += len(frame)
+
+    def build(self):
+        """
+        Builds the combined DataFrame, with the columns in the order they were first seen.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The rows of all pages added so far.
+        """
+        if not self._indexes:
+            return pd.DataFrame()
+
+        complete, sparse_numeric, sparse_other = {}, [], {}
+        for name, parts in self._columns.items():
+            if sum(len(part) for _, part in parts) == self._num_rows:
+                complete[name] = pd.concat([part for _, part in parts], ignore_index=True)
+            elif all(pd.api.types.is_numeric_dtype(part) for _, part in parts):
+                sparse_numeric.append(name)
+            else:
+                values = np.full(self._num_rows, np.nan, dtype=object)
+                for start, part in parts:
+                    values[start:start+len(part)] = part.to_numpy(dtype=object)
+                sparse_other[name] = values
+
+        sparse_genres = {}
+        if self.compact:
+            genres = [name for name in sparse_numeric if name.startswith(GENRE_PREFIX)]
+            sparse_numeric = [name for name in sparse_numeric if not name.startswith(GENRE_PREFIX)]
+            sparse_genres = self._build_sparse(genres)
+
+        # the columns only some pages have (mostly genres) are filled into a single float block
+        block = np.full((self._num_rows, len(sparse_numeric)), np.nan)
+        for position, name in enumerate(sparse_numeric):
+            for start, part in self._columns[name]:
+                block[start:start+len(part), position] = part.to_numpy(dtype=float)
+
+        # inserting the other columns around the block keeps it from being copied
+        frame = pd.DataFrame(block, columns=sparse_numeric, copy=False)
+        for position, name in enumerate(self._columns):
+            if name in complete:
+                frame.insert(position, name, complete[name])
+            elif name in sparse_other:
+                frame.insert(position, name, sparse_other[name])
+            elif name in sparse_genres:
+                frame.insert(position, name, sparse_genres[name])
+        frame.index = self._indexes[0].append(self._indexes[1:])
+        return frame
+
+    def _build_sparse(self, names):
+        """
+        Builds the given columns as sparse `uint8` columns, with the rows of pages that lack them as zeros. Only one
+        dense column exists at a time.
+        """
+        columns = {}
+        for name in names:
+            values = np.zeros(self._num_rows, dtype=np.uint8)
+            for start, part in self._columns[name]:
+                values[start:start+len(part)] = np.nan_to_num(part.to_numpy(dtype=float))
+            columns[name] = pd.arrays.SparseArray(values, dtype=GENRE_DTYPE)
+        return columns
+
+# %% ../nbs/00_retrieve_spotify_data.ipynb 6
 class SpotifyAPI:
     """
     A class for interacting with the Spotify API.
@@ -28,10 +146,45 @@ class SpotifyAPI:
         The name of the AWS region where the secrets manager is located.
     playlist_id : str
         The ID of the Spotify playlist.
+    transport : HTTPTransport, optional
+        The HTTP transport to send requests through. A new one is created if not given.
+    genre_cache : ArtistGenreCache, optional
+        A persistent cache of artist genres. Only artists missing from it are requested from the API.
+    feature_store : AudioFeatureStore, optional
+        A local store of audio features. Only tracks missing from it are requested from the API.
+    storage : ArtifactStore, optional
+        Where the new tracks are handed to the next stage. Defaults to the 'spotify-net' S3 bucket.
+    instrumentation : Instrumentation, optional
+        Where the calls of the methods are recorded. Defaults to `DEFAULT_INSTRUMENTATION`.
+    secret_cache : SecretCache, optional
+        Where the secrets are read from. Defaults to `SECRET_CACHE`, shared by the whole process.
+    token_refresh_margin : float, optional
+        How many seconds before its expiry the access token is refreshed. Defaults to 60.
+    tokens : TokenManager, optional
+        The token manager of another client of the same account, to share its access token. A new one is created
+        if not given.
+    artist_lookup : IDCoalescer, optional
+        Where the genres of the artists are looked up when coalescing. Share one between clients to coalesce their
+        lookups. A new one is created if not given.
+    feature_lookup : IDCoalescer, optional
+        Where the audio features of the tracks are looked up when coalescing. A new one is created if not given.
+    compact : bool, optional
+        Whether to keep `df_tracks` in the compact schema of `compact_track_frame`. Defaults to False.
+    sparse_genres : bool, optional
+        Whether to keep the genres in `genre_matrix`, a `GenreMatrix` of the artists, instead of one-hot `genre_*`
+        columns of `df_tracks`. `save_new_tracks` then hands the genres of the new tracks' artists to `ModelPrep` as
+        well. Defaults to False.
     """
     required_env_keys = ['spot_clientID', 'spot_clientSECRET', 'spot_ACC', 'spot_REF']
+    PAGE_SIZE = 100
+    API_URL = 'https://api.spotify.com/v1'
+    TOKEN_URL = 'https://accounts.spotify.com/api/token'
+    NEW_TRACKS_FILE = 'newer_tracks.parquet'
+    NEW_GENRES_FILE = 'newer_tracks_genres.npz'
 
-    def __init__(self, region_name):
+    def __init__(self, region_name, transport=None, genre_cache=None, feature_store=None, storage=None,
+                 instrumentation=None, secret_cache=None, token_refresh_margin=60, tokens=None, artist_lookup=None,
+                 feature_lookup=None, compact=False, sparse_genres=False):
         """
         Initializes a new instance of the SpotifyAPI class.
 
@@ -39,14 +192,60 @@ class SpotifyAPI:
         ----------
         region_name : str
             The name of the AWS region where the secrets manager is located.
+        transport : HTTPTransport, optional
+            The HTTP transport to send requests through. A new one is created if not given.
+        genre_cache : ArtistGenreCache, optional
+            A persistent cache of artist genres. Only artists missing from it are requested from the API.
+        feature_store : AudioFeatureStore, optional
+            A local store of audio features. Only tracks missing from it are requested from the API.
+        storage : ArtifactStore, optional
+            Where the new tracks are handed to the next stage. Defaults to the 'spotify-net' S3 bucket.
+        instrumentation : Instrumentation, optional
+            Where the calls of the methods are recorded. Defaults to `DEFAULT_INSTRUMENTATION`. A transport created
+            here counts its requests in the same instance.
+        secret_cache : SecretCache, optional
+            Where the secrets are read from. Defaults to `SECRET_CACHE`, shared by the whole process.
+        token_refresh_margin : float, optional
+            How many seconds before its expiry the access token is refreshed. Defaults to 60.
+        tokens : TokenManager, optional
+            The token manager of another client of the same account, to share its access token. A new one is created
+            if not given.
+        artist_lookup : IDCoalescer, optional
+            Where the genres of the artists are looked up when coalescing. Share one between clients to coalesce
+            their lookups. A new one is created if not given.
+        feature_lookup : IDCoalescer, optional
+            Where the audio features of the tracks are looked up when coalescing. A new one is created if not given.
+        compact : bool, optional
+            Whether to keep `df_tracks` in the compact schema of `compact_track_frame`. Defaults to False.
+        sparse_genres : bool, optional
+            Whether to keep the genres in `genre_matrix`, a `GenreMatrix` of the artists, instead of one-hot
+            `genre_*` columns of `df_tracks`. `save_new_tracks` then hands the genres of the new tracks' artists to
+            `ModelPrep` as well. Defaults to False.
         """
         self.region_name = region_name
+        self.instrumentation = instrumentation if instrumentation is not None else DEFAULT_INSTRUMENTATION
+        self.transport = transport if transport is not None else HTTPTransport(instrumentation=self.instrumentation)
+        self.genre_cache = genre_cache
+        self.feature_store = feature_store
+        self.storage = storage if storage is not None else S3Store('spotify-net')
         self.playlist_id = None
+        self.playlist_index = None
         self.df_tracks = pd.DataFrame()
+        self.secret_cache = secret_cache if secret_cache is not None else SECRET_CACHE
+        # the token from the environment has no known expiry, so it is used until the API rejects it
+        self.tokens = tokens if tokens is not None else TokenManager(
+            self._refresh_token, refresh_margin=token_refresh_margin, initial_token=lambda: os.environ.get('spot_ACC'))
+        self.artist_lookup = artist_lookup if artist_lookup is not None else IDCoalescer(self._fetch_artists, 50, 8)
+        self.feature_lookup = feature_lookup if feature_lookup is not None else IDCoalescer(
+            self._fetch_audio_features, 100, 8)
+        self._queued = None
+        self.compact = compact
+        self.genre_matrix = GenreMatrix() if sparse_genres else None
     
     def get_secret(self, secret_name):
         """
         Retrieves the specified secret from AWS Secrets Manager and sets the corresponding environment variables.
+        The secret is read through the secret cache, so it is only fetched once per process.
 
         Parameters
         ----------
@@ -56,21 +255,14 @@ class SpotifyAPI:
         if all([k in os.environ.keys() for k in self.required_env_keys]):
             print('All required environment variables are set')
         else:
-            session = boto3.session.Session()
-            client = session.client(
-                service_name='secretsmanager',
-                region_name=self.region_name
-            )
-            secret_value = client.get_secret_value(
-                SecretId=secret_name
-            )
-            secret_dict = json.loads(secret_value['SecretString'])
+            secret_dict = self.secret_cache.get(secret_name, self.region_name)
             for k, v in secret_dict.items():
                 os.environ[k] = v
 
     def create_headers(self):
         """
-        Creates the headers required for making requests to the Spotify API.
+        Creates the headers required for making requests to the Spotify API. The access token is refreshed first if
+        it is about to expire.
 
         Returns
         -------
@@ -78,15 +270,28 @@ class SpotifyAPI:
             A dictionary containing the required headers.
         """
         return {
-            'Authorization': f'Bearer {os.environ.get("spot_ACC")}'
+            'Authorization': f'Bearer {self.tokens.get()}'
         }
 
-    def refresh_token(self):
+    def refresh_token(self, stale_headers=None):
         """
         Refreshes the access token required for making requests to the Spotify API.
+
+        Only one thread refreshes at a time. When `stale_headers` is given and the token has already been
+        replaced by another thread since those headers were created, the refresh is skipped.
+
+        Parameters
+        ----------
+        stale_headers : dict, optional
+            The headers of the request that failed with a 401.
         """
-        TOKEN_URL = 'https://accounts.spotify.com/api/token'
+        stale_token = None
+        if stale_headers is not None:
+            stale_token = stale_headers['Authorization'][len('Bearer '):]
+        self.tokens.refresh(stale_token)
 
+    @instrumented('spotify.refresh_token')
+    def _refresh_token(self):
         message = os.environ.get('spot_clientID') + ':' + os.environ.get('spot_clientSECRET')
         messageBytes = message.encode('ascii')
         base64Bytes = base64.b64encode(messageBytes)
@@ -103,9 +308,70 @@ class SpotifyAPI:
             'redirect_uri': 'http://localhost:8888/callback',
         }
 
-        r_refresh = requests.post(TOKEN_URL, headers=headers, params=pars_refresh)
-        access_token = r_refresh.json()['access_token']
-        os.environ['spot_ACC'] = access_token
+        r_refresh = self.transport.post(self.TOKEN_URL, headers=headers, params=pars_refresh,
+                                        endpoint='spotify.token')
+        r_refresh.raise_for_status()
+        token = r_refresh.json()
+        os.environ['spot_ACC'] = token['access_token']
+        # Spotify may rotate the refresh token too
+        if token.get('refresh_token'):
+            os.environ['spot_REF'] = token['refresh_token']
+        return token['access_token'], token.get('expires_in')
+
+    def _get(self, url, endpoint=None):
+        """
+        Sends a GET request to the Spotify API, refreshing the access token once if it has expired.
+        """
+        headers = self.create_headers()
+        response = self.transport.get(url, headers=headers, endpoint=endpoint)
+
+        if response.status_code == 401:
+            self.refresh_token(stale_headers=headers)
+            response = self.transport.get(url, headers=self.create_headers(), endpoint=endpoint)
+
+        response.raise_for_status()
+        return response
+
+    @instrumented('spotify.get_playlist_snapshot')
+    def get_playlist_snapshot(self, playlist_id):
+        """
+        Retrieves the current snapshot ID and track count of the specified Spotify playlist.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the Spotify playlist.
+
+        Returns
+        -------
+        str
+            The snapshot ID of the playlist.
+        int
+            The number of tracks in the playlist.
+        """
+        playlist_url = f'{self.API_URL}/playlists/{playlist_id}?fields=snapshot_id,tracks.total'
+        playlist = self._get(playlist_url, endpoint='spotify.playlist').json()
+        return playlist['snapshot_id'], playlist['tracks']['total']
+
+    @instrumented('spotify.get_track_page')
+    def get_track_page(self, playlist_id, offset):
+        """
+        Retrieves one page of the specified Spotify playlist, including the paging fields such as 'total'.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the Spotify playlist to retrieve tracks from.
+        offset : int
+            The offset to use when retrieving tracks.
+
+        Returns
+        -------
+        dict
+            The playlist tracks page as returned by the API.
+        """
+        track_url = f'{self.API_URL}/playlists/{playlist_id}/tracks?limit={self.PAGE_SIZE}&offset={offset}'
+        return self._get(track_url, endpoint='spotify.playlist_tracks').json()
 
     def get_track_subset(self, playlist_id, offset):
         """
@@ -123,17 +389,168 @@ class SpotifyAPI:
         list
             A list of track items.
         """
-        track_url = f'https://api.spotify.com/v1/playlists/{playlist_id}/tracks?limit=100&offset={offset}'
-        headers = self.create_headers()
-        track_subset = requests.get(track_url, headers=headers)
-
-        if track_subset.status_code == 401:
-            self.refresh_token()
-            headers = self.create_headers()
-            track_subset = requests.get(track_url, headers=headers)
-        
-        return track_subset.json()['items']
+        return self.get_track_page(playlist_id, offset)['items']
+
+    @instrumented('spotify.get_artist_genres')
+    def get_artist_genres(self, artist_ids):
+        """
+        Retrieves the genres of the given artists. Artists found in the genre cache are not requested again, and the
+        remaining ones are requested in batches of 50 and added to the cache.
+
+        Parameters
+        ----------
+        artist_ids : list
+            The Spotify artist IDs to retrieve genres for.
+
+        Returns
+        -------
+        dict
+            A dictionary mapping each artist ID to its list of genres.
+        """
+        genres, missing = self.cached_genres(artist_ids)
+
+        fetched = {}
+        for i in range(0, len(missing), 50):
+            fetched.update(self._fetch_artists(missing[i:i+50]))
+
+        return self.store_genres(genres, fetched)
+
+    def _fetch_artists(self, artist_ids):
+        """
+        Requests the genres of at most 50 artists, and returns them by artist ID.
+        """
+        art_url = f"{self.API_URL}/artists?ids={','.join(artist_ids)}"
+        r_art = self._get(art_url, endpoint='spotify.artists')
+        return {a['id']: a['genres'] for a in r_art.json()['artists'] if a is not None}
+
+    def cached_genres(self, artist_ids):
+        """
+        Looks up artists in the genre cache, the first half of `get_artist_genres`.
+
+        Parameters
+        ----------
+        artist_ids : list
+            The Spotify artist IDs, possibly repeated.
+
+        Returns
+        -------
+        dict
+            The genres of the artists found in the cache, by artist ID.
+        list
+            The other artist IDs, without repeats, to be requested.
+        """
+        artist_ids = list(dict.fromkeys(artist_ids))
+        genres = self.genre_cache.get_many(artist_ids) if self.genre_cache is not None else {}
+        return genres, [a for a in artist_ids if a not in genres]
+
+    def store_genres(self, genres, fetched):
+        """
+        Adds requested genres to the genre cache, the second half of `get_artist_genres`.
+
+        Parameters
+        ----------
+        genres : dict
+            The cached genres, as returned by `cached_genres`. Updated in place.
+        fetched : dict
+            The requested genres, by artist ID.
+
+        Returns
+        -------
+        dict
+            The genres of every artist, by artist ID.
+        """
+        if self.genre_cache is not None and fetched:
+            self.genre_cache.put_many(fetched)
+        genres.update(fetched)
+        return genres
+
+    @instrumented('spotify.get_audio_features')
+    def get_audio_features(self, track_ids):
+        """
+        Retrieves the audio features of the given tracks. Tracks found in the feature store are not requested again,
+        and the remaining ones are requested in batches of 100 and added to the store.
+
+        Parameters
+        ----------
+        track_ids : list
+            The Spotify track IDs to retrieve audio features for.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A DataFrame with one row of audio features per track ID, in the order given.
+        """
+        stored, missing = self.stored_features(track_ids)
+
+        records = []
+        # TODO: look into 'Audio Analysis' endpoint: https://developer.spotify.com/documentation/web-api/reference/get-audio-analysis
+        for i in range(0, len(missing), 100):
+            records.extend(self._fetch_audio_features(missing[i:i+100]).values())
+
+        return self.feature_frame(track_ids, stored, records)
+
+    def _fetch_audio_features(self, track_ids):
+        """
+        Requests the audio features of at most 100 tracks, and returns them by track ID.
+        """
+        feat_url = f"{self.API_URL}/audio-features?ids={','.join(track_ids)}"
+        r_feat = self._get(feat_url, endpoint='spotify.audio_features')
+        return {f['id']: f for f in r_feat.json()['audio_features'] if f is not None}
+
+    def stored_features(self, track_ids):
+        """
+        Looks up tracks in the feature store, the first half of `get_audio_features`.
+
+        Parameters
+        ----------
+        track_ids : list
+            The Spotify track IDs, possibly repeated.
+
+        Returns
+        -------
+        pandas.DataFrame or None
+            The audio features found in the store, indexed by track ID, or None without a store.
+        list
+            The other track IDs, without repeats, to be requested.
+        """
+        if self.feature_store is not None:
+            return self.feature_store.get_many(track_ids)
+        return None, list(dict.fromkeys(track_ids))
+
+    def feature_frame(self, track_ids, stored, records):
+        """
+        Adds requested audio features to the feature store, the second half of `get_audio_features`.
+
+        Parameters
+        ----------
+        track_ids : list
+            The Spotify track IDs, in the order of the result.
+        stored : pandas.DataFrame or None
+            The stored audio features, as returned by `stored_features`.
+        records : list
+            The requested audio features, one dictionary per track.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row of audio features per track ID, in the order given.
+        """
+        fetched = pd.DataFrame(records)
+        if self.feature_store is not None and len(fetched):
+            self.feature_store.put(fetched)
+        if stored is None or not len(stored):
+            features = fetched
+        elif not len(fetched):
+            features = stored
+        else:
+            features = pd.concat([stored, fetched.set_index('id', drop=False)])
+
+        if not len(features):
+            return pd.DataFrame(index=range(len(track_ids)))
+        features = features.set_index('id', drop=False)
+        return features.reindex(track_ids).reset_index(drop=True)
     
+    @instrumented('spotify.get_subset_features')
     def get_subset_features(self, track_items):
         """
         Given a list of track items, returns a pandas DataFrame containing information about each track, including the track ID, name, artist, artist ID, and audio features such as danceability, energy, and tempo.
@@ -148,13 +565,39 @@ class SpotifyAPI:
         pandas.DataFrame
             A DataFrame containing information about each track, including the track ID, name, artist, artist ID, and audio features such as danceability, energy, and tempo.
         """
+        track_info = self.track_info(track_items)
+
+        # get genres
+        artist_genres = self.get_artist_genres(track_info['artist id'].tolist())
+        track_info = self.add_genres(track_info, artist_genres)
+
+        # Get audio features
+        feat_frame = self.get_audio_features(track_info['id'].tolist())
+        track_features = pd.concat([track_info, feat_frame], axis=1)
+
+        return track_features 
+
+    def track_info(self, track_items):
+        """
+        Reads the ID, name, artist, artist ID and date added of track items.
+
+        Parameters
+        ----------
+        track_items : list
+            The track items of a playlist page.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per track item.
+        """
         track_ids = [t['track']['id'] for t in track_items]
         track_names = [t['track']['name'] for t in track_items]
         track_added = [t['added_at'] for t in track_items]
         track_artists = [t['track']['artists'][0]['name'] for t in track_items]
         artist_id = [t['track']['artists'][0]['id'] for t in track_items]
 
-        track_info = pd.DataFrame({
+        return pd.DataFrame({
             'added at': pd.to_datetime(track_added),
             'id': track_ids,
             'name': track_names,
@@ -162,30 +605,30 @@ class SpotifyAPI:
             'artist id': artist_id,
             })
 
+    def add_genres(self, track_info, artist_genres):
+        """
+        Appends the one-hot `genre_*` columns of the first three genres of every track's artist, or adds the genres to
+        `genre_matrix` if there is one.
+
+        Parameters
+        ----------
+        track_info : pandas.DataFrame
+            The tracks, as returned by `track_info`.
+        artist_genres : dict
+            The genres of the artists, by artist ID.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The tracks with their genre columns, or unchanged with a `genre_matrix`.
+        """
+        if self.genre_matrix is not None:
+            self.genre_matrix.add({a: artist_genres.get(a, [])[:3] for a in track_info['artist id'].unique()})
+            return track_info
+
         artist_list = track_info['artist id'].tolist()
+        genre_list = [artist_genres.get(a, []) for a in artist_list]
 
-        # get genres
-        genre_list = []
-        index = 0
-        temp_list = artist_list[index: index+50]
-
-        # TODO: is this loop necessary since I'm already inside of a subset with a limit?
-        for i in range(math.ceil(len(artist_list)/50)):
-            artist_join = ','.join(temp_list)
-            art_url = f'https://api.spotify.com/v1/artists?ids={artist_join}'
-            r_art = requests.get(art_url, headers=self.create_headers())
-            print(r_art.status_code)
-            
-            try:
-                g = [i['genres'] for i in r_art.json()['artists']]
-            except IndexError:
-                g = ['No Genre']
-
-            genre_list.extend(g)
-            index += 50
-            temp_list = artist_list[index: index+50]
-    
-    
         genre_series = pd.Series(genre_list, index=track_info.index)
         trimmed_genre_series = genre_series.apply(lambda x: x[:3])
 
@@ -193,20 +636,10 @@ class SpotifyAPI:
         genre_series_exploded = trimmed_genre_series.explode()
         genre_one_hot = pd.get_dummies(genre_series_exploded, prefix='genre')
         genre_one_hot = genre_one_hot.groupby(genre_one_hot.index).sum()
-        track_info = pd.concat([track_info, genre_one_hot], axis=1)
-
-        # Get audio features
-        track_ids_combined = ','.join(track_ids)
-        # TODO: look into 'Audio Analysis' endpoint: https://developer.spotify.com/documentation/web-api/reference/get-audio-analysis
-        feat_url = f'https://api.spotify.com/v1/audio-features?ids={track_ids_combined}'
-        headers = self.create_headers()
-        r_feat = requests.get(feat_url, headers=headers)
-        feat_frame = pd.DataFrame(r_feat.json()['audio_features'])
-        track_features = pd.concat([track_info, feat_frame], axis=1)
+        return pd.concat([track_info, genre_one_hot], axis=1)
 
-        return track_features 
-
-    def get_playlist_features(self, playlist_id):
+    @instrumented('spotify.get_playlist_features', stage=True)
+    def get_playlist_features(self, playlist_id, parallel=False, max_workers=8, coalesce=False):
         """
         Given a Spotify playlist ID, returns a pandas DataFrame containing information about all the tracks in the playlist, including the track ID, name, artist, artist ID, and audio features such as danceability, energy, and tempo.
 
@@ -214,33 +647,264 @@ class SpotifyAPI:
         ----------
         playlist_id : str
             The ID of the Spotify playlist.
+        parallel : bool, optional
+            Whether to fetch the pages after the first one concurrently. Defaults to False.
+        max_workers : int, optional
+            The maximum number of pages fetched at once when `parallel` is True. Defaults to 8.
+        coalesce : bool, optional
+            Whether to fetch every page first and look up the artists and audio features of the whole playlist
+            through `artist_lookup` and `feature_lookup`, in full batches, instead of page by page. Uses the pages
+            queued by `queue_playlist_features` if the playlist was queued. Defaults to False.
 
         Returns
         -------
         pandas.DataFrame
             A DataFrame containing information about all the tracks in the playlist, including the track ID, name, artist, artist ID, and audio features such as danceability, energy, and tempo.
         """
+        self.playlist_id = playlist_id
+        builder = TrackFrameBuilder(self.compact)
+        if len(self.df_tracks):
+            builder.add(self.df_tracks)
+
+        if coalesce:
+            if self._queued is None or self._queued['playlist_id'] != playlist_id:
+                self.queue_playlist_features(playlist_id, parallel, max_workers)
+            pages = self._get_queued_features()
+        elif parallel:
+            pages = self._get_pages_parallel(playlist_id, max_workers)
+        else:
+            pages = (self.get_subset_features(items) for items in self.iter_track_pages(playlist_id))
+
+        for page in pages:
+            builder.add(page)
+
+        self.df_tracks = self.deduplicate(builder.build())
+
+        if self.feature_store is not None:
+            self.feature_store.save()
+
+    def deduplicate(self, frame):
+        """
+        Drops the repeated tracks of a built frame, converting it to the compact schema first in compact mode.
+
+        Parameters
+        ----------
+        frame : pandas.DataFrame
+            The frame built by a `TrackFrameBuilder`.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The frame for `df_tracks`.
+        """
+        if not self.compact:
+            return frame.drop_duplicates()
+        frame = compact_track_frame(frame)
+        # the genres follow from the artist, so comparing the other columns finds the same rows without hashing
+        # every sparse genre column
+        return frame.drop_duplicates(subset=[c for c in frame.columns if not c.startswith(GENRE_PREFIX)])
+
+    def iter_track_pages(self, playlist_id):
+        """
+        Yields the track items of the specified Spotify playlist one page at a time.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the Spotify playlist.
+
+        Yields
+        ------
+        list
+            The track items of one page.
+        """
         offset = 0
         # TODO: has default limit changed to 50? https://developer.spotify.com/documentation/web-api/reference/get-playlists-tracks
 
         while True:
             subset = self.get_track_subset(playlist_id, offset)
-            self.df_tracks = self.df_tracks.append(self.get_subset_features(subset))
+            if subset:
+                yield subset
+
+            if len(subset) < self.PAGE_SIZE:  # a short page is the last one
+                break
+
+            offset += self.PAGE_SIZE
+
+    def _get_pages_parallel(self, playlist_id, max_workers):
+        """
+        Reads 'total' from the first page, then fetches the remaining pages and their features through a
+        bounded worker pool. The page frames are returned in playlist order.
+        """
+        first_page = self.get_track_page(playlist_id, 0)
+        offsets = range(self.PAGE_SIZE, first_page['total'], self.PAGE_SIZE)
+
+        def page_features(offset):
+            return self.get_subset_features(self.get_track_subset(playlist_id, offset))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            first_frame = executor.submit(self.get_subset_features, first_page['items']) if first_page['items'] else None
+            frames = list(executor.map(page_features, offsets))
+
+        return ([first_frame.result()] if first_frame is not None else []) + frames
+
+    def _get_items_parallel(self, playlist_id, max_workers):
+        """
+        Reads 'total' from the first page, then fetches the remaining pages through a bounded worker pool. The track
+        items are returned page by page, in playlist order.
+        """
+        first_page = self.get_track_page(playlist_id, 0)
+        offsets = range(self.PAGE_SIZE, first_page['total'], self.PAGE_SIZE)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = list(executor.map(lambda offset: self.get_track_subset(playlist_id, offset), offsets))
+
+        return [items for items in [first_page['items']] + pages if items]
+
+    @instrumented('spotify.queue_playlist_features')
+    def queue_playlist_features(self, playlist_id, parallel=False, max_workers=8):
+        """
+        Fetches every page of the playlist and queues the artists and tracks missing from the genre cache and the
+        feature store on `artist_lookup` and `feature_lookup`. The next `get_playlist_features` of the playlist with
+        `coalesce=True` builds its frame from these pages.
+
+        Queue several playlists on clients sharing their lookups before getting their features, and their artists
+        and tracks are looked up together.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the Spotify playlist.
+        parallel : bool, optional
+            Whether to fetch the pages after the first one concurrently. Defaults to False.
+        max_workers : int, optional
+            The maximum number of pages fetched at once when `parallel` is True. Defaults to 8.
+        """
+        if parallel:
+            pages = self._get_items_parallel(playlist_id, max_workers)
+        else:
+            pages = list(self.iter_track_pages(playlist_id))
+        track_infos = [self.track_info(items) for items in pages]
+
+        genres, missing_artists = self.cached_genres([a for info in track_infos for a in info['artist id']])
+        stored, missing_tracks = self.stored_features([t for info in track_infos for t in info['id']])
+        missing_artist_set, missing_track_set = set(missing_artists), set(missing_tracks)
+        for info in track_infos:
+            self.artist_lookup.add([a for a in info['artist id'] if a in missing_artist_set])
+            self.feature_lookup.add([t for t in info['id'] if t in missing_track_set])
+
+        self._queued = {
+            'playlist_id': playlist_id,
+            'track_infos': track_infos,
+            'genres': genres,
+            'missing_artists': missing_artists,
+            'stored': stored,
+            'missing_tracks': missing_tracks,
+        }
+
+    def _get_queued_features(self):
+        """
+        Looks up the artists and tracks of the queued playlist, and fans the results back out into one frame per page,
+        the same as `get_subset_features` returns for the page.
+        """
+        queued, self._queued = self._queued, None
+        track_infos = queued['track_infos']
+
+        artist_genres = self.store_genres(queued['genres'], self.artist_lookup.get(queued['missing_artists']))
+        fetched = self.feature_lookup.get(queued['missing_tracks'])
+        track_ids = list(dict.fromkeys(t for info in track_infos for t in info['id']))
+        features = self.feature_frame(track_ids, queued['stored'], list(fetched.values()))
+        features.index = track_ids
+
+        return [
+            pd.concat([self.add_genres(info, artist_genres), features.reindex(info['id']).reset_index(drop=True)],
+                      axis=1)
+            for info in track_infos
+        ]
+
+    @instrumented('spotify.sync_playlist_features', stage=True)
+    def sync_playlist_features(self, playlist_id, playlist_index, parallel=False, max_workers=8):
+        """
+        Incremental counterpart of `get_playlist_features`, backed by a local index of the playlist.
+
+        When the playlist's snapshot ID matches the index, nothing is downloaded. Otherwise only the pages at the end of
+        the playlist holding tracks added after the index's watermark are fetched. If the index no longer adds up to the
+        playlist's track count (for example because tracks were removed elsewhere), the whole playlist is downloaded again.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the Spotify playlist.
+        playlist_index : PlaylistIndex
+            The local index of the playlist. It is updated with the result.
+        parallel : bool, optional
+            Whether a full download fetches its pages concurrently. Defaults to False.
+        max_workers : int, optional
+            The maximum number of pages fetched at once when `parallel` is True. Defaults to 8.
+        """
+        self.playlist_id = playlist_id
+        self.playlist_index = playlist_index
+        snapshot_id, total = self.get_playlist_snapshot(playlist_id)
+        state = playlist_index.load_state()
+
+        if state is not None and state['snapshot_id'] == snapshot_id:
+            self.df_tracks = playlist_index.load_tracks()
+            self._add_missing_genres(self.df_tracks)
+            if self.compact:
+                self.df_tracks = compact_track_frame(self.df_tracks)
+            return
+
+        if state is not None and state['watermark'] is not None:
+            tracks = playlist_index.load_tracks()
+            self._add_missing_genres(tracks)
+            new_items = self._get_items_after(playlist_id, total, state['watermark'])
+            if len(tracks) + len(new_items) == total:
+                builder = TrackFrameBuilder(self.compact)
+                builder.add(tracks)
+                if new_items:
+                    builder.add(self.get_subset_features(new_items))
+                self.df_tracks = builder.build()
+                if self.compact:
+                    self.df_tracks = compact_track_frame(self.df_tracks)
+                playlist_index.save(self.df_tracks, snapshot_id)
+                return
+
+        self.df_tracks = pd.DataFrame()
+        self.get_playlist_features(playlist_id, parallel=parallel, max_workers=max_workers)
+        playlist_index.save(self.df_tracks, snapshot_id)
+
+    def _add_missing_genres(self, tracks):
+        """
+        Adds the genres of the artists of indexed tracks to `genre_matrix`, since the index only keeps the tracks.
+        """
+        if self.genre_matrix is None or not len(tracks):
+            return
+        missing = self.genre_matrix.missing(tracks['artist id'])
+        if missing:
+            self.add_genres(pd.DataFrame({'artist id': missing}), self.get_artist_genres(missing))
 
-            if len(self.df_tracks) < 100:  # less than 100 tracks in the response, we've fetched all tracks
+    def _get_items_after(self, playlist_id, total, watermark):
+        """
+        Walks the playlist backwards from its last page and collects the items added after `watermark`, stopping at the
+        first page that reaches back to it. The items are returned in playlist order.
+        """
+        pages = []
+        for offset in range((total - 1) // self.PAGE_SIZE * self.PAGE_SIZE, -1, -self.PAGE_SIZE):
+            items = self.get_track_subset(playlist_id, offset)
+            added = pd.to_datetime([t['added_at'] for t in items])
+            pages.append([t for t, a in zip(items, added) if a > watermark])
+            if len(items) and added.min() <= watermark:
                 break
 
-            offset += 100
-        
-        self.df_tracks = self.df_tracks.drop_duplicates()
-        self.df_tracks = self.df_tracks.loc[:, ~self.df_tracks.columns.duplicated()]
+        return [t for page in reversed(pages) for t in page]
 
     def get_artist_info(self, df_tracks, headers):
         """
         """
         pass
 
-    def parse_new_tracks(self, lookback_days=7):
+    @instrumented('spotify.parse_new_tracks', stage=True)
+    def parse_new_tracks(self, lookback_days=7, copy=True):
         """
         Sorts tracks based on when they were added and filters out tracks added more than 'lookback_days' ago.
         Returns two DataFrames: one containing the new tracks added within the lookback period, and one containing the old tracks added before the lookback period.
@@ -249,6 +913,9 @@ class SpotifyAPI:
         ----------
         lookback_days : int, optional
             The number of days to look back for new tracks. Defaults to 7.
+        copy : bool, optional
+            Whether to return copies. If False, both DataFrames are row slices of `df_tracks` that share its data, so they
+            must not be modified. Defaults to True.
 
         Returns
         -------
@@ -257,52 +924,160 @@ class SpotifyAPI:
         pandas.DataFrame
             A DataFrame containing the new tracks added within the lookback period.
         """
-        self.df_tracks = self.df_tracks.sort_values('added at')
+        if not self.df_tracks['added at'].is_monotonic_increasing:
+            self.df_tracks = self.df_tracks.sort_values('added at')
         today = pd.to_datetime(date.today(), utc=True)
+        added_at = self.df_tracks['added at']
 
         # Calculate the time difference between track addition and 'today'
-        self.df_tracks['diff'] = self.df_tracks['added at'].apply(lambda x: today - x)
+        self.df_tracks['diff'] = today - added_at
         lookback_period = timedelta(days=lookback_days)
 
-        # Filter tracks based on the lookback period
-        new_tracks = self.df_tracks[self.df_tracks['diff'].apply(lambda x: x <= lookback_period)]
-        old_tracks = self.df_tracks[self.df_tracks['diff'].apply(lambda x: x > lookback_period)]
+        # Tracks are sorted by when they were added, so the lookback period splits them in two. Tracks without a date
+        # are sorted last and belong to neither part.
+        split = added_at.searchsorted(today - lookback_period, side='left')
+        end = len(added_at) - added_at.isna().sum()
+        old_tracks = self.df_tracks.iloc[:split]
+        new_tracks = self.df_tracks.iloc[split:end]
 
+        if copy:
+            return old_tracks.copy(), new_tracks.copy()
         return old_tracks, new_tracks
 
-    def delete_tracks(self, tracks_to_delete):
+    @instrumented('spotify.save_new_tracks', stage=True)
+    def save_new_tracks(self, new_tracks, name=None):
         """
-        Deletes a batch of tracks from a Spotify playlist.
+        Hands the new tracks to `ModelPrep` through the storage, as `NEW_TRACKS_FILE`. With a `genre_matrix`, the
+        genres of their artists are handed over next to them, under the same name ending in '_genres.npz', which is
+        `NEW_GENRES_FILE` by default.
+
+        Parameters
+        ----------
+        new_tracks : pandas.DataFrame
+            The new tracks returned by `parse_new_tracks`.
+        name : str, optional
+            The name to save them under instead of `NEW_TRACKS_FILE`.
+        """
+        name = name if name is not None else self.NEW_TRACKS_FILE
+        self.storage.write_frame(new_tracks, name)
+        if self.genre_matrix is not None:
+            genres = self.genre_matrix.subset(new_tracks['artist id'])
+            self.storage.write_bytes(os.path.splitext(name)[0] + '_genres.npz', genres.to_bytes())
+
+    @instrumented('spotify.delete_tracks', stage=True)
+    def delete_tracks(self, tracks_to_delete, max_workers=1, requests_per_second=None):
+        """
+        Deletes tracks from the current Spotify playlist in batches of 100.
+
+        Each batch is sent with the latest snapshot ID returned by the batches before it, so they apply on top of each
+        other. With `max_workers` above 1, that many batches are in flight at once, and each one carries the latest
+        snapshot ID known when it is sent. Failed batches are retried by the transport, and sent once more after
+        refreshing the access token on a 401.
 
         Parameters
         ----------
         tracks_to_delete : pandas.DataFrame
             A DataFrame containing the tracks to be deleted, where each row represents a track and contains a 'uri' column with the URI of the track.
+        max_workers : int, optional
+            The number of batches sent at once. Defaults to 1.
+        requests_per_second : float, optional
+            The most DELETE requests sent per second. Unlimited if not given.
 
         Returns
         -------
-        None
+        pandas.DataFrame
+            One row per batch, with its number of tracks, final HTTP status, attempts, latency in seconds and the
+            resulting snapshot ID.
         """
         to_delete = tracks_to_delete['uri'].tolist()  # Assuming 'uri' is the column name in your DataFrame
-        num_tracks = len(to_delete)
-        num_batches = math.ceil(num_tracks/100)
+        batches = [to_delete[i:(i+100)] for i in range(0, len(to_delete), 100)]
+        DELETE_URL = f'{self.API_URL}/playlists/{self.playlist_id}/tracks'
+        limiter = RateLimiter(requests_per_second) if requests_per_second else None
+        snapshot = {'snapshot_id': None}
+        snapshot_lock = threading.Lock()
+
+        def delete_batch(batch, delete_uris):
+            status, attempts, latency, snapshot_id = None, 0, 0.0, None
+            refreshed = False
+            while True:
+                if limiter is not None:
+                    limiter.acquire()
+                del_dict = {'tracks': [{'uri': uri} for uri in delete_uris]}
+                with snapshot_lock:
+                    if snapshot['snapshot_id'] is not None:
+                        del_dict['snapshot_id'] = snapshot['snapshot_id']
+                headers = self.create_headers()
+                start = time.perf_counter()
+                try:
+                    r_delete = self.transport.delete(DELETE_URL, headers=headers, data=json.dumps(del_dict),
+                                                    endpoint='spotify.delete_tracks')
+                    status = r_delete.status_code
+                    attempts += r_delete.attempts
+                except (requests.ConnectionError, requests.Timeout):
+                    # the transport only raises these once its retries are used up
+                    status = None
+                    attempts += self.transport.max_retries + 1
+                latency += time.perf_counter() - start
+
+                if status == 401 and not refreshed:
+                    self.refresh_token(stale_headers=headers)
+                    refreshed = True
+                    continue
+                if status is not None and 200 <= status < 300:
+                    snapshot_id = r_delete.json().get('snapshot_id')
+                    with snapshot_lock:
+                        snapshot['snapshot_id'] = snapshot_id
+                break
+
+            return {
+                'batch': batch,
+                'tracks': len(delete_uris),
+                'status': status,
+                'attempts': attempts,
+                'latency': latency,
+                'snapshot_id': snapshot_id,
+            }
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            report = list(executor.map(delete_batch, range(len(batches)), batches))
+        return self.delete_report(batches, report, snapshot['snapshot_id'])
+
+    def delete_report(self, batches, report, snapshot_id):
+        """
+        Builds the report of `delete_tracks` from the rows of its batches, and removes the deleted tracks from the
+        playlist index.
+
+        Parameters
+        ----------
+        batches : list
+            The URIs of every batch.
+        report : list
+            One dictionary per batch, with its 'batch', 'tracks', 'status', 'attempts', 'latency' and 'snapshot_id'.
+        snapshot_id : str or None
+            The snapshot ID returned by the last batch.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The report, one row per batch.
+        """
+        report = pd.DataFrame(report, columns=['batch', 'tracks', 'status', 'attempts', 'latency', 'snapshot_id'])
+
+        if self.playlist_index is not None:
+            deleted = report['status'].between(200, 299)
+            deleted_uris = [uri for batch, ok in zip(batches, deleted) if ok for uri in batch]
+            self.playlist_index.remove_tracks(deleted_uris, snapshot_id if deleted.all() else None)
 
-        for i in range(0, num_batches*100, 100):
-            delete_uris = to_delete[i:(i+100)]
-            uri_dict = [{'uri': uri} for uri in delete_uris]
-            del_dict = {'tracks': uri_dict}
-            headers = self.create_headers()
-            DELETE_URL = f'https://api.spotify.com/v1/playlists/{self.playlist_id}/tracks'
-            r_delete = requests.delete(DELETE_URL, data=json.dumps(del_dict))
+        return report
 
 
 
-# %% ../nbs/00_retrieve_spotify_data.ipynb 7
+# %% ../nbs/00_retrieve_spotify_data.ipynb 8
 if __name__ == '__main__':
     spot = SpotifyAPI('us-east-2')
     spot.get_secret('spotify_35')
     spot.get_playlist_features('3ubgXaHeBn1CWLUZPXvqkj')
     old_tracks, new_tracks = spot.parse_new_tracks(lookback_days=7)
-    new_tracks.to_csv('s3://spotify-net/newer_tracks.csv')
+    spot.save_new_tracks(new_tracks)
     spot.delete_tracks(old_tracks)
     print('Updated')
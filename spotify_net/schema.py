@@ -0,0 +1,360 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/15_schema.ipynb.
+
+# %% auto 0
+__all__ = ['GENRE_PREFIX', 'CATEGORY_COLUMNS', 'GENRE_DTYPE', 'compact_column', 'compact_track_frame', 'densify',
+           'memory_by_group', 'GenreMatrix']
+
+# %% ../nbs/15_schema.ipynb 4
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+
+# %% ../nbs/15_schema.ipynb 5
+GENRE_PREFIX = 'genre_'
+# the text columns with few distinct values; the names, IDs and URIs of the tracks are unique and stay strings
+CATEGORY_COLUMNS = ['artist', 'artist id', 'type']
+# with a plain int fill value, pandas upcasts sparse columns to int64 whenever rows are taken from the frame
+GENRE_DTYPE = pd.SparseDtype(np.uint8, np.uint8(0))
+
+
+def compact_column(name, column):
+    """
+    Converts one column of a track frame to the compact schema.
+
+    Parameters
+    ----------
+    name : str
+        The name of the column.
+    column : pandas.Series
+        The column.
+
+    Returns
+    -------
+    pandas.Series
+        The column in the compact schema, or the column itself if it has no compact form.
+    """
+    if name.startswith(GENRE_PREFIX):
+        if column.dtype == GENRE_DTYPE and isinstance(column.dtype.fill_value, np.uint8):
+            return column
+        if isinstance(column.dtype, pd.SparseDtype):
+            column = column.sparse.to_dense()
+        # missing genres are zeros of the one-hot encoding
+        return column.fillna(0).astype(np.uint8).astype(GENRE_DTYPE)
+    if name in CATEGORY_COLUMNS:
+        return column.astype('category')
+    if pd.api.types.is_float_dtype(column):
+        return column.astype(np.float32)
+    if pd.api.types.is_integer_dtype(column):
+        return pd.to_numeric(column, downcast='integer')
+    return column
+
+
+def compact_track_frame(frame):
+    """
+    Converts a track frame to the compact schema: the `CATEGORY_COLUMNS` become categoricals, the float columns
+    `float32`, the integer columns the smallest integer type holding their values, and the one-hot genre columns
+    sparse `uint8`, with missing genres as zeros. The other columns are kept as they are.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        A track frame, such as `SpotifyAPI.df_tracks` or `ModelPrep.prepped_frame`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The frame in the compact schema, with the same columns and index.
+    """
+    columns = {position: compact_column(name, frame.iloc[:, position]) for position, name in enumerate(frame.columns)}
+    compact = pd.DataFrame(columns, index=frame.index)
+    compact.columns = frame.columns
+    return compact
+
+
+def densify(frame):
+    """
+    Makes the sparse columns of a frame dense, for file formats without a sparse type such as Parquet.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        The frame.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The frame with its sparse columns dense, or the frame itself if it has none.
+    """
+    sparse = [name for name, dtype in frame.dtypes.items() if isinstance(dtype, pd.SparseDtype)]
+    if not sparse:
+        return frame
+    # astype to the subtype keeps a sparse column sparse
+    dense = frame.copy(deep=False)
+    for name in sparse:
+        dense[name] = frame[name].sparse.to_dense()
+    return dense
+
+
+def memory_by_group(frame):
+    """
+    Measures the memory of a track frame's one-hot genres, its other numeric columns and its remaining columns,
+    counting the Python strings they hold.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        A track frame.
+
+    Returns
+    -------
+    dict
+        The bytes of the 'genres', 'numeric' and 'other' columns, and the 'total' including the index.
+    """
+    usage = frame.memory_usage(deep=True)
+    genres = frame.columns.str.startswith(GENRE_PREFIX)
+    numeric = np.array([pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes]) & ~genres
+    column_usage = usage.drop('Index').to_numpy()
+    return {
+        'genres': int(column_usage[genres].sum()),
+        'numeric': int(column_usage[numeric].sum()),
+        'other': int(column_usage[~genres & ~numeric].sum()),
+        'total': int(usage.sum()),
+    }
+
+# %% ../nbs/15_schema.ipynb 7
+class GenreMatrix:
+    """
+    The genres of the artists, as a vocabulary of every genre seen and a CSR matrix with one row per artist and one
+    column per genre.
+
+    Artists and genres are added as the pages of a playlist are read, in the order they are first seen. The matrix is
+    thread-safe, so the pages can be read concurrently. SciPy is only imported once the matrix is built.
+    """
+    def __init__(self):
+        """
+        Initializes a new, empty instance of the GenreMatrix class.
+        """
+        self.vocabulary = {}
+        self.artists = {}
+        self._indptr = [0]
+        self._indices = []
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.artists)
+
+    def add(self, artist_genres):
+        """
+        Adds the genres of artists. Artists already in the matrix keep their genres.
+
+        Parameters
+        ----------
+        artist_genres : dict
+            A dictionary mapping artist IDs to their lists of genres. An empty list adds an artist without genres.
+        """
+        with self._lock:
+            for artist, genres in artist_genres.items():
+                if artist in self.artists:
+                    continue
+                self.artists[artist] = len(self.artists)
+                self._indices.extend(self.vocabulary.setdefault(genre, len(self.vocabulary)) for genre in genres)
+                self._indptr.append(len(self._indices))
+            self._matrix = None
+
+    def missing(self, artist_ids):
+        """
+        Returns the artists that are not in the matrix.
+
+        Parameters
+        ----------
+        artist_ids : list-like
+            The artist IDs, possibly repeated.
+
+        Returns
+        -------
+        list
+            The unique artist IDs missing from the matrix.
+        """
+        return [a for a in dict.fromkeys(artist_ids) if a not in self.artists]
+
+    def rows(self, artist_ids):
+        """
+        Returns the row of every artist.
+
+        Parameters
+        ----------
+        artist_ids : list-like
+            The artist IDs, one per track.
+
+        Returns
+        -------
+        numpy.ndarray
+            The row of each artist in `matrix`, or -1 for artists not in the matrix.
+        """
+        artist_ids = pd.Series(artist_ids, dtype=object)
+        return artist_ids.map(self.artists).fillna(-1).to_numpy(dtype=np.int64)
+
+    @property
+    def matrix(self):
+        """
+        The `uint8` CSR matrix of the genre counts, with one row per artist and one column per vocabulary entry.
+        """
+        with self._lock:
+            if self._matrix is None:
+                import scipy.sparse
+                indices = np.array(self._indices, dtype=np.int32)
+                self._matrix = scipy.sparse.csr_matrix(
+                    (np.ones(len(indices), dtype=np.uint8), indices, np.array(self._indptr, dtype=np.int64)),
+                    shape=(len(self.artists), len(self.vocabulary)))
+                # an artist listing a genre twice counts it twice, like the one-hot columns did
+                self._matrix.sum_duplicates()
+            return self._matrix
+
+    def track_matrix(self, artist_ids):
+        """
+        Returns the genre counts of tracks, with one row per track, without building their one-hot columns.
+
+        Parameters
+        ----------
+        artist_ids : list-like
+            The artist ID of every track.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            The genre counts, with one column per vocabulary entry. Tracks of unknown artists have no genres.
+        """
+        import scipy.sparse
+        rows = self.rows(artist_ids)
+        known = rows >= 0
+        # unknown artists pick the empty row appended below the artists
+        rows[~known] = len(self.artists)
+        empty = scipy.sparse.csr_matrix((1, len(self.vocabulary)), dtype=np.uint8)
+        return scipy.sparse.vstack([self.matrix, empty], format='csr')[rows]
+
+    def embed(self, embedding):
+        """
+        Reduces the genres of every artist to the components of a genre embedding by summing its genre vectors.
+
+        Parameters
+        ----------
+        embedding : pandas.DataFrame
+            The vector of every genre, indexed by genre, as built by `ModelPrep.build_genre_embedding`. Genres
+            missing from it are ignored.
+
+        Returns
+        -------
+        numpy.ndarray
+            The reduced genres, with one row per artist and one column per component.
+        """
+        vectors = embedding.reindex(list(self.vocabulary)).fillna(0).to_numpy()
+        return np.asarray(self.matrix @ vectors)
+
+    def embed_tracks(self, embedding, artist_ids):
+        """
+        Reduces the genres of tracks like `embed`, once per artist, and copies them to the artist's tracks.
+
+        Parameters
+        ----------
+        embedding : pandas.DataFrame
+            The vector of every genre, indexed by genre.
+        artist_ids : list-like
+            The artist ID of every track.
+
+        Returns
+        -------
+        numpy.ndarray
+            The reduced genres, with one row per track, of zeros for the tracks of artists not in the matrix.
+        """
+        vectors = self.embed(embedding)
+        # the last row, of zeros, is picked by the rows of -1
+        vectors = np.vstack([vectors, np.zeros((1, vectors.shape[1]))])
+        return vectors[self.rows(artist_ids)]
+
+    def subset(self, artist_ids):
+        """
+        Returns the matrix of some of the artists, with only the genres they have.
+
+        Parameters
+        ----------
+        artist_ids : list-like
+            The artist IDs to keep, possibly repeated. Artists not in the matrix are left out.
+
+        Returns
+        -------
+        GenreMatrix
+            The matrix of the artists.
+        """
+        genres = list(self.vocabulary)
+        with self._lock:
+            rows = {a: self.artists[a] for a in dict.fromkeys(artist_ids) if a in self.artists}
+            artist_genres = {a: [genres[i] for i in self._indices[self._indptr[r]:self._indptr[r+1]]]
+                             for a, r in rows.items()}
+        subset = GenreMatrix()
+        subset.add(artist_genres)
+        return subset
+
+    def to_frame(self, artist_ids, index=None):
+        """
+        Builds the one-hot `genre_*` columns of tracks, as sparse `uint8` columns.
+
+        Parameters
+        ----------
+        artist_ids : list-like
+            The artist ID of every track.
+        index : pandas.Index, optional
+            The index of the frame. Defaults to a range index.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One column per genre of the tracks, in the order the genres were first seen.
+        """
+        counts = self.track_matrix(artist_ids).tocsc()
+        present = np.flatnonzero(np.diff(counts.indptr))
+        genres = list(self.vocabulary)
+        return pd.DataFrame.sparse.from_spmatrix(counts[:, present].astype(np.uint8),
+                                                 index=range(counts.shape[0]) if index is None else index,
+                                                 columns=[GENRE_PREFIX + genres[i] for i in present])
+
+    def to_bytes(self):
+        """
+        Serializes the matrix, for `ArtifactStore.write_bytes`.
+
+        Returns
+        -------
+        bytes
+            The matrix in NumPy's `.npz` format.
+        """
+        buffer = io.BytesIO()
+        with self._lock:
+            np.savez(buffer, artists=np.array(list(self.artists), dtype=str),
+                     vocabulary=np.array(list(self.vocabulary), dtype=str),
+                     indptr=np.array(self._indptr, dtype=np.int64), indices=np.array(self._indices, dtype=np.int32))
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Deserializes a matrix written by `to_bytes`.
+
+        Parameters
+        ----------
+        data : bytes
+            The serialized matrix.
+
+        Returns
+        -------
+        GenreMatrix
+            The matrix.
+        """
+        arrays = np.load(io.BytesIO(data))
+        genre_matrix = cls()
+        genre_matrix.vocabulary = {genre: i for i, genre in enumerate(arrays['vocabulary'].tolist())}
+        genre_matrix.artists = {artist: i for i, artist in enumerate(arrays['artists'].tolist())}
+        genre_matrix._indptr = arrays['indptr'].tolist()
+        genre_matrix._indices = arrays['indices'].tolist()
+        return genre_matrix
@@ -0,0 +1,486 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/07_standins.ipynb.
+
+# %% auto 0
+__all__ = ['AUDIO_FEATURE_COLUMNS', 'synthetic_playlist', 'synthetic_audio_features', 'HTTPStandIn', 'S3StandIn',
+           'SpotifyStandIn', 'LastFmStandIn']
+
+# %% ../nbs/07_standins.ipynb 4
+import email.utils
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import boto3
+import pandas as pd
+from botocore.config import Config
+
+# %% ../nbs/07_standins.ipynb 5
+AUDIO_FEATURE_COLUMNS = ['danceability', 'energy', 'key', 'loudness', 'mode', 'speechiness', 'acousticness',
+                         'instrumentalness', 'liveness', 'valence', 'tempo', 'type', 'id', 'uri', 'track_href',
+                         'analysis_url', 'duration_ms', 'time_signature']
+
+
+def synthetic_playlist(num_tracks, num_artists=None, num_genres=500, seed=0, start=None):
+    """
+    Builds a synthetic playlist: track items as returned by the playlist tracks endpoint, added ten minutes apart, and
+    the genres of their artists.
+
+    Parameters
+    ----------
+    num_tracks : int
+        The number of tracks in the playlist.
+    num_artists : int, optional
+        The number of distinct artists. Defaults to one per ten tracks.
+    num_genres : int, optional
+        The size of the genre vocabulary. Defaults to 500.
+    seed : int, optional
+        The random seed. Defaults to 0.
+    start : pandas.Timestamp, optional
+        When the first track was added. Defaults to 2020-01-01 UTC.
+
+    Returns
+    -------
+    list
+        The track items.
+    dict
+        A dictionary mapping each artist ID to its list of genres.
+    """
+    rng = random.Random(seed)
+    num_artists = num_artists or max(1, num_tracks // 10)
+    start = pd.Timestamp('2020-01-01', tz='UTC') if start is None else start
+    items = []
+    for i in range(num_tracks):
+        artist = rng.randrange(num_artists)
+        items.append({
+            'added_at': (start + pd.Timedelta(minutes=10 * i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'track': {
+                'id': f'track{i:07d}',
+                'name': f'Track {i}',
+                'uri': f'spotify:track:track{i:07d}',
+                'artists': [{'name': f'Artist {artist}', 'id': f'artist{artist:06d}'}],
+            },
+        })
+    artist_genres = {
+        f'artist{a:06d}': [f'genre {rng.randrange(num_genres)}' for _ in range(rng.randrange(6))]
+        for a in range(num_artists)
+    }
+    return items, artist_genres
+
+
+def synthetic_audio_features(track_id):
+    """
+    Returns the synthetic audio features of a track of `synthetic_playlist`, as a list in `AUDIO_FEATURE_COLUMNS`
+    order.
+    """
+    n = int(track_id[5:])
+    return [n % 97 / 97, n % 89 / 89, n % 12, -(n % 30) / 2, n % 2, n % 83 / 83, n % 79 / 79, n % 73 / 73,
+            n % 71 / 71, n % 67 / 67, 60 + n % 120, 'audio_features', track_id, f'spotify:track:{track_id}', '', '',
+            120000 + n % 240000, 3 + n % 2]
+
+# %% ../nbs/07_standins.ipynb 6
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops the connections of highly concurrent clients, which retry a second later
+    request_queue_size = 1024
+
+
+class HTTPStandIn:
+    """
+    The server shared by the stand-ins. Subclasses answer requests in `handle`.
+
+    Parameters
+    ----------
+    latency : float, optional
+        The number of seconds every request is delayed by. Defaults to 0.
+    """
+    def __init__(self, latency=0.0):
+        """
+        Initializes a new instance of the HTTPStandIn class.
+
+        Parameters
+        ----------
+        latency : float, optional
+            The number of seconds every request is delayed by. Defaults to 0.
+        """
+        self.latency = latency
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def endpoint_url(self):
+        """
+        The URL the stand-in listens on.
+        """
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """
+        Starts serving on a free local port, in a background thread.
+
+        Returns
+        -------
+        HTTPStandIn
+            The started stand-in.
+        """
+        self._server = _StandInServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, method, path, query, headers, body):
+        """
+        Answers one request.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        path : str
+            The unquoted URL path.
+        query : dict
+            The query parameters, each with its list of values.
+        headers : email.message.Message
+            The request headers.
+        body : bytes
+            The request body.
+
+        Returns
+        -------
+        tuple
+            The status code, a dictionary of response headers and the response body as bytes.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def json_response(status, content):
+        """
+        Builds a `handle` result with a JSON body.
+        """
+        return status, {'Content-Type': 'application/json'}, json.dumps(content).encode()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body are written separately, which Nagle's algorithm would delay on keep-alive connections
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self):
+                url = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with standin._lock:
+                    standin.requests.append((self.command, url.path))
+                time.sleep(standin.latency)
+                status, headers, content = standin.handle(
+                    self.command, unquote(url.path), parse_qs(url.query), self.headers, body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                if self.command != 'HEAD' and status != 304:
+                    self.wfile.write(content)
+
+            do_GET = do_HEAD = do_PUT = do_POST = do_DELETE = _respond
+
+        return Handler
+
+# %% ../nbs/07_standins.ipynb 7
+class S3StandIn(HTTPStandIn):
+    """
+    An in-memory stand-in for the S3 object API, serving GET, HEAD, PUT and DELETE on path-style object URLs.
+
+    Use `client` to get a boto3 client for it, or point one at `endpoint_url` with any credentials.
+
+    Parameters
+    ----------
+    latency : float, optional
+        The number of seconds every request is delayed by. Defaults to 0.
+    """
+    def __init__(self, latency=0.0):
+        """
+        Initializes a new instance of the S3StandIn class.
+
+        Parameters
+        ----------
+        latency : float, optional
+            The number of seconds every request is delayed by. Defaults to 0.
+        """
+        super().__init__(latency)
+        self.objects = {}
+
+    def client(self, max_pool_connections=10):
+        """
+        Creates a boto3 S3 client talking to the stand-in.
+
+        Parameters
+        ----------
+        max_pool_connections : int, optional
+            The number of connections the client keeps open. Defaults to 10.
+
+        Returns
+        -------
+        botocore.client.S3
+            The client.
+        """
+        return boto3.client('s3', endpoint_url=self.endpoint_url, region_name='us-east-1',
+                            aws_access_key_id='standin', aws_secret_access_key='standin',
+                            config=Config(max_pool_connections=max_pool_connections))
+
+    def put(self, bucket, key, body):
+        """
+        Stores an object directly, without going through HTTP.
+
+        Parameters
+        ----------
+        bucket : str
+            The bucket name.
+        key : str
+            The object key.
+        body : bytes
+            The object content.
+        """
+        with self._lock:
+            self.objects[(bucket, key)] = (body, f'"{hashlib.md5(body).hexdigest()}"', time.time())
+
+    def handle(self, method, path, query, headers, body):
+        bucket, _, key = path.lstrip('/').partition('/')
+        if method == 'PUT':
+            self.put(bucket, key, body)
+            return 200, {'ETag': self.objects[(bucket, key)][1]}, b''
+        if method == 'DELETE':
+            with self._lock:
+                self.objects.pop((bucket, key), None)
+            return 204, {}, b''
+
+        with self._lock:
+            stored = self.objects.get((bucket, key))
+        if stored is None:
+            error = f'<Error><Code>NoSuchKey</Code><Key>{key}</Key></Error>'.encode()
+            return 404, {'Content-Type': 'application/xml'}, error
+        content, etag, modified = stored
+        response_headers = {'ETag': etag, 'Last-Modified': email.utils.formatdate(modified, usegmt=True)}
+        if headers.get('If-None-Match') == etag:
+            return 304, response_headers, b''
+        return 200, response_headers, content
+
+# %% ../nbs/07_standins.ipynb 8
+class SpotifyStandIn(HTTPStandIn):
+    """
+    A stand-in for the Spotify Web API serving one synthetic playlist from `synthetic_playlist`: the token, playlist,
+    playlist tracks, artists and audio-features endpoints, and track deletion. Further playlists can be served under
+    their own IDs with `add_playlist`; any other ID is served the default playlist.
+
+    Requests must carry the latest access token, so the first request of a client without one gets a 401 and
+    refreshes it. Point a `SpotifyAPI` at the stand-in with `configure`.
+
+    Parameters
+    ----------
+    num_tracks : int
+        The number of tracks in the playlist.
+    num_artists : int, optional
+        The number of distinct artists. Defaults to one per ten tracks.
+    num_genres : int, optional
+        The size of the genre vocabulary. Defaults to 500.
+    latency : float, optional
+        The number of seconds every request is delayed by. Defaults to 0.
+    seed : int, optional
+        The random seed. Defaults to 0.
+    start : pandas.Timestamp, optional
+        When the first track was added. Defaults to ten minutes per track before now, so the last tracks are new.
+    """
+    def __init__(self, num_tracks, num_artists=None, num_genres=500, latency=0.0, seed=0, start=None):
+        """
+        Initializes a new instance of the SpotifyStandIn class.
+
+        Parameters
+        ----------
+        num_tracks : int
+            The number of tracks in the playlist.
+        num_artists : int, optional
+            The number of distinct artists. Defaults to one per ten tracks.
+        num_genres : int, optional
+            The size of the genre vocabulary. Defaults to 500.
+        latency : float, optional
+            The number of seconds every request is delayed by. Defaults to 0.
+        seed : int, optional
+            The random seed. Defaults to 0.
+        start : pandas.Timestamp, optional
+            When the first track was added. Defaults to ten minutes per track before now, so the last tracks are new.
+        """
+        super().__init__(latency)
+        self.num_genres = num_genres
+        self.seed = seed
+        if start is None:
+            start = pd.Timestamp.now(tz='UTC').floor('s') - pd.Timedelta(minutes=10 * num_tracks)
+        items, self.artist_genres = synthetic_playlist(num_tracks, num_artists, num_genres, seed, start)
+        self.default_playlist = {'items': items, 'snapshot': 0}
+        self.playlists = {}
+        self.token = 'standin-token-0'
+
+    def add_playlist(self, playlist_id, num_tracks, seed=None, start=None):
+        """
+        Adds a synthetic playlist served under its own ID. Its artists take the genres of the new playlist.
+
+        Parameters
+        ----------
+        playlist_id : str
+            The ID of the playlist.
+        num_tracks : int
+            The number of tracks in the playlist.
+        seed : int, optional
+            The random seed. Defaults to the stand-in's.
+        start : pandas.Timestamp, optional
+            When the first track was added. Defaults to ten minutes per track before now.
+        """
+        if start is None:
+            start = pd.Timestamp.now(tz='UTC').floor('s') - pd.Timedelta(minutes=10 * num_tracks)
+        items, artist_genres = synthetic_playlist(num_tracks, None, self.num_genres,
+                                                  self.seed if seed is None else seed, start)
+        with self._lock:
+            self.artist_genres.update(artist_genres)
+            self.playlists[playlist_id] = {'items': items, 'snapshot': 0}
+
+    def configure(self, api):
+        """
+        Points a `SpotifyAPI` at the stand-in.
+
+        Parameters
+        ----------
+        api : SpotifyAPI
+            The client to configure.
+
+        Returns
+        -------
+        dict
+            The environment variables the client reads its credentials from, with values the stand-in accepts.
+        """
+        api.API_URL = f'{self.endpoint_url}/v1'
+        api.TOKEN_URL = f'{self.endpoint_url}/api/token'
+        return {'spot_clientID': 'standin', 'spot_clientSECRET': 'standin', 'spot_REF': 'standin',
+                'spot_ACC': 'expired'}
+
+    def handle(self, method, path, query, headers, body):
+        if method == 'POST' and path == '/api/token':
+            with self._lock:
+                self.token = f'standin-token-{int(self.token.rsplit("-", 1)[1]) + 1}'
+                return self.json_response(200, {'access_token': self.token, 'token_type': 'Bearer', 'expires_in': 3600})
+        if headers.get('Authorization') != f'Bearer {self.token}':
+            return self.json_response(401, {'error': {'status': 401, 'message': 'The access token expired'}})
+
+        parts = path.strip('/').split('/')
+        ids = query.get('ids', [''])[0].split(',')
+        playlist = self.playlists.get(parts[2], self.default_playlist) if parts[:2] == ['v1', 'playlists'] else None
+        if playlist is not None and len(parts) == 3:
+            return self.json_response(200, {'snapshot_id': f'snapshot-{playlist["snapshot"]}',
+                                            'tracks': {'total': len(playlist['items'])}})
+        if playlist is not None and parts[3:] == ['tracks'] and method == 'GET':
+            offset, limit = int(query.get('offset', [0])[0]), int(query.get('limit', [100])[0])
+            with self._lock:
+                page = playlist['items'][offset:offset+limit]
+                total = len(playlist['items'])
+            return self.json_response(200, {'items': page, 'total': total, 'offset': offset, 'limit': limit})
+        if playlist is not None and parts[3:] == ['tracks'] and method == 'DELETE':
+            uris = {track['uri'] for track in json.loads(body)['tracks']}
+            with self._lock:
+                playlist['items'] = [item for item in playlist['items'] if item['track']['uri'] not in uris]
+                playlist['snapshot'] += 1
+                return self.json_response(200, {'snapshot_id': f'snapshot-{playlist["snapshot"]}'})
+        if parts == ['v1', 'artists']:
+            artists = [{'id': a, 'genres': self.artist_genres[a]} if a in self.artist_genres else None for a in ids]
+            return self.json_response(200, {'artists': artists})
+        if parts == ['v1', 'audio-features']:
+            features = [dict(zip(AUDIO_FEATURE_COLUMNS, synthetic_audio_features(t))) for t in ids]
+            return self.json_response(200, {'audio_features': features})
+        return self.json_response(404, {'error': {'status': 404, 'message': 'Not found'}})
+
+# %% ../nbs/07_standins.ipynb 9
+class LastFmStandIn(HTTPStandIn):
+    """
+    A stand-in for the Last.fm `user.gettoptracks` method, serving every other track of a `synthetic_playlist` with
+    decreasing playcounts, so that half of the playlist matches.
+
+    Parameters
+    ----------
+    num_tracks : int
+        The number of tracks in the playlist the top tracks are taken from.
+    latency : float, optional
+        The number of seconds every request is delayed by. Defaults to 0.
+    seed : int, optional
+        The random seed of the playlist. Defaults to 0.
+    """
+    def __init__(self, num_tracks, latency=0.0, seed=0):
+        """
+        Initializes a new instance of the LastFmStandIn class.
+
+        Parameters
+        ----------
+        num_tracks : int
+            The number of tracks in the playlist the top tracks are taken from.
+        latency : float, optional
+            The number of seconds every request is delayed by. Defaults to 0.
+        seed : int, optional
+            The random seed of the playlist. Defaults to 0.
+        """
+        super().__init__(latency)
+        items, _ = synthetic_playlist(num_tracks, seed=seed)
+        tracks = items[::-2]
+        self.top_tracks = [
+            {'name': item['track']['name'], 'artist': {'name': item['track']['artists'][0]['name']},
+             'playcount': str(1 + (len(tracks) - i) * 100 // len(tracks))}
+            for i, item in enumerate(tracks)
+        ]
+
+    def configure(self, api):
+        """
+        Points a `LastFmAPI` at the stand-in.
+
+        Parameters
+        ----------
+        api : LastFmAPI
+            The client to configure.
+
+        Returns
+        -------
+        dict
+            The environment variables the client reads its credentials from, with values the stand-in accepts.
+        """
+        api.API_URL = f'{self.endpoint_url}/2.0/'
+        return {'last_userAGENT': 'standin', 'last_username': 'standin', 'last_apiKEY': 'standin'}
+
+    def handle(self, method, path, query, headers, body):
+        if query.get('method') != ['user.gettoptracks']:
+            return self.json_response(400, {'error': 3, 'message': 'Invalid Method'})
+        page, limit = int(query.get('page', [1])[0]), int(query.get('limit', [50])[0])
+        total_pages = max(1, -(-len(self.top_tracks) // limit))
+        return self.json_response(200, {'toptracks': {
+            'track': self.top_tracks[(page - 1) * limit:page * limit],
+            '@attr': {'page': str(page), 'perPage': str(limit), 'totalPages': str(total_pages),
+                      'total': str(len(self.top_tracks))},
+        }})
@@ -0,0 +1,305 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/06_storage.ipynb.
+
+# %% auto 0
+__all__ = ['ArtifactStore', 'LocalStore', 'S3Store']
+
+# %% ../nbs/06_storage.ipynb 4
+import io
+import os
+import threading
+
+import pandas as pd
+
+from .schema import densify
+
+# %% ../nbs/06_storage.ipynb 5
+class ArtifactStore:
+    """
+    The methods shared by the storage backends. The format of a file is taken from its extension: '.parquet' files
+    are read and written as Parquet, anything else as CSV with the index in the first column.
+
+    Backends implement `read_bytes`, `write_bytes`, `exists` and `_source`.
+    """
+    def _source(self, name):
+        raise NotImplementedError
+
+    def read_bytes(self, name):
+        """
+        Reads the raw content of a file.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file in the store.
+
+        Returns
+        -------
+        bytes
+            The content of the file.
+        """
+        raise NotImplementedError
+
+    def write_bytes(self, name, data):
+        """
+        Writes the raw content of a file, replacing any previous version.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file in the store.
+        data : bytes
+            The content to write.
+        """
+        raise NotImplementedError
+
+    def read_bytes_if_changed(self, name, version=None):
+        """
+        Reads the raw content of a file unless it still has the given version.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file in the store.
+        version : str, optional
+            The version returned by an earlier read. The file is always read if not given.
+
+        Returns
+        -------
+        bytes or None
+            The content of the file, or None if its version is still `version`.
+        str
+            The current version of the file.
+        """
+        raise NotImplementedError
+
+    def exists(self, name):
+        """
+        Checks whether a file is in the store.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file in the store.
+
+        Returns
+        -------
+        bool
+            True if the file exists.
+        """
+        raise NotImplementedError
+
+    def read_frame(self, name, columns=None):
+        """
+        Reads a DataFrame. Only the requested columns are decoded.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file in the store.
+        columns : list or callable, optional
+            The columns to read, or a function returning True for the names of the columns to read. All columns are
+            read if not given.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The stored frame, with its index.
+        """
+        source = self._source(name)
+        if not name.endswith('.parquet'):
+            usecols = columns
+            if usecols is not None:
+                # the unnamed index column is always read
+                wanted = columns if callable(columns) else set(columns).__contains__
+                usecols = lambda c: c.startswith('Unnamed: 0') or c == '' or wanted(c)
+            return pd.read_csv(source, index_col=0, usecols=usecols)
+
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        if callable(columns):
+            columns = [c for c in parquet_file.schema_arrow.names if columns(c)]
+        return parquet_file.read(columns=columns, use_pandas_metadata=True).to_pandas()
+
+    def write_frame(self, frame, name):
+        """
+        Writes a DataFrame, replacing any previous version.
+
+        Parameters
+        ----------
+        frame : pandas.DataFrame or pandas.Series
+            The frame to write. A series is written as a one-column frame.
+        name : str
+            The name of the file in the store.
+        """
+        if isinstance(frame, pd.Series):
+            frame = frame.to_frame()
+        buffer = io.BytesIO()
+        if name.endswith('.parquet'):
+            densify(frame).to_parquet(buffer)
+        else:
+            buffer.write(frame.to_csv().encode())
+        self.write_bytes(name, buffer.getvalue())
+
+    def read_series(self, name):
+        """
+        Reads a one-column file as a series.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file in the store.
+
+        Returns
+        -------
+        pandas.Series
+            The stored series.
+        """
+        return self.read_frame(name).squeeze('columns')
+
+# %% ../nbs/06_storage.ipynb 6
+class LocalStore(ArtifactStore):
+    """
+    Stores files in a local directory.
+
+    Parameters
+    ----------
+    root : str
+        The directory holding the files. It is created on the first write.
+    """
+    def __init__(self, root):
+        """
+        Initializes a new instance of the LocalStore class.
+
+        Parameters
+        ----------
+        root : str
+            The directory holding the files. It is created on the first write.
+        """
+        self.root = root
+
+    def path(self, name):
+        """
+        Returns the local path of a file.
+        """
+        return os.path.join(self.root, name)
+
+    def _source(self, name):
+        return self.path(name)
+
+    def read_bytes(self, name):
+        with open(self.path(name), 'rb') as f:
+            return f.read()
+
+    def write_bytes(self, name, data):
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+
+    def read_bytes_if_changed(self, name, version=None):
+        # the modification time and size stand in for an ETag
+        stat = os.stat(self.path(name))
+        current = f'{stat.st_mtime_ns}-{stat.st_size}'
+        if current == version:
+            return None, version
+        return self.read_bytes(name), current
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+# %% ../nbs/06_storage.ipynb 7
+class S3Store(ArtifactStore):
+    """
+    Stores files in an S3 bucket.
+
+    Parameters
+    ----------
+    bucket : str
+        The name of the bucket.
+    prefix : str, optional
+        A key prefix added to every file name. Defaults to none.
+    client : botocore.client.S3, optional
+        The S3 client to use. A new one is created on first use if not given. The client is thread-safe and keeps a
+        pool of connections, so one store can be shared by concurrent loaders.
+    endpoint_url : str, optional
+        The URL of an S3-compatible service to use instead of AWS, such as `S3StandIn`.
+    max_pool_connections : int, optional
+        The number of connections the created client keeps open. Defaults to 10.
+    """
+    def __init__(self, bucket, prefix='', client=None, endpoint_url=None, max_pool_connections=10):
+        """
+        Initializes a new instance of the S3Store class.
+
+        Parameters
+        ----------
+        bucket : str
+            The name of the bucket.
+        prefix : str, optional
+            A key prefix added to every file name. Defaults to none.
+        client : botocore.client.S3, optional
+            The S3 client to use. A new one is created on first use if not given. The client is thread-safe and keeps a
+            pool of connections, so one store can be shared by concurrent loaders.
+        endpoint_url : str, optional
+            The URL of an S3-compatible service to use instead of AWS, such as `S3StandIn`.
+        max_pool_connections : int, optional
+            The number of connections the created client keeps open. Defaults to 10.
+        """
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.max_pool_connections = max_pool_connections
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        The S3 client, created on first use.
+        """
+        with self._client_lock:
+            if self._client is None:
+                # boto3 is only imported once S3 is actually used, which keeps the cold start of every stage short
+                import boto3
+                from botocore.config import Config
+
+                self._client = boto3.client('s3', endpoint_url=self.endpoint_url,
+                                            config=Config(max_pool_connections=self.max_pool_connections))
+            return self._client
+
+    def key(self, name):
+        """
+        Returns the object key of a file.
+        """
+        return self.prefix + name
+
+    def _source(self, name):
+        return io.BytesIO(self.read_bytes(name))
+
+    def read_bytes(self, name):
+        return self.client.get_object(Bucket=self.bucket, Key=self.key(name))['Body'].read()
+
+    def write_bytes(self, name, data):
+        self.client.put_object(Bucket=self.bucket, Key=self.key(name), Body=data)
+
+    def read_bytes_if_changed(self, name, version=None):
+        kwargs = {'IfNoneMatch': version} if version is not None else {}
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.key(name), **kwargs)
+        except self.client.exceptions.ClientError as e:
+            if e.response['Error']['Code'] in ('304', 'NotModified'):
+                return None, version
+            raise
+        return response['Body'].read(), response['ETag']
+
+    def exists(self, name):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(name))
+        except self.client.exceptions.ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return True
@@ -0,0 +1,555 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/03_transport.ipynb.
+
+# %% auto 0
+__all__ = ['HTTPTransport', 'RateLimiter', 'FairRateLimiter', 'AsyncHTTPTransport']
+
+# %% ../nbs/03_transport.ipynb 4
+import collections
+import copy
+import email.utils
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+from .instrumentation import DEFAULT_INSTRUMENTATION
+
+# %% ../nbs/03_transport.ipynb 5
+class HTTPTransport:
+    """
+    A pooled HTTP session with retries, shared by the SpotifyAPI and LastFmAPI classes.
+
+    Parameters
+    ----------
+    pool_size : int, optional
+        The number of keep-alive connections kept open per host. Defaults to 10.
+    max_retries : int, optional
+        The number of times a throttled or failed request is retried before giving up. Defaults to 5.
+    backoff_factor : float, optional
+        The base delay in seconds of the exponential backoff. Defaults to 0.5.
+    max_backoff : float, optional
+        The longest delay in seconds between two attempts, including one asked for by a Retry-After header.
+        Defaults to 60.
+    instrumentation : Instrumentation, optional
+        Where every attempt is counted by endpoint and status. Defaults to `DEFAULT_INSTRUMENTATION`.
+    rate_limiter : RateLimiter, optional
+        A limiter every attempt waits for. Unlimited if not given.
+    """
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, pool_size=10, max_retries=5, backoff_factor=0.5, max_backoff=60, instrumentation=None,
+                 rate_limiter=None):
+        """
+        Initializes a new instance of the HTTPTransport class.
+
+        Parameters
+        ----------
+        pool_size : int, optional
+            The number of keep-alive connections kept open per host. Defaults to 10.
+        max_retries : int, optional
+            The number of times a throttled or failed request is retried before giving up. Defaults to 5.
+        backoff_factor : float, optional
+            The base delay in seconds of the exponential backoff. Defaults to 0.5.
+        max_backoff : float, optional
+            The longest delay in seconds between two attempts, including one asked for by a Retry-After header.
+            Defaults to 60.
+        instrumentation : Instrumentation, optional
+            Where every attempt is counted by endpoint and status. Defaults to `DEFAULT_INSTRUMENTATION`.
+        rate_limiter : RateLimiter, optional
+            A limiter every attempt waits for. Unlimited if not given.
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.request_count = 0
+        self.retry_count = 0
+        self.wait_time = 0.0
+        self._stats_lock = threading.Lock()
+        self.instrumentation = instrumentation if instrumentation is not None else DEFAULT_INSTRUMENTATION
+        self.rate_limiter = rate_limiter
+        self.flow = None
+
+    def for_flow(self, rate_limiter, flow):
+        """
+        Returns a transport sharing this one's session and connection pool, whose attempts wait for `rate_limiter`
+        as part of `flow`. The new transport counts its own requests, retries and wait time.
+
+        Parameters
+        ----------
+        rate_limiter : RateLimiter
+            The limiter every attempt waits for, usually shared by several flows.
+        flow : hashable
+            The flow the attempts are queued under, such as a playlist ID. See `FairRateLimiter`.
+
+        Returns
+        -------
+        HTTPTransport
+            The new transport.
+        """
+        transport = copy.copy(self)
+        transport.rate_limiter = rate_limiter
+        transport.flow = flow
+        transport.request_count = 0
+        transport.retry_count = 0
+        transport.wait_time = 0.0
+        transport._stats_lock = threading.Lock()
+        return transport
+
+    def backoff(self, attempt):
+        """
+        Returns the delay before the next attempt, using exponential backoff with full jitter.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of attempts already retried.
+
+        Returns
+        -------
+        float
+            The delay in seconds.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def retry_after(self, response):
+        """
+        Parses the 'Retry-After' header of a response, given either in seconds or as an HTTP date. The delay is capped
+        at `max_backoff`, so a server asking for hours doesn't stall the worker.
+
+        Parameters
+        ----------
+        response : requests.Response
+            The throttled response.
+
+        Returns
+        -------
+        float or None
+            The delay in seconds requested by the server, at most `max_backoff`, or None if the header is missing or
+            invalid.
+        """
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                retry_at = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            delay = retry_at.timestamp() - time.time()
+        return min(max(0.0, delay), self.max_backoff)
+
+    def request(self, method, url, endpoint=None, **kwargs):
+        """
+        Sends a request through the pooled session, retrying on connection errors and on the statuses in
+        `RETRY_STATUSES`. The last response is returned once the retries are used up.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The URL to request.
+        endpoint : str, optional
+            The name the request is counted under by the instrumentation. Defaults to the method and path of `url`.
+        **kwargs
+            Passed on to `requests.Session.request`.
+
+        Returns
+        -------
+        requests.Response
+            The response of the last attempt, with the number of attempts made in its `attempts` attribute.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation.enabled and endpoint is None:
+            endpoint = f'{method} {urlsplit(url).path}'
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(self.flow)
+            with self._stats_lock:
+                self.request_count += 1
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if instrumentation.enabled:
+                    instrumentation.record_http(endpoint, None, 0, time.perf_counter() - start)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                if instrumentation.enabled:
+                    instrumentation.record_http(endpoint, response.status_code, len(response.content),
+                                                time.perf_counter() - start)
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    response.attempts = attempt + 1
+                    return response
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff(attempt)
+
+            with self._stats_lock:
+                self.retry_count += 1
+                self.wait_time += delay
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        """
+        Sends a GET request. See `HTTPTransport.request`.
+        """
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """
+        Sends a POST request. See `HTTPTransport.request`.
+        """
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        """
+        Sends a DELETE request. See `HTTPTransport.request`.
+        """
+        return self.request('DELETE', url, **kwargs)
+
+    def stats(self):
+        """
+        Reports how many requests were sent, how many of them were retries, and how long was spent waiting.
+
+        Returns
+        -------
+        dict
+            A dictionary with the 'requests', 'retries' and 'wait_time' counters.
+        """
+        with self._stats_lock:
+            return {
+                'requests': self.request_count,
+                'retries': self.retry_count,
+                'wait_time': self.wait_time,
+            }
+
+# %% ../nbs/03_transport.ipynb 6
+class RateLimiter:
+    """
+    A thread-safe token bucket allowing `rate` calls per second on average, with bursts of up to `burst` calls.
+
+    Parameters
+    ----------
+    rate : float
+        The number of calls allowed per second.
+    burst : int, optional
+        The number of calls that can be made at once after an idle period. Defaults to 1.
+    """
+    def __init__(self, rate, burst=1):
+        """
+        Initializes a new instance of the RateLimiter class.
+
+        Parameters
+        ----------
+        rate : float
+            The number of calls allowed per second.
+        burst : int, optional
+            The number of calls that can be made at once after an idle period. Defaults to 1.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.wait_time = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, flow=None):
+        """
+        Blocks until a call is allowed, then takes one token from the bucket.
+
+        Parameters
+        ----------
+        flow : hashable, optional
+            Ignored; callers are served in no particular order. See `FairRateLimiter`.
+
+        Returns
+        -------
+        float
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.wait_time += waited
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+# %% ../nbs/03_transport.ipynb 7
+class FairRateLimiter(RateLimiter):
+    """
+    A token bucket shared by several flows, such as the playlists of a batch, that hands its tokens out in turn.
+
+    Callers waiting for a token are queued by flow, and the flows with waiting callers are served round-robin, one
+    token each, so a flow sending many concurrent requests can't starve the others. Within a flow, callers are
+    served in the order they arrived.
+
+    Parameters
+    ----------
+    rate : float
+        The number of calls allowed per second, over all flows.
+    burst : int, optional
+        The number of calls that can be made at once after an idle period. Defaults to 1.
+    """
+    def __init__(self, rate, burst=1):
+        """
+        Initializes a new instance of the FairRateLimiter class.
+
+        Parameters
+        ----------
+        rate : float
+            The number of calls allowed per second, over all flows.
+        burst : int, optional
+            The number of calls that can be made at once after an idle period. Defaults to 1.
+        """
+        super().__init__(rate, burst)
+        self._condition = threading.Condition(self._lock)
+        # the flows with waiting callers, in the order they are served
+        self._queues = collections.OrderedDict()
+        self.flow_stats = {}
+
+    def acquire(self, flow=None):
+        """
+        Blocks until it is `flow`'s turn and a call is allowed, then takes one token from the bucket.
+
+        Parameters
+        ----------
+        flow : hashable, optional
+            The flow the call belongs to. Calls without a flow share one.
+
+        Returns
+        -------
+        float
+            The number of seconds spent waiting.
+        """
+        start = time.monotonic()
+        ticket = object()
+        with self._condition:
+            self._queues.setdefault(flow, collections.deque()).append(ticket)
+            while True:
+                turn = next(iter(self._queues))
+                if turn == flow and self._queues[flow][0] is ticket:
+                    self._refill()
+                    if self.tokens >= 1:
+                        break
+                    self._condition.wait((1 - self.tokens) / self.rate)
+                else:
+                    self._condition.wait()
+
+            self.tokens -= 1
+            # the flow goes to the back of the line, or leaves it when nobody else in it is waiting
+            queue = self._queues.pop(flow)
+            queue.popleft()
+            if queue:
+                self._queues[flow] = queue
+            waited = time.monotonic() - start
+            self.wait_time += waited
+            stats = self.flow_stats.setdefault(flow, {'calls': 0, 'wait_time': 0.0})
+            stats['calls'] += 1
+            stats['wait_time'] += waited
+            self._condition.notify_all()
+        return waited
+
+# %% ../nbs/03_transport.ipynb 8
+def _as_response(url, status, reason, headers, content):
+    """
+    Wraps a finished response of another HTTP library in a `requests.Response`, so the API clients read the
+    responses of every transport the same way.
+    """
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.reason = reason
+    response.headers = requests.structures.CaseInsensitiveDict(headers)
+    response._content = content
+    return response
+
+
+class AsyncHTTPTransport:
+    """
+    The asyncio counterpart of `HTTPTransport`: one pooled `aiohttp` session with the same retries, shared by the
+    coroutines of an API client. `aiohttp` is only imported once the transport is used.
+
+    At most `max_concurrency` requests are in flight at once, the others wait for a semaphore, and the connection
+    pool holds as many connections. The session is opened in the running event loop on first use, and is closed by
+    `close` or by leaving the transport's `async with` block. Responses are returned as `requests.Response` objects.
+
+    Parameters
+    ----------
+    max_concurrency : int, optional
+        The most requests in flight at once. Defaults to 64.
+    max_retries : int, optional
+        The number of times a throttled or failed request is retried before giving up. Defaults to 5.
+    backoff_factor : float, optional
+        The base delay in seconds of the exponential backoff. Defaults to 0.5.
+    max_backoff : float, optional
+        The longest delay in seconds between two attempts, including one asked for by a Retry-After header.
+        Defaults to 60.
+    instrumentation : Instrumentation, optional
+        Where every attempt is counted by endpoint and status. Defaults to `DEFAULT_INSTRUMENTATION`.
+    """
+    RETRY_STATUSES = HTTPTransport.RETRY_STATUSES
+    # the delays and counters are the same as those of the threaded transport
+    backoff = HTTPTransport.backoff
+    retry_after = HTTPTransport.retry_after
+    stats = HTTPTransport.stats
+
+    def __init__(self, max_concurrency=64, max_retries=5, backoff_factor=0.5, max_backoff=60, instrumentation=None):
+        """
+        Initializes a new instance of the AsyncHTTPTransport class.
+
+        Parameters
+        ----------
+        max_concurrency : int, optional
+            The most requests in flight at once. Defaults to 64.
+        max_retries : int, optional
+            The number of times a throttled or failed request is retried before giving up. Defaults to 5.
+        backoff_factor : float, optional
+            The base delay in seconds of the exponential backoff. Defaults to 0.5.
+        max_backoff : float, optional
+            The longest delay in seconds between two attempts, including one asked for by a Retry-After header.
+            Defaults to 60.
+        instrumentation : Instrumentation, optional
+            Where every attempt is counted by endpoint and status. Defaults to `DEFAULT_INSTRUMENTATION`.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.session = None
+        self._semaphore = None
+        self.request_count = 0
+        self.retry_count = 0
+        self.wait_time = 0.0
+        self._stats_lock = threading.Lock()
+        self.instrumentation = instrumentation if instrumentation is not None else DEFAULT_INSTRUMENTATION
+
+    def _open(self):
+        if self.session is None:
+            import asyncio
+
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def close(self):
+        """
+        Closes the session and its connections. The next request opens a new one.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+            self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def request(self, method, url, endpoint=None, **kwargs):
+        """
+        Sends a request through the pooled session, retrying on connection errors, timeouts and on the statuses in
+        `RETRY_STATUSES`. The last response is returned once the retries are used up. Retries wait outside the
+        semaphore, so they don't hold up other requests.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The URL to request.
+        endpoint : str, optional
+            The name the request is counted under by the instrumentation. Defaults to the method and path of `url`.
+        **kwargs
+            Passed on to `aiohttp.ClientSession.request`, such as `headers` and `data`.
+
+        Returns
+        -------
+        requests.Response
+            The response of the last attempt, with the number of attempts made in its `attempts` attribute.
+        """
+        import asyncio
+
+        import aiohttp
+
+        session = self._open()
+        instrumentation = self.instrumentation
+        if instrumentation.enabled and endpoint is None:
+            endpoint = f'{method} {urlsplit(url).path}'
+        attempt = 0
+        while True:
+            with self._stats_lock:
+                self.request_count += 1
+            start = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    async with session.request(method, url, **kwargs) as r:
+                        content = await r.read()
+                response = _as_response(url, r.status, r.reason, r.headers, content)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if instrumentation.enabled:
+                    instrumentation.record_http(endpoint, None, 0, time.perf_counter() - start)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                if instrumentation.enabled:
+                    instrumentation.record_http(endpoint, response.status_code, len(content),
+                                                time.perf_counter() - start)
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    response.attempts = attempt + 1
+                    return response
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff(attempt)
+
+            with self._stats_lock:
+                self.retry_count += 1
+                self.wait_time += delay
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, url, **kwargs):
+        """
+        Sends a GET request. See `AsyncHTTPTransport.request`.
+        """
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        """
+        Sends a POST request. See `AsyncHTTPTransport.request`.
+        """
+        return await self.request('POST', url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        """
+        Sends a DELETE request. See `AsyncHTTPTransport.request`.
+        """
+        return await self.request('DELETE', url, **kwargs)